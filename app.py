@@ -1,6 +1,5 @@
 import streamlit as st
 import os
-import tempfile
 import base64
 from pathlib import Path
 import trimesh
@@ -11,7 +10,11 @@ import webbrowser
 from database_api import ModelDatabase, load_model_files, generate_share_url, reset_database
 from mtl_generator import auto_generate_mtl
 from texture_optimizer import auto_optimize_textures
+from texture_encoding import TEXTURE_ENCODING
+from texture_atlas import TEXTURE_ATLAS, build_atlas_model
+from mesh_lod import compile_obj_with_lods
 from viewer import show_shared_model
+from asset_server import is_enabled as asset_server_enabled
 from auth import check_password, show_logout_button, update_activity_time, show_session_info
 
 # viewer_utils 모듈 강제 리로드 (변경사항 즉시 반영)
@@ -21,6 +24,9 @@ if 'viewer_utils' in sys.modules:
     importlib.reload(sys.modules['viewer_utils'])
 from viewer_utils import create_3d_viewer_html, create_texture_loading_code
 
+# 저장 가능한 최대 모델 수 (0이면 제한 없음) - 관리 탭은 페이지 단위로 표시하므로 목록 크기와 무관
+MAX_MODELS = int(os.getenv('MAX_MODELS', '0'))
+
 # 페이지 설정 (항상 먼저 실행)
 st.set_page_config(
     page_title="3D Model Manager",
@@ -122,52 +128,87 @@ class ModelProcessor:
         
         return True, file_types
     
-    def save_uploaded_files(self, file_types, temp_dir, texture_max_size=2048):
-        """업로드된 파일들을 임시 디렉토리에 저장"""
-        saved_files = {}
+    def prepare_uploaded_files(self, file_types, texture_max_size=2048, texture_encoding=None, use_atlas=False):
+        """업로드된 파일들을 저장용 데이터로 준비 (임시 파일 없이 메모리에서 처리)
+        
+        OBJ는 업로드 버퍼(memoryview)를 복사하지 않고 그대로 넘기며,
+        웹서버 업로드도 이 버퍼를 잘라서 스트리밍함
+        use_atlas면 작은 재질 텍스처를 아틀라스로 합치고 OBJ/MTL/메시를 아틀라스 기준으로 다시 만듦
+        
+        Returns:
+            dict: model(memoryview), material(str), textures({이름: bytes}), mesh, lods - 실패 시 None
+        """
+        prepared = {}
         
-        # 모델 파일 저장
+        # 모델 파일 (업로드 버퍼 그대로 사용)
         for file in file_types['model']:
-            file_path = os.path.join(temp_dir, file.name)
-            with open(file_path, 'wb') as f:
-                f.write(file.getbuffer())
-            saved_files['model'] = file_path
-        
-        # MTL 파일 저장 (업로드된 파일 그대로 사용)
-        for file in file_types['material']:
-            file_path = os.path.join(temp_dir, file.name)
-            with open(file_path, 'wb') as f:
-                f.write(file.getbuffer())
-            saved_files['material'] = file_path
-        
-        # 텍스처 파일들 저장 및 최적화
-        saved_files['textures'] = []
+            prepared['model'] = file.getbuffer()
+        
         texture_data = {}
         for file in file_types['texture']:
-            texture_content = file.getbuffer()
-            texture_data[file.name] = bytes(texture_content)
+            texture_data[file.name] = bytes(file.getbuffer())
+        mtl_content = bytes(file_types['material'][-1].getbuffer()).decode('utf-8', errors='ignore')
+        
+        # 🧩 텍스처 아틀라스 (재질이 많은 모델 - 드로우 콜/텍스처 수 감소)
+        atlas = None
+        if use_atlas:
+            st.write("🧩 텍스처 아틀라스 생성 중...")
+            try:
+                atlas = build_atlas_model(prepared['model'], self.fix_mtl_paths(mtl_content), texture_data,
+                                          page_size=texture_max_size)
+                if atlas is None:
+                    st.info("📝 합칠 수 있는 재질 텍스처가 적어 아틀라스를 만들지 않았습니다.")
+            except Exception as e:
+                st.warning(f"⚠️ 텍스처 아틀라스 생성 실패 (원본 재질 사용): {str(e)}")
+            if atlas:
+                report = atlas['report']
+                st.success(f"✅ 재질 {report['groups_before']}개 → {report['groups_after']}개 (드로우 콜), "
+                           f"텍스처 {report['textures_before']}장 → {report['textures_after']}장")
+                for page_name, (width, height), tile_count in report['pages']:
+                    st.write(f"   🧩 {page_name}: {width}x{height}, 텍스처 {tile_count}장")
+                for material, reason in report['skipped']:
+                    st.write(f"   ↪️ {material}: {reason}")
+                prepared['model'] = atlas['model']
+                prepared['mesh'] = atlas['mesh']
+                prepared['lods'] = atlas['lods']
+                texture_data = atlas['textures']
+                mtl_content = atlas['material']
+        
+        # OBJ를 바이너리 메시 + LOD로 미리 컴파일 (뷰어에서 OBJ 파싱 생략)
+        if not atlas:
+            st.write("🧊 바이너리 메시 / LOD 컴파일 중...")
+            prepared['mesh'] = None
+            prepared['lods'] = []
+            try:
+                mesh_data, lod_data = compile_obj_with_lods(prepared['model'])
+                prepared['mesh'] = mesh_data
+                st.write(f"   📦 OBJ {len(prepared['model']):,} bytes → 바이너리 {len(mesh_data):,} bytes")
+                
+                for level, lod_content in enumerate(lod_data, start=1):
+                    prepared['lods'].append(lod_content)
+                    st.write(f"   🔻 LOD{level}: {len(lod_content):,} bytes")
+            except Exception as e:
+                # 컴파일 실패 시 기존 OBJ 방식으로 표시
+                st.warning(f"⚠️ 바이너리 메시 컴파일 실패 (OBJ로 표시됨): {str(e)}")
+        
+        # 텍스처 최적화
         
         # 🔧 텍스처 자동 최적화
         st.write("🎨 텍스처 최적화 중...")
-        optimized_texture_data, should_continue = auto_optimize_textures(texture_data, max_size=texture_max_size)
+        optimized_texture_data, should_continue = auto_optimize_textures(
+            texture_data, max_size=texture_max_size, encoding=texture_encoding
+        )
         
         if not should_continue:
             st.error("텍스처 최적화에 실패했습니다.")
             return None
-        
-        # 최적화된 텍스처 파일들을 디스크에 저장
-        for filename, data in optimized_texture_data.items():
-            file_path = os.path.join(temp_dir, filename)
-            with open(file_path, 'wb') as f:
-                f.write(data)
-            saved_files['textures'].append(file_path)
+        prepared['textures'] = optimized_texture_data
         
         # MTL 파일 처리 - 업로드된 MTL 파일 사용 (멀티 텍스처 지원)
         st.info("✅ 업로드된 MTL 파일을 사용합니다. (멀티 텍스처 지원)")
         
         # MTL 파일 내용 확인 및 분석
-        with open(saved_files['material'], 'r', encoding='utf-8', errors='ignore') as f:
-            mtl_content = f.read()
+        prepared['material'] = mtl_content
         
         # MTL 파일에서 재질 정보 추출
         materials_in_mtl = self.extract_materials_from_mtl(mtl_content)
@@ -178,10 +219,7 @@ class ModelProcessor:
             st.warning("🔧 MTL 파일의 경로 문제를 자동으로 수정하는 중...")
             
             corrected_mtl_content = self.fix_mtl_paths(mtl_content)
-            
-            # 수정된 MTL 파일 저장
-            with open(saved_files['material'], 'w', encoding='utf-8') as f:
-                f.write(corrected_mtl_content)
+            prepared['material'] = corrected_mtl_content
             
             # 다시 텍스처 파일 추출 (수정된 버전에서)
             materials_in_mtl = self.extract_materials_from_mtl(corrected_mtl_content)
@@ -233,7 +271,7 @@ class ModelProcessor:
             else:
                 st.success("✅ 모든 참조 텍스처가 업로드되었습니다!")
         
-        return saved_files
+        return prepared
     
     def extract_materials_from_mtl(self, mtl_content):
         """MTL 파일에서 재질명 추출"""
@@ -392,8 +430,8 @@ def show_upload_section():
                 else:
                     st.error("❌ 스캔 실패")
     
-    if current_count >= 50:
-        st.error("최대 50개의 모델만 저장할 수 있습니다. 기존 모델을 삭제 후 다시 시도하세요.")
+    if MAX_MODELS and current_count >= MAX_MODELS:
+        st.error(f"최대 {MAX_MODELS}개의 모델만 저장할 수 있습니다. 기존 모델을 삭제 후 다시 시도하세요.")
         return
     
     # 저장된 모델들의 storage_type 확인
@@ -412,7 +450,8 @@ def show_upload_section():
         storage_status = "저장소 준비됨"
     
     with col1:
-        st.info(f"현재 저장된 모델: {current_count}/50 ({storage_status})")
+        count_text = f"{current_count}/{MAX_MODELS}" if MAX_MODELS else f"{current_count}개"
+        st.info(f"현재 저장된 모델: {count_text} ({storage_status})")
     
     # 모델 정보 입력
     col1, col2, col3 = st.columns(3)
@@ -436,17 +475,39 @@ def show_upload_section():
     with st.expander("⚙️ 고급 설정", expanded=False):
         texture_quality = st.select_slider(
             "텍스처 품질",
-            options=["표준 (1K)", "고품질 (2K)"],
-            value="표준 (1K)",
-            help="텍스처 해상도를 설정합니다. 고품질은 로딩 시간이 길어질 수 있습니다."
+            options=["표준 (1K)", "고품질 (2K)", "최고품질 (4K)"],
+            # 기기별 해상도 선택은 에셋 서버 URL로만 가능 - 인라인 뷰어는 원본을 그대로 받으므로 1K 유지
+            value="고품질 (2K)" if asset_server_enabled() else "표준 (1K)",
+            help="최대 텍스처 해상도를 설정합니다. 에셋 서버를 사용하면 작은 해상도 단계도 함께 저장되어 "
+                 "뷰어가 기기 화면 크기와 네트워크에 맞는 해상도를 먼저 불러옵니다."
         )
         
         # 품질에 따른 max_size 설정
         quality_map = {
             "표준 (1K)": 1024,
-            "고품질 (2K)": 2048
+            "고품질 (2K)": 2048,
+            "최고품질 (4K)": 4096
         }
         texture_max_size = quality_map[texture_quality]
+        
+        # 텍스처 형식 (WebP/AVIF 자동 선택은 화질 기준을 넘는 가장 작은 형식 사용)
+        encoding_options = {"JPEG/PNG": "classic", "WebP/AVIF 자동 선택": "auto"}
+        texture_format = st.radio(
+            "텍스처 형식",
+            options=list(encoding_options),
+            index=1 if TEXTURE_ENCODING == 'auto' else 0,
+            horizontal=True,
+            help="자동 선택은 WebP(무손실/손실)/AVIF 후보 중 원본과의 화질(SSIM/PSNR)이 기준 이상인 "
+                 "가장 작은 파일을 사용합니다. 투명 텍스처 용량이 크게 줄어듭니다."
+        )
+        texture_encoding = encoding_options[texture_format]
+        
+        use_atlas = st.checkbox(
+            "텍스처 아틀라스 사용",
+            value=TEXTURE_ATLAS,
+            help="재질(newmtl)마다 작은 텍스처가 따로 있는 모델에서 텍스처를 몇 장의 아틀라스로 합치고 "
+                 "재질을 병합합니다. 드로우 콜과 텍스처 요청 수가 줄어듭니다."
+        )
     
     model_description = st.text_area("설명 (선택사항)", placeholder="모델에 대한 간단한 설명")
     
@@ -524,34 +585,22 @@ def show_upload_section():
             if st.button("모델 저장 및 공유 링크 생성", type="primary"):
                 with st.spinner("모델을 저장하고 있습니다..."):
                     try:
-                        # 임시 디렉토리 생성
-                        with tempfile.TemporaryDirectory() as temp_dir:
-                            # 파일 저장 (텍스처 품질 설정 전달)
-                            saved_files = processor.save_uploaded_files(file_types, temp_dir, texture_max_size)
-                            
-                            # 파일 내용 읽기
-                            with open(saved_files['model'], 'r') as f:
-                                obj_content = f.read()
-                            
-                            with open(saved_files['material'], 'r') as f:
-                                mtl_content = f.read()
-                            
-                            # 텍스처 데이터 읽기
-                            texture_data = {}
-                            for texture_path in saved_files['textures']:
-                                texture_name = os.path.basename(texture_path)
-                                with open(texture_path, 'rb') as f:
-                                    texture_data[texture_name] = f.read()
-                            
+                        # 업로드 데이터 준비 (텍스처 품질 설정 전달, 임시 파일 없음)
+                        prepared = processor.prepare_uploaded_files(
+                            file_types, texture_max_size, texture_encoding, use_atlas
+                        )
+                        if prepared:
                             # 데이터베이스에 저장 (실제 높이 포함)
                             model_id, share_token = db.save_model(
                                 model_name, 
                                 author_name,
                                 model_description,
-                                obj_content, 
-                                mtl_content, 
-                                texture_data,
-                                real_height=real_height  # 키워드 인자로 전달
+                                prepared['model'],
+                                prepared['material'],
+                                prepared['textures'],
+                                real_height=real_height,  # 키워드 인자로 전달
+                                mesh_data=prepared['mesh'],
+                                lod_data=prepared['lods']
                             )
                             
                             # 성공 메시지 및 공유 링크
@@ -590,13 +639,71 @@ def show_model_management():
                     st.error("❌ 스캔 실패")
     
     db = ModelDatabase()  # 웹서버 API 사용
-    models = db.get_all_models()
+    
+    # 검색/정렬 조건
+    sort_options = {
+        "최신순": ('created_at', 'desc'),
+        "오래된순": ('created_at', 'asc'),
+        "이름순": ('name', 'asc'),
+        "작성자순": ('author', 'asc'),
+        "조회수순": ('access_count', 'desc')
+    }
+    filter_col1, filter_col2, filter_col3, filter_col4, filter_col5 = st.columns([2, 2, 2, 1, 1])
+    with filter_col1:
+        name_filter = st.text_input("모델명 검색", key="manage_name_filter")
+    with filter_col2:
+        author_filter = st.text_input("작성자 검색", key="manage_author_filter")
+    with filter_col3:
+        date_range = st.date_input("생성일", value=(), key="manage_date_filter")
+    with filter_col4:
+        sort_label = st.selectbox("정렬", list(sort_options.keys()), key="manage_sort")
+    with filter_col5:
+        page_size = st.selectbox("표시 개수", [10, 20, 50], index=1, key="manage_page_size")
+    
+    date_from = date_range[0] if len(date_range) > 0 else None
+    date_to = date_range[1] if len(date_range) > 1 else date_from
+    
+    # 조건이 바뀌면 첫 페이지로
+    filter_state = (name_filter, author_filter, str(date_from), str(date_to), sort_label, page_size)
+    if st.session_state.get("manage_filter_state") != filter_state:
+        st.session_state["manage_filter_state"] = filter_state
+        st.session_state["manage_page"] = 0
+    page_index = st.session_state.get("manage_page", 0)
+    
+    sort_field, sort_order = sort_options[sort_label]
+    page = db.get_models_page(
+        offset=page_index * page_size, limit=page_size, sort=sort_field, order=sort_order,
+        name=name_filter, author=author_filter, date_from=date_from, date_to=date_to
+    )
+    models = page['models']
+    total = page['total']
     
     if not models:
-        st.info("저장된 모델이 없습니다.")
-        st.write("💡 웹서버에 저장된 모델이 있다면 '🔄 웹서버 동기화' 버튼을 클릭하세요.")
+        if total or name_filter or author_filter or date_from:
+            st.info("조건에 맞는 모델이 없습니다.")
+        else:
+            st.info("저장된 모델이 없습니다.")
+            st.write("💡 웹서버에 저장된 모델이 있다면 '🔄 웹서버 동기화' 버튼을 클릭하세요.")
+        if page_index > 0:
+            st.session_state["manage_page"] = 0
+            st.rerun()
         return
     
+    # 페이지 이동
+    page_count = max((total + page_size - 1) // page_size, 1)
+    nav_col1, nav_col2, nav_col3 = st.columns([1, 3, 1])
+    with nav_col1:
+        if st.button("◀ 이전", key="manage_prev", disabled=page_index == 0, use_container_width=True):
+            st.session_state["manage_page"] = page_index - 1
+            st.rerun()
+    with nav_col2:
+        first = page_index * page_size + 1
+        st.caption(f"총 {total}개 중 {first}-{first + len(models) - 1} (페이지 {page_index + 1}/{page_count})")
+    with nav_col3:
+        if st.button("다음 ▶", key="manage_next", disabled=page_index + 1 >= page_count, use_container_width=True):
+            st.session_state["manage_page"] = page_index + 1
+            st.rerun()
+    
     for model in models:
         # 저장 타입에 따른 아이콘과 설명
         storage_type = model.get('storage_type', 'local')
@@ -744,7 +851,7 @@ def main():
         - 링크를 통해 누구나 접근 가능
         
         **5. 관리**
-        - 최대 50개 모델 저장
+        - 모델명/작성자/생성일 검색, 정렬, 페이지 단위 표시
         - 미리보기 및 삭제 가능
         
         **6. 뷰어 조작**
@@ -864,9 +971,9 @@ def main():
             )
             
             if st.button("🔍 서버 연결 테스트"):
-                import requests
+                import http_transport
                 try:
-                    response = requests.post(custom_url, data={}, timeout=10, verify=False)
+                    response = http_transport.post(custom_url, endpoint='connection_test', data={}, verify=False)
                     if response.status_code == 200:
                         try:
                             result = response.json()
@@ -903,7 +1010,51 @@ def main():
                     st.info("서버에 모델이 없거나 조회에 실패했습니다.")
             
             st.caption("⚠️ 이 기능은 디버깅 및 관리 목적으로 제공됩니다.")
-            
+
+            # 뷰어 HTML 캐시 상태
+            st.divider()
+            st.subheader("📈 뷰어 캐시 상태")
+
+            from viewer_cache import get_viewer_cache
+            viewer_cache = get_viewer_cache()
+            cache_stats = viewer_cache.stats()
+
+            col_hit, col_miss, col_evict, col_size = st.columns(4)
+            with col_hit:
+                st.metric("적중", f"{cache_stats['hits']:,}", f"{cache_stats['hit_rate'] * 100:.1f}%")
+            with col_miss:
+                st.metric("미적중", f"{cache_stats['misses']:,}")
+            with col_evict:
+                st.metric("제거", f"{cache_stats['evictions']:,}")
+            with col_size:
+                st.metric("사용량", f"{cache_stats['bytes'] / (1024 * 1024):.1f}MB",
+                          f"{cache_stats['entries']}개 / 최대 {cache_stats['max_bytes'] / (1024 * 1024):.0f}MB")
+
+            if st.button("🧹 뷰어 캐시 비우기"):
+                viewer_cache.clear()
+                st.success("✅ 뷰어 캐시를 비웠습니다.")
+
+            # 외부 HTTP 요청 지연 시간
+            st.divider()
+            st.subheader("⏱️ HTTP 요청 지연 시간")
+
+            import http_transport
+            latency = http_transport.latency_stats()
+            if latency:
+                st.dataframe([
+                    {
+                        "엔드포인트": endpoint,
+                        "요청 수": summary['count'],
+                        "오류": summary['errors'],
+                        "평균(초)": round(summary['mean'], 3),
+                        "p50(초)": summary['p50'],
+                        "p95(초)": summary['p95']
+                    }
+                    for endpoint, summary in sorted(latency.items())
+                ], use_container_width=True)
+            else:
+                st.info("아직 기록된 요청이 없습니다.")
+
             # 텍스처 최적화 테스트
             st.divider()
             st.subheader("🎨 텍스처 최적화 테스트")
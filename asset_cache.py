@@ -0,0 +1,329 @@
+"""
+웹서버 파일 다운로드용 로컬 디스크 캐시
+내용 해시(sha256) 기반으로 파일을 저장하고, ETag/Last-Modified로 조건부 재검증
+전체 용량 한도를 넘으면 가장 오래 사용하지 않은 항목부터 제거 (LRU)
+"""
+
+import os
+import time
+import hashlib
+import sqlite3
+import tempfile
+import threading
+from object_store import ObjectStore, evict_lru
+
+# 기본 설정 (환경변수로 조정 가능)
+DEFAULT_CACHE_DIR = "data/asset_cache"
+DEFAULT_MAX_BYTES = int(os.getenv('ASSET_CACHE_MAX_BYTES', str(2 * 1024 * 1024 * 1024)))  # 2GB
+DEFAULT_FRESH_SECONDS = int(os.getenv('ASSET_CACHE_FRESH_SECONDS', '300'))  # 재검증 없이 사용할 시간
+
+class AssetCache:
+    """내용 주소 기반(content-addressed) 디스크 캐시"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, fresh_seconds=DEFAULT_FRESH_SECONDS):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.index_path = os.path.join(cache_dir, "index.db")
+        self.max_bytes = max_bytes
+        self.fresh_seconds = fresh_seconds
+        self._lock = threading.Lock()
+
+        self.objects = ObjectStore(self.objects_dir)
+        self._init_index()
+
+    def _connect(self):
+        return sqlite3.connect(self.index_path, timeout=10)
+
+    def _init_index(self):
+        """인덱스 테이블 생성"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries(last_used)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_entries_sha256 ON entries(sha256)')
+        conn.commit()
+        conn.close()
+
+    def object_path(self, sha256):
+        """해시에 해당하는 파일 경로 (objects/ab/abcdef...)"""
+        return self.objects.path(sha256)
+
+    def lookup(self, url):
+        """URL에 대한 캐시 항목 조회"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT sha256, size, etag, last_modified, fetched_at
+            FROM entries WHERE url = ?
+        ''', (url,))
+        row = cursor.fetchone()
+        conn.close()
+
+        if not row:
+            return None
+
+        return {
+            'url': url,
+            'sha256': row[0],
+            'size': row[1],
+            'etag': row[2],
+            'last_modified': row[3],
+            'fetched_at': row[4]
+        }
+
+    def is_fresh(self, entry):
+        """재검증 없이 바로 사용해도 되는지 확인"""
+        return entry is not None and (time.time() - entry['fetched_at']) < self.fresh_seconds
+
+    def conditional_headers(self, entry):
+        """조건부 요청 헤더 (If-None-Match / If-Modified-Since)"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def read(self, entry):
+        """캐시된 내용 읽기 - 파일이 없으면 항목 삭제 후 None"""
+        content = self.objects.read(entry['sha256'])
+        if content is None:
+            self.remove(entry['url'])
+            return None
+
+        self.touch(entry['url'])
+        return content
+
+    def touch(self, url, revalidated=False):
+        """최근 사용 시간 갱신 (304 재검증 시 fetched_at도 갱신)"""
+        now = time.time()
+        conn = self._connect()
+        cursor = conn.cursor()
+        if revalidated:
+            cursor.execute('UPDATE entries SET last_used = ?, fetched_at = ? WHERE url = ?', (now, now, url))
+        else:
+            cursor.execute('UPDATE entries SET last_used = ? WHERE url = ?', (now, url))
+        conn.commit()
+        conn.close()
+
+    def store(self, url, content, etag=None, last_modified=None):
+        """다운로드한 내용을 저장하고 해시 반환"""
+        sha256 = hashlib.sha256(content).hexdigest()
+
+        with self._lock:
+            # 같은 내용이 이미 있으면 다시 쓰지 않음
+            if not self.objects.exists(sha256):
+                self.objects.write(sha256, content)
+
+            now = time.time()
+            conn = self._connect()
+            cursor = conn.cursor()
+            cursor.execute('SELECT sha256 FROM entries WHERE url = ?', (url,))
+            previous = cursor.fetchone()
+            cursor.execute('''
+                INSERT OR REPLACE INTO entries (url, sha256, size, etag, last_modified, fetched_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (url, sha256, len(content), etag, last_modified, now, now))
+            conn.commit()
+            conn.close()
+
+            # URL 내용이 바뀌었으면 이전 파일 정리
+            if previous and previous[0] != sha256:
+                self._remove_object_if_unused(previous[0])
+
+            self._evict()
+
+        return sha256
+
+    def remove(self, url):
+        """캐시 항목 삭제"""
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.cursor()
+            cursor.execute('SELECT sha256 FROM entries WHERE url = ?', (url,))
+            row = cursor.fetchone()
+            cursor.execute('DELETE FROM entries WHERE url = ?', (url,))
+            conn.commit()
+            conn.close()
+
+            if row:
+                self._remove_object_if_unused(row[0])
+
+    def remove_prefix(self, url_prefix):
+        """특정 경로 아래의 모든 캐시 항목 삭제 (모델 삭제 시)"""
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.cursor()
+            cursor.execute('SELECT url, sha256 FROM entries WHERE substr(url, 1, ?) = ?', (len(url_prefix), url_prefix))
+            rows = cursor.fetchall()
+            cursor.executemany('DELETE FROM entries WHERE url = ?', [(row[0],) for row in rows])
+            conn.commit()
+            conn.close()
+
+            for sha256 in set(row[1] for row in rows):
+                self._remove_object_if_unused(sha256)
+
+        return len(rows)
+
+    def _remove_object_if_unused(self, sha256):
+        """더 이상 참조되지 않는 파일 삭제"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT COUNT(*) FROM entries WHERE sha256 = ?', (sha256,))
+        still_used = cursor.fetchone()[0] > 0
+        conn.close()
+
+        if not still_used:
+            self.objects.remove(sha256)
+
+    def total_bytes(self):
+        """디스크에 저장된 고유 파일들의 총 크기"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT sha256, size FROM entries)')
+        total = cursor.fetchone()[0]
+        conn.close()
+        return total
+
+    def _evict(self):
+        """용량 한도 초과 시 LRU 순서로 제거 (호출자가 lock 보유)"""
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return 0
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT url, sha256, size FROM entries ORDER BY last_used ASC')
+        hashes = {}
+        candidates = []
+        for url, sha256, size in cursor.fetchall():
+            hashes[url] = sha256
+            candidates.append((url, size))
+
+        def drop(url, size):
+            # 같은 내용을 다른 URL이 쓰고 있으면 파일은 남김
+            cursor.execute('DELETE FROM entries WHERE url = ?', (url,))
+            cursor.execute('SELECT COUNT(*) FROM entries WHERE sha256 = ?', (hashes[url],))
+            if cursor.fetchone()[0] > 0:
+                return 0
+            self.objects.remove(hashes[url])
+            return size
+
+        evicted = evict_lru(candidates, total, self.max_bytes, drop)
+        conn.commit()
+        conn.close()
+        return evicted
+
+    def stats(self):
+        """캐시 통계"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT COUNT(*) FROM entries')
+        entries = cursor.fetchone()[0]
+        conn.close()
+
+        return {
+            'entries': entries,
+            'bytes': self.total_bytes(),
+            'max_bytes': self.max_bytes
+        }
+
+# 프로세스 전역 캐시 (WebServerStorage 생성마다 디렉토리/테이블을 다시 만들지 않도록)
+_asset_cache = None
+_asset_cache_lock = threading.Lock()
+
+def get_asset_cache():
+    """프로세스 전역 AssetCache 반환"""
+    global _asset_cache
+    if _asset_cache is None:
+        with _asset_cache_lock:
+            if _asset_cache is None:
+                _asset_cache = AssetCache()
+    return _asset_cache
+
+# 테스트 함수
+def test_asset_cache():
+    """로컬 대역 HTTP 서버로 조건부 재검증 테스트"""
+    import shutil
+    import threading
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    from web_storage import WebServerStorage
+
+    print("🧪 에셋 캐시 테스트")
+
+    files = {
+        '/files/m1/model.obj': b'v 0 0 0\nv 1 0 0\nv 0 1 0\nf 1 2 3\n' * 1000,
+        '/files/m1/texture.png': os.urandom(64 * 1024)
+    }
+    served = {'requests': 0, 'body_bytes': 0, 'not_modified': 0}
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            served['requests'] += 1
+            content = files.get(self.path)
+            if content is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+
+            etag = '"' + hashlib.md5(content).hexdigest() + '"'
+            if self.headers.get('If-None-Match') == etag:
+                served['not_modified'] += 1
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+            served['body_bytes'] += len(content)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cache_dir = tempfile.mkdtemp()
+
+    try:
+        # 기본(프로세스 전역) 캐시 대신 임시 디렉토리 사용 - 작업 디렉토리에 data/asset_cache를 만들지 않음
+        storage = WebServerStorage(asset_cache=AssetCache(cache_dir, max_bytes=1024 * 1024, fresh_seconds=0))
+        storage.download_url = f"http://127.0.0.1:{server.server_address[1]}/files"
+
+        # 첫 조회: 본문 전송
+        first = storage.download_file('m1/model.obj')
+        first_bytes = served['body_bytes']
+
+        # 재조회: 304 재검증만 (본문 0 bytes)
+        second = storage.download_file('m1/model.obj')
+        assert first == second == files['/files/m1/model.obj']
+        assert served['body_bytes'] == first_bytes, "재조회 시 본문이 다시 전송됨"
+        assert served['not_modified'] == 1
+
+        # 용량 한도 초과 시 LRU 제거
+        storage.asset_cache.max_bytes = len(files['/files/m1/texture.png'])
+        storage.download_file('m1/texture.png')
+        assert storage.asset_cache.lookup(storage.download_url + '/m1/model.obj') is None
+        assert storage.asset_cache.total_bytes() <= storage.asset_cache.max_bytes
+
+        print(f"✅ 요청 {served['requests']}회, 본문 전송 {served['body_bytes']:,} bytes, 304 응답 {served['not_modified']}회")
+    finally:
+        server.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_asset_cache()
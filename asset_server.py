@@ -0,0 +1,297 @@
+"""
+텍스처/메시 정적 에셋 서버
+뷰어 HTML에 base64로 넣던 파일들을 내용 해시 기반의 변하지 않는 URL로 제공해서
+브라우저 HTTP 캐시를 활용하고 Streamlit 웹소켓으로 보내는 HTML 크기를 줄임
+
+ASSET_BASE_URL이 설정된 경우에만 사용 (미설정 시 기존처럼 base64 인라인)
+- ASSET_SERVER_PORT를 함께 설정하면 프로세스 안에서 작은 HTTP 서버를 띄움
+- Streamlit 정적 파일 서빙(enableStaticServing)을 쓰는 경우 ASSET_DIR=static,
+  ASSET_BASE_URL=https://<앱 주소>/app/static 으로 설정 (캐시 헤더는 Streamlit 기본값)
+"""
+
+import os
+import re
+import hashlib
+import tempfile
+import threading
+import mimetypes
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# 에셋 서버 설정 (환경변수로 조정 가능)
+ASSET_BASE_URL = os.getenv('ASSET_BASE_URL', '').rstrip('/')
+ASSET_SERVER_HOST = os.getenv('ASSET_SERVER_HOST', '0.0.0.0')
+ASSET_SERVER_PORT = int(os.getenv('ASSET_SERVER_PORT', '0'))
+ASSET_DIR = os.getenv('ASSET_DIR', 'data/static_assets')
+ASSET_DIR_MAX_BYTES = int(os.getenv('ASSET_DIR_MAX_BYTES', str(4 * 1024 * 1024 * 1024)))  # 4GB
+
+# 내용 해시 URL은 절대 바뀌지 않으므로 1년 + immutable
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# 뷰어 HTML 안의 에셋 URL에서 파일 이름 추출
+ASSET_NAME_PATTERN = re.compile(r'/assets/([0-9a-f]{64}\.[a-z0-9]+)')
+
+CONTENT_TYPES = {
+    '.bin': 'application/octet-stream',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.webp': 'image/webp',
+    '.avif': 'image/avif'
+}
+
+def is_enabled():
+    """URL 기반 에셋 제공 사용 여부"""
+    return bool(ASSET_BASE_URL)
+
+def content_type_for(name):
+    ext = os.path.splitext(name)[1].lower()
+    return CONTENT_TYPES.get(ext) or mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+class AssetStore:
+    """내용 해시 이름으로 에셋 파일 저장 (같은 내용은 한 번만 저장)"""
+
+    def __init__(self, directory=ASSET_DIR, base_url=ASSET_BASE_URL, max_bytes=ASSET_DIR_MAX_BYTES):
+        self.directory = directory
+        self.base_url = base_url
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def asset_name(self, content, filename):
+        """sha256 + 원래 확장자 (확장자로 Content-Type 결정)"""
+        ext = os.path.splitext(filename)[1].lower()
+        return hashlib.sha256(content).hexdigest() + ext
+
+    def path_for(self, name):
+        return os.path.join(self.directory, name)
+
+    def publish(self, content, filename):
+        """에셋 저장 후 URL 반환"""
+        name = self.asset_name(content, filename)
+        path = self.path_for(name)
+
+        with self._lock:
+            if os.path.exists(path):
+                # 최근 사용 시간 갱신 (정리 시 LRU 기준)
+                os.utime(path, None)
+            else:
+                fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        f.write(content)
+                    os.replace(tmp_path, path)
+                except Exception:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+                self._prune()
+
+        return f"{self.base_url}/assets/{name}"
+
+    def touch(self, names):
+        """에셋들의 최근 사용 시간 갱신
+
+        캐시된 뷰어 HTML을 재사용할 때 호출해서 정리 대상에서 밀려나지 않도록 함
+
+        Returns:
+            bool: 모든 파일이 남아 있으면 True (하나라도 삭제되었으면 False)
+        """
+        with self._lock:
+            for name in names:
+                try:
+                    os.utime(self.path_for(name), None)
+                except FileNotFoundError:
+                    return False
+        return True
+
+    def _prune(self):
+        """용량 한도 초과 시 오래 사용하지 않은 파일부터 삭제 (호출자가 lock 보유)"""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+def make_handler(directory):
+    """에셋 디렉토리를 제공하는 요청 핸들러 클래스 생성"""
+
+    class AssetRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _resolve(self):
+            """/assets/<해시>.<확장자> → 파일 경로 (경로 조작 방지)"""
+            path = self.path.split('?', 1)[0]
+            if not path.startswith('/assets/'):
+                return None, None
+            name = path[len('/assets/'):]
+            if not name or '/' in name or '\\' in name or name.startswith('.'):
+                return None, None
+            file_path = os.path.join(directory, name)
+            return (name, file_path) if os.path.isfile(file_path) else (name, None)
+
+        def _send_common_headers(self, name):
+            self.send_header('Cache-Control', IMMUTABLE_CACHE_CONTROL)
+            self.send_header('ETag', f'"{os.path.splitext(name)[0]}"')
+            # 뷰어 iframe(srcdoc)에서 WebGL 텍스처로 쓰려면 CORS 허용 필요
+            self.send_header('Access-Control-Allow-Origin', '*')
+
+        def _serve(self, include_body):
+            name, file_path = self._resolve()
+            if file_path is None:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            if self.headers.get('If-None-Match') == f'"{os.path.splitext(name)[0]}"':
+                self.send_response(304)
+                self._send_common_headers(name)
+                self.end_headers()
+                return
+
+            size = os.path.getsize(file_path)
+            self.send_response(200)
+            self._send_common_headers(name)
+            self.send_header('Content-Type', content_type_for(name))
+            self.send_header('Content-Length', str(size))
+            self.end_headers()
+
+            if include_body:
+                with open(file_path, 'rb') as f:
+                    while True:
+                        chunk = f.read(256 * 1024)
+                        if not chunk:
+                            break
+                        self.wfile.write(chunk)
+
+        def do_GET(self):
+            self._serve(include_body=True)
+
+        def do_HEAD(self):
+            self._serve(include_body=False)
+
+        def do_OPTIONS(self):
+            self.send_response(204)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'GET, HEAD, OPTIONS')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    return AssetRequestHandler
+
+def start_asset_server(port=ASSET_SERVER_PORT, directory=ASSET_DIR, host=ASSET_SERVER_HOST):
+    """백그라운드 스레드에서 에셋 서버 시작"""
+    os.makedirs(directory, exist_ok=True)
+    server = ThreadingHTTPServer((host, port), make_handler(directory))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='asset-server', daemon=True).start()
+    print(f"[DEBUG] 에셋 서버 시작: {host}:{server.server_address[1]} ({directory})")
+    return server
+
+# 프로세스 전역 저장소/서버
+_asset_store = None
+_asset_server = None
+_asset_lock = threading.Lock()
+
+def get_asset_store():
+    """프로세스 전역 AssetStore 반환 (포트가 설정되어 있으면 서버도 한 번만 시작)"""
+    global _asset_store, _asset_server
+    if _asset_store is None:
+        with _asset_lock:
+            if _asset_store is None:
+                if ASSET_SERVER_PORT and _asset_server is None:
+                    try:
+                        _asset_server = start_asset_server()
+                    except OSError as e:
+                        # 다른 프로세스가 이미 같은 포트로 서비스 중이면 그대로 사용
+                        print(f"[DEBUG] 에셋 서버 시작 건너뜀: {e}")
+                _asset_store = AssetStore()
+    return _asset_store
+
+def publish_model_assets(texture_data, mesh_data=None, lod_data=None):
+    """뷰어에서 URL로 불러올 모델 에셋 등록
+
+    Returns:
+        dict | None: {'textures': {이름: URL}, 'mesh': URL, 'lods': [URL, ...]}
+                     에셋 서버를 쓰지 않으면 None
+    """
+    if not is_enabled():
+        return None
+
+    store = get_asset_store()
+    return {
+        'textures': {name: store.publish(data, name) for name, data in texture_data.items()},
+        'mesh': store.publish(mesh_data, 'model.bin') if mesh_data else None,
+        'lods': [store.publish(data, 'model.bin') for data in (lod_data or [])] if mesh_data else []
+    }
+
+def touch_published_assets(viewer_html):
+    """캐시된 뷰어 HTML이 참조하는 에셋의 사용 시간 갱신
+
+    Returns:
+        bool: HTML을 그대로 써도 되면 True, 참조하는 에셋이 정리되어 다시 등록해야 하면 False
+    """
+    if not is_enabled():
+        return True
+
+    names = set(ASSET_NAME_PATTERN.findall(viewer_html))
+    return get_asset_store().touch(names) if names else True
+
+# 테스트 함수
+def test_asset_server():
+    """캐시 헤더/조건부 요청 테스트"""
+    import shutil
+    import requests
+
+    print("🧪 에셋 서버 테스트")
+
+    directory = tempfile.mkdtemp()
+    server = start_asset_server(port=0, directory=directory, host='127.0.0.1')
+
+    try:
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        store = AssetStore(directory, base_url=base_url)
+        content = os.urandom(32 * 1024)
+        url = store.publish(content, 'texture.png')
+        assert url == store.publish(content, 'texture.png'), "같은 내용은 같은 URL"
+
+        response = requests.get(url, timeout=5)
+        assert response.status_code == 200 and response.content == content
+        assert response.headers['Cache-Control'] == IMMUTABLE_CACHE_CONTROL
+        assert response.headers['Content-Type'] == 'image/png'
+        assert response.headers['Access-Control-Allow-Origin'] == '*'
+
+        revalidated = requests.get(url, headers={'If-None-Match': response.headers['ETag']}, timeout=5)
+        assert revalidated.status_code == 304 and not revalidated.content
+
+        assert requests.get(f"{base_url}/assets/../asset_server.py", timeout=5).status_code == 404
+
+        # 캐시된 HTML이 참조하는 에셋은 사용 시간이 갱신되어 정리 대상에서 제외
+        names = ASSET_NAME_PATTERN.findall(f'<img src="{url}">')
+        assert names == [store.asset_name(content, 'texture.png')]
+        os.utime(store.path_for(names[0]), (0, 0))
+        assert store.touch(names) and os.path.getmtime(store.path_for(names[0])) > 0
+        os.remove(store.path_for(names[0]))
+        assert not store.touch(names), "삭제된 에셋은 다시 등록 필요"
+
+        print(f"✅ {url} - {len(content):,} bytes, 재검증 304")
+    finally:
+        server.shutdown()
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_asset_server()
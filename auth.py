@@ -3,9 +3,10 @@ import streamlit as st
 import hashlib
 import os
 import time
-import sqlite3
+from sqlite_pool import connect
 import uuid
 import requests
+import http_transport
 from datetime import datetime
 
 # 웹서버에서 인증 정보 가져오기 (PHP 프록시 경유)
@@ -14,9 +15,9 @@ def get_auth_config():
     """웹서버에서 인증 설정 가져오기 (PHP 프록시 사용)"""
     try:
         # PHP 프록시를 통해 pwkey.json 데이터 가져오기
-        response = requests.get(
+        response = http_transport.get(
             "http://decimate27.dothome.co.kr/streamlit_data/get_auth.php",
-            timeout=10,
+            endpoint='auth',
             headers={
                 "User-Agent": "Streamlit3DViewer/1.0"
             }
@@ -83,7 +84,7 @@ def hash_password(password):
 def init_session_db():
     """세션 데이터베이스 초기화"""
     os.makedirs(os.path.dirname(SESSION_DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(SESSION_DB_PATH)
+    conn = connect(SESSION_DB_PATH)
     cursor = conn.cursor()
     
     # 세션 테이블 생성
@@ -129,7 +130,7 @@ def create_db_session(user_id="admin"):
     session_id = str(uuid.uuid4())
     browser_id = get_browser_id()
     
-    conn = sqlite3.connect(SESSION_DB_PATH)
+    conn = connect(SESSION_DB_PATH)
     cursor = conn.cursor()
     
     try:
@@ -152,7 +153,7 @@ def validate_db_session(browser_id):
         return None
     
     init_session_db()
-    conn = sqlite3.connect(SESSION_DB_PATH)
+    conn = connect(SESSION_DB_PATH)
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -187,7 +188,7 @@ def validate_db_session(browser_id):
 
 def update_db_session_activity(session_id):
     """세션 활동 시간 업데이트"""
-    conn = sqlite3.connect(SESSION_DB_PATH)
+    conn = connect(SESSION_DB_PATH)
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -201,7 +202,7 @@ def update_db_session_activity(session_id):
 
 def delete_db_session(session_id):
     """세션 삭제"""
-    conn = sqlite3.connect(SESSION_DB_PATH)
+    conn = connect(SESSION_DB_PATH)
     cursor = conn.cursor()
     
     cursor.execute('DELETE FROM sessions WHERE session_id = ?', (session_id,))
@@ -214,7 +215,7 @@ def delete_browser_sessions(browser_id):
     if not browser_id:
         return
     
-    conn = sqlite3.connect(SESSION_DB_PATH)
+    conn = connect(SESSION_DB_PATH)
     cursor = conn.cursor()
     
     cursor.execute('DELETE FROM sessions WHERE browser_id = ?', (browser_id,))
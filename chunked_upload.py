@@ -0,0 +1,448 @@
+"""
+큰 파일 분할(chunked) 업로드 + 이어올리기
+한 번의 POST(30초 타임아웃)로 보내던 큰 OBJ를 고정 크기 청크로 나눠 보내고,
+실패하면 서버가 이미 받은 청크 다음부터 다시 보냄
+
+프로토콜 (upload_chunk.php, 모든 응답은 {"status": "success" | "error", ...} JSON)
+- action=init: model_id, filename, size, chunk_size, sha256
+    → upload_id, chunk_count, received(서버에 이미 있는 청크 번호 목록)
+    같은 model_id/filename/sha256/크기/청크 크기면 같은 upload_id (같은 저장 안에서 재시도할 때 이어올리기 -
+    save_model은 저장마다 새 model_id를 만들므로 다시 저장하면 처음부터 전송)
+- action=chunk (multipart): upload_id, index, checksum(청크 sha256), chunk(파일)
+    → 체크섬/크기 확인 후 저장, 불일치 시 error_code=checksum
+- action=complete: upload_id
+    → 청크를 순서대로 합치고 전체 sha256 확인 후 file_path 반환
+- action=abort: model_id
+    → 모델의 완료되지 않은 청크 삭제 (업로드 실패로 모델을 롤백할 때)
+
+서버가 이 엔드포인트를 지원하지 않으면(404) ChunkedUploadUnsupported를 발생시키고
+호출 측(WebServerStorage)은 기존 단일 POST 업로드로 돌아감
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import http_transport
+from multipart_stream import MultipartStream, as_byte_view
+
+# 분할 업로드 설정 (환경변수로 조정 가능)
+CHUNK_UPLOAD_SIZE = int(os.getenv('CHUNK_UPLOAD_SIZE', str(4 * 1024 * 1024)))              # 청크 크기
+CHUNK_UPLOAD_THRESHOLD = int(os.getenv('CHUNK_UPLOAD_THRESHOLD', str(16 * 1024 * 1024)))   # 이 크기 이상만 분할
+CHUNK_UPLOAD_CONCURRENCY = int(os.getenv('CHUNK_UPLOAD_CONCURRENCY', '2'))                 # 파일당 동시 청크 수
+CHUNK_UPLOAD_RETRIES = int(os.getenv('CHUNK_UPLOAD_RETRIES', '3'))                         # 청크별 재시도
+CHUNK_UPLOAD_BACKOFF = float(os.getenv('CHUNK_UPLOAD_BACKOFF', '0.5'))
+
+class ChunkedUploadUnsupported(Exception):
+    """서버에 분할 업로드 엔드포인트가 없음"""
+
+class ChunkedUploader:
+    """파일 1개를 분할 업로드 (UI 출력 없음 - 작업 스레드에서 호출)"""
+
+    def __init__(self, upload_url, chunk_size=CHUNK_UPLOAD_SIZE, concurrency=CHUNK_UPLOAD_CONCURRENCY,
+                 retries=CHUNK_UPLOAD_RETRIES, backoff=CHUNK_UPLOAD_BACKOFF):
+        self.upload_url = upload_url
+        self.chunk_size = max(1, chunk_size)
+        self.concurrency = max(1, concurrency)
+        self.retries = max(1, retries)
+        self.backoff = backoff
+
+        # 마지막 업로드 통계
+        self.stats = {'chunks': 0, 'sent': 0, 'skipped': 0, 'retries': 0}
+
+    def _call(self, endpoint, action, **kwargs):
+        """요청 1회 → (result, error, retryable)"""
+        try:
+            response = http_transport.post(self.upload_url, endpoint=endpoint, verify=False, **kwargs)
+        except Exception as e:
+            return None, f"네트워크 오류: {str(e)}", True
+
+        if response.status_code == 404 and action in ('init', 'abort'):
+            raise ChunkedUploadUnsupported(self.upload_url)
+        if response.status_code != 200:
+            retryable = response.status_code >= 500 or response.status_code == 429
+            return None, f"서버 오류: {response.status_code} - {response.text[:200]}", retryable
+
+        try:
+            result = response.json()
+        except (json.JSONDecodeError, ValueError):
+            return None, f"서버 응답 파싱 오류: {response.text[:100]}...", True
+
+        if result.get('status') != 'success':
+            # 체크섬 불일치는 전송 중 손상으로 보고 다시 보냄
+            return None, f"업로드 실패: {result.get('message')}", result.get('error_code') == 'checksum'
+        return result, None, False
+
+    def _send_chunk(self, view, upload_id, index, cancelled):
+        """청크 1개 전송 (청크 단위 재시도) → 오류 메시지 또는 None"""
+        start = index * self.chunk_size
+        chunk = view[start:start + self.chunk_size]
+        checksum = hashlib.sha256(chunk).hexdigest()
+
+        error = None
+        for attempt in range(1, self.retries + 1):
+            if cancelled.is_set():
+                return "다른 청크 실패로 중단"
+
+            # 재시도마다 처음부터 읽도록 새 스트림 생성 (청크는 업로드 버퍼의 memoryview 조각)
+            body = MultipartStream(
+                {'action': 'chunk', 'upload_id': upload_id, 'index': index, 'checksum': checksum},
+                'chunk', f'{index}.part', chunk
+            )
+            result, error, retryable = self._call(
+                'upload_chunk', 'chunk', data=body, headers={'Content-Type': body.content_type}
+            )
+            if result is not None:
+                return None
+            if not retryable or attempt == self.retries:
+                break
+            self.stats['retries'] += 1
+            time.sleep(self.backoff * (2 ** (attempt - 1)))
+        return f"청크 {index} {error}"
+
+    def upload(self, file_content, filename, model_id):
+        """분할 업로드 - 서버에 이미 있는 청크는 건너뜀
+
+        Returns:
+            tuple: (file_path, error_message, retryable) - WebServerStorage._post_file과 같은 형식
+        """
+        view = as_byte_view(file_content)
+        size = len(view)
+        chunk_count = max(1, -(-size // self.chunk_size))
+
+        result, error, retryable = self._call('upload', 'init', data={
+            'action': 'init',
+            'model_id': model_id,
+            'filename': filename,
+            'size': size,
+            'chunk_size': self.chunk_size,
+            'sha256': hashlib.sha256(view).hexdigest()
+        })
+        if result is None:
+            return None, error, retryable
+
+        upload_id = result['upload_id']
+        received = set(int(index) for index in result.get('received', []))
+        pending = [index for index in range(chunk_count) if index not in received]
+        self.stats = {'chunks': chunk_count, 'sent': len(pending), 'skipped': len(received), 'retries': 0}
+        if received:
+            print(f"[DEBUG] 분할 업로드 이어하기: {filename} - {len(received)}/{chunk_count} 청크 완료 상태")
+
+        cancelled = threading.Event()
+
+        def send(index):
+            chunk_error = self._send_chunk(view, upload_id, index, cancelled)
+            if chunk_error:
+                cancelled.set()
+            return chunk_error
+
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(pending)) or 1,
+                                thread_name_prefix='upload-chunk') as executor:
+            errors = [chunk_error for chunk_error in executor.map(send, pending) if chunk_error]
+        if errors:
+            # 받은 청크는 서버에 남아 있으므로 다음 시도에서 이어서 보냄
+            return None, errors[0], True
+
+        result, error, retryable = self._call('upload', 'complete', data={'action': 'complete', 'upload_id': upload_id})
+        if result is None:
+            return None, error, retryable
+        return result.get('file_path'), None, False
+
+    def abort(self, model_id):
+        """모델의 완료되지 않은 청크 삭제 요청 → 성공 여부 (엔드포인트가 없으면 ChunkedUploadUnsupported)"""
+        result, error, _ = self._call('upload', 'abort', data={'action': 'abort', 'model_id': model_id})
+        if result is None:
+            print(f"[DEBUG] 분할 업로드 청크 정리 실패: {model_id} - {error}")
+        return result is not None
+
+# 로컬 대체 서버 (테스트/개발용 - upload_chunk.php와 같은 프로토콜)
+class ChunkedUploadStore:
+    """청크를 디렉토리에 저장하고 완료 시 하나로 합치는 서버 측 저장소"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.parts_dir = os.path.join(directory, '.parts')
+        self._lock = threading.Lock()
+        os.makedirs(self.parts_dir, exist_ok=True)
+
+    def _meta_path(self, upload_id):
+        return os.path.join(self.parts_dir, upload_id, 'meta.json')
+
+    def _load_meta(self, upload_id):
+        if not upload_id or not upload_id.isalnum():
+            return None
+        try:
+            with open(self._meta_path(upload_id), 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _received(self, upload_id):
+        part_dir = os.path.join(self.parts_dir, upload_id)
+        return sorted(int(name[:-5]) for name in os.listdir(part_dir) if name.endswith('.part'))
+
+    def init(self, model_id, filename, size, chunk_size, sha256):
+        if not model_id.isalnum() or os.path.basename(filename) != filename or filename.startswith('.'):
+            return {'status': 'error', 'message': '잘못된 파일 경로'}
+        if size < 0 or chunk_size <= 0:
+            return {'status': 'error', 'message': '잘못된 크기'}
+
+        key = f"{model_id}/{filename}/{sha256}/{size}/{chunk_size}"
+        upload_id = hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+        meta = {
+            'model_id': model_id, 'filename': filename, 'size': size, 'chunk_size': chunk_size,
+            'sha256': sha256, 'chunk_count': max(1, -(-size // chunk_size))
+        }
+        with self._lock:
+            os.makedirs(os.path.join(self.parts_dir, upload_id), exist_ok=True)
+            if self._load_meta(upload_id) is None:
+                with open(self._meta_path(upload_id), 'w') as f:
+                    json.dump(meta, f)
+            received = self._received(upload_id)
+        return {'status': 'success', 'upload_id': upload_id, 'chunk_count': meta['chunk_count'], 'received': received}
+
+    def put_chunk(self, upload_id, index, checksum, data):
+        meta = self._load_meta(upload_id)
+        if meta is None:
+            return {'status': 'error', 'message': '알 수 없는 upload_id'}
+        if not 0 <= index < meta['chunk_count']:
+            return {'status': 'error', 'message': '잘못된 청크 번호'}
+
+        expected = min(meta['chunk_size'], meta['size'] - index * meta['chunk_size'])
+        if len(data) != expected or hashlib.sha256(data).hexdigest() != checksum:
+            return {'status': 'error', 'error_code': 'checksum', 'message': f'청크 {index} 체크섬/크기 불일치'}
+
+        # 임시 파일 → rename 으로 반쯤 쓰인 청크가 완료로 보이지 않게 함
+        part_path = os.path.join(self.parts_dir, upload_id, f'{index}.part')
+        with open(part_path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(part_path + '.tmp', part_path)
+        return {'status': 'success', 'index': index}
+
+    def complete(self, upload_id):
+        meta = self._load_meta(upload_id)
+        if meta is None:
+            return {'status': 'error', 'message': '알 수 없는 upload_id'}
+        with self._lock:
+            received = self._received(upload_id)
+            missing = [index for index in range(meta['chunk_count']) if index not in set(received)]
+            if missing:
+                return {'status': 'error', 'message': f'누락된 청크: {missing[:10]}'}
+
+            model_dir = os.path.join(self.directory, meta['model_id'])
+            os.makedirs(model_dir, exist_ok=True)
+            target = os.path.join(model_dir, meta['filename'])
+            digest = hashlib.sha256()
+            with open(target + '.tmp', 'wb') as out:
+                for index in range(meta['chunk_count']):
+                    with open(os.path.join(self.parts_dir, upload_id, f'{index}.part'), 'rb') as f:
+                        data = f.read()
+                    digest.update(data)
+                    out.write(data)
+            if digest.hexdigest() != meta['sha256']:
+                os.remove(target + '.tmp')
+                return {'status': 'error', 'message': '전체 파일 체크섬 불일치'}
+            os.replace(target + '.tmp', target)
+
+            part_dir = os.path.join(self.parts_dir, upload_id)
+            for name in os.listdir(part_dir):
+                os.remove(os.path.join(part_dir, name))
+            os.rmdir(part_dir)
+        return {'status': 'success', 'file_path': f"models/{meta['model_id']}/{meta['filename']}"}
+
+    def abort(self, model_id):
+        if not model_id.isalnum():
+            return {'status': 'error', 'message': '잘못된 model_id'}
+        removed = 0
+        with self._lock:
+            for upload_id in os.listdir(self.parts_dir):
+                meta = self._load_meta(upload_id)
+                if meta is None or meta['model_id'] != model_id:
+                    continue
+                part_dir = os.path.join(self.parts_dir, upload_id)
+                for name in os.listdir(part_dir):
+                    os.remove(os.path.join(part_dir, name))
+                os.rmdir(part_dir)
+                removed += 1
+        return {'status': 'success', 'removed': removed}
+
+def _parse_multipart(content_type, body):
+    """multipart 본문 → {필드명: bytes}"""
+    import email.parser
+    import email.policy
+
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        f'Content-Type: {content_type}\r\n\r\n'.encode('utf-8') + body
+    )
+    return {part.get_param('name', header='content-disposition'): part.get_payload(decode=True)
+            for part in message.iter_parts()}
+
+def make_handler(store, faults=None):
+    """분할 업로드 요청 핸들러 클래스 생성 (faults: 테스트용 장애 주입 설정 dict)"""
+    faults = faults if faults is not None else {}
+
+    class ChunkedUploadHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if self.path.split('?', 1)[0] != '/upload_chunk.php':
+                self._send_json(404, {'status': 'error', 'message': 'Not Found'})
+                return
+            content_type = self.headers.get('Content-Type', '')
+            if content_type.startswith('multipart/form-data'):
+                fields = _parse_multipart(content_type, body)
+                params = {name: value.decode('utf-8') for name, value in fields.items() if name != 'chunk'}
+            else:
+                fields = {}
+                params = {name: values[0] for name, values in parse_qs(body.decode('utf-8')).items()}
+
+            action = params.get('action')
+            try:
+                if action == 'init':
+                    self._send_json(200, store.init(
+                        params['model_id'], params['filename'], int(params['size']),
+                        int(params['chunk_size']), params['sha256']
+                    ))
+                elif action == 'chunk':
+                    with store._lock:
+                        faults['chunk_requests'] = faults.get('chunk_requests', 0) + 1
+                        fail = faults.get('fail_after') is not None and faults['chunk_requests'] > faults['fail_after']
+                    if fail:
+                        self._send_json(503, {'status': 'error', 'message': '일시적 장애 (테스트)'})
+                        return
+                    data = fields.get('chunk', b'')
+                    if faults.pop('corrupt_next', False):
+                        data = data[:-1] + bytes([data[-1] ^ 0xFF]) if data else data
+                    self._send_json(200, store.put_chunk(
+                        params['upload_id'], int(params['index']), params['checksum'], data
+                    ))
+                elif action == 'complete':
+                    self._send_json(200, store.complete(params['upload_id']))
+                elif action == 'abort':
+                    self._send_json(200, store.abort(params['model_id']))
+                else:
+                    self._send_json(400, {'status': 'error', 'message': f'알 수 없는 action: {action}'})
+            except (KeyError, ValueError) as e:
+                self._send_json(400, {'status': 'error', 'message': f'잘못된 요청: {e}'})
+
+        def log_message(self, format, *args):
+            pass
+
+    return ChunkedUploadHandler
+
+def start_chunked_upload_server(directory, port=0, host='127.0.0.1', faults=None):
+    """백그라운드 스레드에서 로컬 분할 업로드 서버 시작 (URL: http://host:port/upload_chunk.php)"""
+    store = ChunkedUploadStore(directory)
+    server = ThreadingHTTPServer((host, port), make_handler(store, faults))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='chunked-upload-server', daemon=True).start()
+    print(f"[DEBUG] 분할 업로드 서버 시작: {host}:{server.server_address[1]} ({directory})")
+    return server
+
+# 테스트 함수
+def test_chunked_upload():
+    """분할 업로드/체크섬 재전송/이어올리기 테스트"""
+    import shutil
+
+    print("🧪 분할 업로드 테스트")
+
+    directory = tempfile.mkdtemp()
+    faults = {}
+    server = start_chunked_upload_server(directory, faults=faults)
+    url = f"http://127.0.0.1:{server.server_address[1]}/upload_chunk.php"
+
+    try:
+        content = bytearray(os.urandom(10 * 64 * 1024 + 123))  # 청크 11개 (마지막은 짧음)
+
+        # 전송 중 손상된 청크는 체크섬 불일치로 다시 보냄
+        faults['corrupt_next'] = True
+        uploader = ChunkedUploader(url, chunk_size=64 * 1024, concurrency=3, backoff=0)
+        file_path, error, _ = uploader.upload(memoryview(content), 'model.obj', 'model1')
+        assert error is None, error
+        with open(os.path.join(directory, 'model1', 'model.obj'), 'rb') as f:
+            assert f.read() == bytes(content)
+        assert file_path == 'models/model1/model.obj'
+        assert uploader.stats['chunks'] == 11 and uploader.stats['retries'] == 1
+
+        # 중간에 서버 장애 → 실패, 장애 해소 후 남은 청크만 전송
+        faults.clear()
+        faults['fail_after'] = 4
+        uploader = ChunkedUploader(url, chunk_size=64 * 1024, concurrency=1, retries=2, backoff=0)
+        file_path, error, retryable = uploader.upload(bytes(content), 'model.obj', 'model2')
+        assert file_path is None and retryable
+
+        faults['fail_after'] = None
+        file_path, error, _ = uploader.upload(bytes(content), 'model.obj', 'model2')
+        assert error is None, error
+        assert uploader.stats['skipped'] == 4 and uploader.stats['sent'] == 7
+        resumed = dict(uploader.stats)
+        with open(os.path.join(directory, 'model2', 'model.obj'), 'rb') as f:
+            assert f.read() == bytes(content)
+        assert not os.listdir(os.path.join(directory, '.parts')), "완료 후 청크 정리"
+
+        # 실패 후 롤백 - 남은 청크 삭제
+        faults['fail_after'] = faults['chunk_requests'] + 2
+        assert uploader.upload(bytes(content), 'model.obj', 'model3')[0] is None
+        assert os.listdir(os.path.join(directory, '.parts'))
+        assert uploader.abort('model3')
+        assert not os.listdir(os.path.join(directory, '.parts')), "롤백 시 청크 정리"
+        faults['fail_after'] = None
+
+        # str 내용 (MTL)은 UTF-8로 인코딩해서 전송
+        text = "newmtl 재질\n" * 10000
+        file_path, error, _ = ChunkedUploader(url, chunk_size=64 * 1024, backoff=0).upload(text, 'model.mtl', 'model4')
+        assert error is None, error
+        with open(os.path.join(directory, 'model4', 'model.mtl'), 'rb') as f:
+            assert f.read() == text.encode('utf-8')
+
+        # 엔드포인트가 없는 서버 → 단일 업로드로 돌아가도록 예외
+        try:
+            ChunkedUploader(url.replace('upload_chunk.php', 'missing.php')).upload(b'x', 'a.obj', 'm')
+            raise AssertionError("404는 ChunkedUploadUnsupported")
+        except ChunkedUploadUnsupported:
+            pass
+
+        print(f"✅ 손상 청크 재전송, 이어올리기 {resumed}, 롤백 청크 정리, str 내용 전송")
+    finally:
+        server.shutdown()
+        shutil.rmtree(directory, ignore_errors=True)
+
+def benchmark_chunked_upload(size_mb=64, chunk_mb=4):
+    """로컬 서버 대상 분할 업로드 처리량"""
+    import shutil
+
+    print(f"⏱️ 분할 업로드 벤치마크: {size_mb}MB, 청크 {chunk_mb}MB")
+
+    directory = tempfile.mkdtemp()
+    server = start_chunked_upload_server(directory)
+    url = f"http://127.0.0.1:{server.server_address[1]}/upload_chunk.php"
+    try:
+        content = os.urandom(1024 * 1024) * size_mb
+        for concurrency in (1, CHUNK_UPLOAD_CONCURRENCY):
+            uploader = ChunkedUploader(url, chunk_size=chunk_mb * 1024 * 1024, concurrency=concurrency)
+            started = time.perf_counter()
+            file_path, error, _ = uploader.upload(content, 'model.obj', f'bench{concurrency}')
+            seconds = time.perf_counter() - started
+            assert error is None, error
+            print(f"   동시 {concurrency}: {size_mb / seconds:,.0f}MB/s ({uploader.stats['chunks']}개 청크)")
+    finally:
+        server.shutdown()
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_chunked_upload()
+    benchmark_chunked_upload()
@@ -0,0 +1,106 @@
+"""
+GPU 압축 텍스처(Basis Universal) 변환
+최적화된 PNG/JPEG 텍스처마다 .basis 파생본을 만들어 두면 뷰어가 기기에 맞는
+GPU 압축 형식(ASTC/ETC/BC/PVRTC)으로 트랜스코딩해서 사용
+- 2K 텍스처 기준 RGBA 16MB(+밉맵) → 2~4MB, 브라우저 이미지 디코딩도 생략
+- 뷰어(three.js r128)의 BasisTextureLoader 호환을 위해 KTX2 대신 .basis 컨테이너 사용
+
+basisu CLI(https://github.com/BinomialLLC/basis_universal)가 필요하며 선택 기능:
+COMPRESSED_TEXTURES=1 이고 basisu를 찾은 경우에만 사용
+(업로드 서버가 .basis 확장자를 허용해야 함)
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import subprocess
+from PIL import Image
+
+# 압축 텍스처 설정 (환경변수로 조정 가능)
+COMPRESSED_TEXTURES = os.getenv('COMPRESSED_TEXTURES', '0') == '1'
+BASISU_PATH = os.getenv('BASISU_PATH') or shutil.which('basisu')
+BASIS_MODE = os.getenv('BASIS_MODE', 'etc1s')          # etc1s(작음) | uastc(고품질)
+BASIS_QUALITY = int(os.getenv('BASIS_QUALITY', '192'))  # etc1s 품질 (1~255)
+BASIS_TIMEOUT = int(os.getenv('BASIS_TIMEOUT', '120'))  # 텍스처 1개 변환 제한 시간 (초)
+
+# 원본 텍스처 이름 뒤에 붙는 확장자 (예: body.jpg → body.jpg.basis)
+BASIS_SUFFIX = '.basis'
+
+def is_available():
+    """압축 텍스처 생성 가능 여부"""
+    return COMPRESSED_TEXTURES and bool(BASISU_PATH)
+
+def settings_key():
+    """변환 설정 문자열 (texture_cache 키에 포함)"""
+    return f"basis-{BASIS_MODE}-{BASIS_QUALITY}"
+
+def variant_name(filename):
+    """텍스처 이름 → 압축 파생본 이름"""
+    return filename + BASIS_SUFFIX
+
+def is_variant(name):
+    return name.lower().endswith(BASIS_SUFFIX)
+
+def source_name(name):
+    """압축 파생본 이름 → 원본 텍스처 이름"""
+    return name[:-len(BASIS_SUFFIX)]
+
+def encode_basis(data):
+    """PNG/JPEG 바이트 → .basis 바이트 (실패 시 None)
+
+    three.js 압축 텍스처는 flipY를 지원하지 않으므로 변환할 때 상하 반전하고 밉맵을 미리 생성
+    """
+    if not BASISU_PATH:
+        return None
+
+    work_dir = tempfile.mkdtemp(prefix='basisu_')
+    try:
+        # basisu 버전별 입력 형식 차이를 피하기 위해 PNG로 통일
+        source_path = os.path.join(work_dir, 'texture.png')
+        output_path = os.path.join(work_dir, 'texture.basis')
+        with Image.open(io.BytesIO(data)) as img:
+            if img.mode not in ('RGB', 'RGBA'):
+                img = img.convert('RGBA' if 'A' in img.getbands() or 'transparency' in img.info else 'RGB')
+            img.save(source_path, format='PNG', compress_level=1)
+
+        command = [BASISU_PATH, '-file', source_path, '-output_file', output_path, '-mipmap', '-y_flip']
+        if BASIS_MODE == 'uastc':
+            command.append('-uastc')
+        else:
+            command.extend(['-q', str(BASIS_QUALITY)])
+
+        completed = subprocess.run(command, cwd=work_dir, capture_output=True, timeout=BASIS_TIMEOUT)
+        if completed.returncode != 0 or not os.path.exists(output_path):
+            print(f"[DEBUG] basisu 변환 실패 ({completed.returncode}): {completed.stderr[-300:]!r}")
+            return None
+
+        with open(output_path, 'rb') as f:
+            return f.read()
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"[DEBUG] basisu 실행 오류: {e}")
+        return None
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+# 테스트 함수
+def test_compressed_texture():
+    """파생본 이름 규칙 + (basisu가 있으면) 실제 변환 테스트"""
+    print("🧪 압축 텍스처 테스트")
+
+    name = variant_name('body.jpg')
+    assert name == 'body.jpg.basis' and is_variant(name) and not is_variant('body.jpg')
+    assert source_name(name) == 'body.jpg'
+
+    if not BASISU_PATH:
+        print("⚠️ basisu 없음 - 변환 테스트 생략")
+        return
+
+    output = io.BytesIO()
+    Image.new('RGB', (256, 256), color='red').save(output, format='JPEG')
+    basis = encode_basis(output.getvalue())
+    assert basis and basis[:2] == b'sB', "basis 파일 시그니처"
+    print(f"✅ 256px JPEG → {len(basis):,} bytes .basis")
+
+if __name__ == "__main__":
+    test_compressed_texture()
@@ -2,28 +2,199 @@ import json
 import os
 import uuid
 import shutil
+import threading
 from datetime import datetime
 import pytz
 from pathlib import Path
-import sqlite3
+from sqlite_pool import connect, close_pool
 from web_storage import WebServerStorage, LocalBackupStorage
-from web_db_sync import WebDBSync
+from web_db_sync import get_sync_worker
+from viewer_cache import get_viewer_cache
+from view_counter import get_view_counter, close_view_counter
 import streamlit as st
 
 # 한국 시간대 설정
 KST = pytz.timezone('Asia/Seoul')
 
+# 이 프로세스에서 init_db를 이미 마친 DB (절대 경로 → 컴파일된 조회 쿼리)
+_initialized_dbs = {}
+_initialized_lock = threading.Lock()
+
+def _table_columns(cursor, table):
+    """테이블 컬럼 이름 목록"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [column[1] for column in cursor.fetchall()]
+
+def _migration_annotation_lookup_index(cursor):
+    """수정점 조회(WHERE model_token = ? ORDER BY created_at)와 모델별 삭제용 복합 인덱스"""
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_annotations_model_token_created_at
+        ON annotations(model_token, created_at)
+    ''')
+
+def _migration_share_token_covering_index(cursor):
+    """공유 링크 조회(get_model_by_token)가 테이블을 읽지 않도록 커버링 인덱스"""
+    wanted = ['share_token', 'id', 'name', 'author', 'description', 'file_paths',
+              'backup_paths', 'storage_type', 'real_height']
+    columns = _table_columns(cursor, 'models')
+    cursor.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_models_share_token_covering
+        ON models({', '.join(column for column in wanted if column in columns)})
+    ''')
+
+def _migration_view_count_batches(cursor):
+    """조회수 지연 기록(view_counter) 배치 적용 이력 - 재시작 시 같은 배치 중복 반영 방지"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS view_count_batches (
+            batch_id TEXT PRIMARY KEY,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+def _migration_sync_state(cursor):
+    """웹서버 변경분 동기화 기준점(high-water mark) 저장 테이블"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+
+# 스키마 마이그레이션 목록 (버전, 설명, 적용 함수) - PRAGMA user_version으로 적용 여부 관리
+# 새 마이그레이션은 항상 마지막에 다음 버전 번호로 추가
+SCHEMA_MIGRATIONS = [
+    (1, "annotations(model_token, created_at) 인덱스", _migration_annotation_lookup_index),
+    (2, "models share_token 커버링 인덱스", _migration_share_token_covering_index),
+    (3, "조회수 배치 적용 이력 테이블", _migration_view_count_batches),
+    (4, "웹 동기화 기준점 테이블", _migration_sync_state),
+]
+
+def run_migrations(conn, migrations=SCHEMA_MIGRATIONS):
+    """아직 적용되지 않은 마이그레이션을 순서대로 적용 (각 버전은 하나의 트랜잭션)
+
+    Returns:
+        list: 이번에 적용된 (버전, 설명) 목록
+    """
+    cursor = conn.cursor()
+    cursor.execute('PRAGMA user_version')
+    current_version = cursor.fetchone()[0]
+
+    applied = []
+    for version, description, migrate in migrations:
+        if version <= current_version:
+            continue
+
+        try:
+            cursor.execute('BEGIN')
+            migrate(cursor)
+            cursor.execute(f'PRAGMA user_version = {int(version)}')
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+
+        print(f"[DEBUG] 스키마 마이그레이션 적용: v{version} - {description}")
+        applied.append((version, description))
+        current_version = version
+
+    return applied
+
+# 모델 목록/공유 조회 결과 필드 (이름, 컬럼이 없는 스키마에서 쓸 SQL 기본값)
+MODEL_LIST_FIELDS = [
+    ('id', None), ('name', None), ('author', "''"), ('description', None),
+    ('created_at', None), ('access_count', '0'), ('share_token', None),
+    ('storage_type', "'local'"), ('real_height', '1.0')
+]
+MODEL_TOKEN_FIELDS = [
+    ('id', None), ('name', None), ('author', "''"), ('description', "''"),
+    ('file_paths', None), ('backup_paths', 'NULL'), ('storage_type', "'local'"),
+    ('share_token', None), ('real_height', '1.0')
+]
+LEGACY_TOKEN_FIELDS = [
+    ('id', None), ('name', None), ('author', "''"), ('description', None),
+    ('obj_path', None), ('mtl_path', None), ('texture_paths', None),
+    ('storage_type', "'local'"), ('share_token', None)
+]
+
+def _select_list(fields, columns):
+    """스키마에 없는 컬럼은 기본값으로 채운 SELECT 목록 (real_height NULL도 기본값)"""
+    expressions = []
+    for name, default in fields:
+        if name not in columns:
+            expressions.append(f"{default} AS {name}")
+        elif name == 'real_height':
+            expressions.append(f"COALESCE(real_height, {default}) AS real_height")
+        else:
+            expressions.append(name)
+    return ', '.join(expressions)
+
+def _make_row_factory(names, json_fields=(), json_defaults=None):
+    """고정된 컬럼 순서로 dict를 만드는 cursor.row_factory"""
+    json_defaults = json_defaults or {}
+    json_positions = [(names.index(name), json_defaults.get(name)) for name in json_fields]
+
+    def row_factory(cursor, row):
+        model = dict(zip(names, row))
+        for position, default in json_positions:
+            value = row[position]
+            model[names[position]] = json.loads(value) if value else (
+                default() if callable(default) else default
+            )
+        return model
+
+    return row_factory
+
+def compile_model_queries(columns, indexes=()):
+    """스키마(컬럼/인덱스)에 맞는 SQL과 row factory를 한 번만 생성
+
+    Returns:
+        dict: list_sql/list_row, token_sql/token_row
+    """
+    list_names = [name for name, _ in MODEL_LIST_FIELDS]
+    queries = {
+        'list_sql': f"SELECT {_select_list(MODEL_LIST_FIELDS, columns)} FROM models ORDER BY created_at DESC",
+        'list_row': _make_row_factory(list_names)
+    }
+
+    if 'file_paths' in columns:
+        # UNIQUE 제약 인덱스 대신 커버링 인덱스 사용 (테이블 조회 생략)
+        hint = ' INDEXED BY idx_models_share_token_covering' if 'idx_models_share_token_covering' in indexes else ''
+        fields = MODEL_TOKEN_FIELDS
+        row_factory = _make_row_factory(
+            [name for name, _ in fields], json_fields=('file_paths', 'backup_paths'), json_defaults={'file_paths': dict}
+        )
+    else:
+        # 구 스키마 (호환성)
+        hint = ''
+        fields = LEGACY_TOKEN_FIELDS
+        row_factory = _make_row_factory(
+            [name for name, _ in fields], json_fields=('texture_paths',), json_defaults={'texture_paths': list}
+        )
+
+    queries['token_sql'] = f"SELECT {_select_list(fields, columns)} FROM models{hint} WHERE share_token = ?"
+    queries['token_row'] = row_factory
+    return queries
+
 def reset_database(db_path="data/models.db"):
     """데이터베이스 완전 초기화 (문제 해결용)"""
+    # 남은 조회수를 반영하고, 풀의 연결을 닫아야 WAL 내용이 DB 파일에 반영됨
+    close_view_counter(db_path)
+    close_pool(db_path)
+    with _initialized_lock:
+        _initialized_dbs.pop(os.path.abspath(db_path), None)
+
     if os.path.exists(db_path):
         kst_now = datetime.now(KST)
         backup_path = f"{db_path}.backup_{kst_now.strftime('%Y%m%d_%H%M%S')}"
         shutil.copy2(db_path, backup_path)
         st.write(f"🔄 기존 DB를 {backup_path}로 백업")
         os.remove(db_path)
+        for suffix in ('-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
     
     # 새 데이터베이스 생성
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path)
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -49,18 +220,28 @@ class ModelDatabase:
     def __init__(self, db_path="data/models.db", auto_sync=True):
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        self.init_db()
+
+        # 스키마 확인/마이그레이션은 프로세스당 한 번만
+        key = os.path.abspath(db_path)
+        queries = _initialized_dbs.get(key)
+        if queries is None:
+            with _initialized_lock:
+                queries = _initialized_dbs.get(key)
+                if queries is None:
+                    self.init_db()
+                    queries = _initialized_dbs[key] = self._queries
+        self._queries = queries
+
         self.web_storage = WebServerStorage()
         self.local_backup = LocalBackupStorage()
-        self.web_db_sync = WebDBSync()
-        
-        # 초기화 시 자동 동기화 (옵션)
-        if auto_sync:
-            self.auto_sync_with_web()
+
+        # 웹 DB 동기화는 프로세스 공용 백그라운드 워커가 담당 (생성자에서 네트워크 대기 없음)
+        self.sync_worker = get_sync_worker(db_path, start=auto_sync)
+        self.web_db_sync = self.sync_worker.sync
     
     def init_db(self):
         """데이터베이스 초기화"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         # 기존 테이블 구조 확인
@@ -188,11 +369,19 @@ class ModelDatabase:
                 FOREIGN KEY (model_token) REFERENCES models(share_token) ON DELETE CASCADE
             )
         ''')
-        
+
         conn.commit()
+
+        # 인덱스 등 버전 관리되는 스키마 변경 적용
+        run_migrations(conn)
+
+        # 최종 스키마 기준으로 조회 SQL/row factory 준비 (호출마다 PRAGMA 조회하지 않음)
+        cursor.execute("PRAGMA index_list(models)")
+        indexes = [index[1] for index in cursor.fetchall()]
+        self._queries = compile_model_queries(_table_columns(cursor, 'models'), indexes)
         conn.close()
     
-    def save_model(self, name, author, description, obj_content, mtl_content, texture_data, real_height=1.0):
+    def save_model(self, name, author, description, obj_content, mtl_content, texture_data, real_height=1.0, mesh_data=None, lod_data=None):
         """모델 저장 (웹서버 + 로컬 백업)"""
         model_id = str(uuid.uuid4()).replace('-', '')  # 하이픈 제거
         share_token = str(uuid.uuid4())
@@ -203,7 +392,8 @@ class ModelDatabase:
         st.write("🌐 웹서버 저장 시도 중...")
         file_paths = self.web_storage.save_model_to_server(
             model_id, obj_content, mtl_content, texture_data, 
-            name, author, description, share_token, real_height
+            name, author, description, share_token, real_height,
+            mesh_data=mesh_data, lod_data=lod_data
         )
         
         storage_type = 'web'
@@ -216,7 +406,7 @@ class ModelDatabase:
             # 성공 시 로컬 백업도 저장
             st.write("💾 로컬 백업 저장 중...")
             backup_paths = self.local_backup.save_model_backup(
-                model_id, obj_content, mtl_content, texture_data
+                model_id, obj_content, mtl_content, texture_data, mesh_data=mesh_data, lod_data=lod_data
             )
             if backup_paths:
                 st.write("✅ 로컬 백업 완료")
@@ -224,7 +414,7 @@ class ModelDatabase:
             st.error("❌ 웹서버 저장 실패 - 로컬 저장으로 폴백")
             # 웹서버 실패 시 로컬에만 저장
             file_paths = self.local_backup.save_model_backup(
-                model_id, obj_content, mtl_content, texture_data
+                model_id, obj_content, mtl_content, texture_data, mesh_data=mesh_data, lod_data=lod_data
             )
             storage_type = 'local'
             
@@ -233,7 +423,7 @@ class ModelDatabase:
             st.warning("⚠️ 로컬 저장으로 처리됨 (임시)")
         
         # 데이터베이스에 저장
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         # 한국 시간으로 created_at 설정
@@ -256,154 +446,35 @@ class ModelDatabase:
     
     def get_all_models(self):
         """모든 모델 목록 조회"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
-        
-        # 테이블 구조 확인
-        cursor.execute("PRAGMA table_info(models)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        if 'real_height' in columns:
-            # 최신 스키마 (real_height 포함)
-            cursor.execute('''
-                SELECT id, name, author, description, created_at, access_count, share_token, storage_type, real_height
-                FROM models ORDER BY created_at DESC
-            ''')
-        elif 'storage_type' in columns:
-            # 중간 스키마 (real_height 없음)
-            cursor.execute('''
-                SELECT id, name, author, description, created_at, access_count, share_token, storage_type
-                FROM models ORDER BY created_at DESC
-            ''')
-        else:
-            # 구 스키마 (호환성)
-            cursor.execute('''
-                SELECT id, name, description, created_at, access_count, share_token
-                FROM models ORDER BY created_at DESC
-            ''')
-        
-        models = []
-        for row in cursor.fetchall():
-            if len(row) >= 9:  # 최신 스키마 (real_height 포함)
-                models.append({
-                    'id': row[0],
-                    'name': row[1],
-                    'author': row[2],
-                    'description': row[3],
-                    'created_at': row[4],
-                    'access_count': row[5],
-                    'share_token': row[6],
-                    'storage_type': row[7],
-                    'real_height': row[8] if row[8] is not None else 1.0
-                })
-            elif len(row) >= 8:  # 중간 스키마 (real_height 없음)
-                models.append({
-                    'id': row[0],
-                    'name': row[1],
-                    'author': row[2],
-                    'description': row[3],
-                    'created_at': row[4],
-                    'access_count': row[5],
-                    'share_token': row[6],
-                    'storage_type': row[7],
-                    'real_height': 1.0  # 기본값
-                })
-            elif len(row) >= 7:  # 구 스키마 (author 포함)
-                models.append({
-                    'id': row[0],
-                    'name': row[1],
-                    'author': row[2],
-                    'description': row[3],
-                    'created_at': row[4],
-                    'access_count': row[5],
-                    'share_token': row[6],
-                    'storage_type': 'local',
-                    'real_height': 1.0  # 기본값
-                })
-            else:  # 아주 구 스키마 (author 없음)
-                models.append({
-                    'id': row[0],
-                    'name': row[1],
-                    'author': '',  # 기본값
-                    'description': row[2],
-                    'created_at': row[3],
-                    'access_count': row[4],
-                    'share_token': row[5],
-                    'storage_type': 'local',
-                    'real_height': 1.0  # 기본값
-                })
-        
+        cursor.row_factory = self._queries['list_row']
+
+        cursor.execute(self._queries['list_sql'])
+        models = cursor.fetchall()
+
         conn.close()
         return models
     
     def get_model_by_token(self, share_token):
         """공유 토큰으로 모델 조회"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
-        
-        # 테이블 구조 확인
-        cursor.execute("PRAGMA table_info(models)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        if 'file_paths' in columns:
-            # 새 스키마
-            cursor.execute('''
-                SELECT id, name, author, description, file_paths, backup_paths, storage_type, share_token, real_height
-                FROM models WHERE share_token = ?
-            ''', (share_token,))
-        else:
-            # 구 스키마 (호환성)
-            cursor.execute('''
-                SELECT id, name, description, obj_path, mtl_path, texture_paths, share_token
-                FROM models WHERE share_token = ?
-            ''', (share_token,))
-        
-        row = cursor.fetchone()
-        if row:
-            # 접근 횟수 증가
-            cursor.execute('''
-                UPDATE models 
-                SET access_count = access_count + 1, 
-                    last_accessed = CURRENT_TIMESTAMP
-                WHERE share_token = ?
-            ''', (share_token,))
-            conn.commit()
-            
-            if 'file_paths' in columns:
-                # 새 스키마
-                model = {
-                    'id': row[0],
-                    'name': row[1],
-                    'author': row[2] if len(row) > 2 else '',
-                    'description': row[3] if len(row) > 3 else '',
-                    'file_paths': json.loads(row[4]) if len(row) > 4 and row[4] else {},
-                    'backup_paths': json.loads(row[5]) if len(row) > 5 and row[5] else None,
-                    'storage_type': row[6] if len(row) > 6 else 'local',
-                    'share_token': row[7] if len(row) > 7 else share_token,
-                    'real_height': row[8] if len(row) > 8 else 1.0
-                }
-            else:
-                # 구 스키마 (호환성)
-                model = {
-                    'id': row[0],
-                    'name': row[1],
-                    'author': '',  # 기본값
-                    'description': row[2],
-                    'obj_path': row[3],
-                    'mtl_path': row[4],
-                    'texture_paths': json.loads(row[5]),
-                    'storage_type': 'local',
-                    'share_token': row[6] if len(row) > 6 else share_token
-                }
-        else:
-            model = None
-        
+        cursor.row_factory = self._queries['token_row']
+
+        cursor.execute(self._queries['token_sql'], (share_token,))
+        model = cursor.fetchone()
         conn.close()
+
+        if model:
+            # 접근 횟수 증가 - 조회 경로에서는 기록만 하고 DB 반영은 배치로
+            get_view_counter(self.db_path).record(share_token)
+
         return model
     
     def delete_model(self, model_id):
         """모델 삭제"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         # 모델 정보 조회 (share_token 포함)
@@ -435,6 +506,9 @@ class ModelDatabase:
             cursor.execute('DELETE FROM models WHERE id = ?', (model_id,))
             conn.commit()
             conn.close()
+            
+            # 렌더링된 뷰어 캐시 무효화
+            get_viewer_cache().invalidate_model(model_id, share_token)
             return True
         
         conn.close()
@@ -442,7 +516,7 @@ class ModelDatabase:
     
     def get_model_count(self):
         """저장된 모델 수 조회"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute('SELECT COUNT(*) FROM models')
@@ -454,7 +528,7 @@ class ModelDatabase:
     # ============ Annotations 관련 메서드 ============
     def add_annotation(self, model_token, position, text):
         """수정점 추가"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -466,11 +540,12 @@ class ModelDatabase:
         conn.commit()
         conn.close()
         
+        get_viewer_cache().invalidate_token(model_token)
         return annotation_id
     
     def get_annotations(self, model_token):
         """특정 모델의 모든 수정점 가져오기"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -492,9 +567,9 @@ class ModelDatabase:
         conn.close()
         return annotations
     
-    def update_annotation_status(self, annotation_id, completed):
+    def update_annotation_status(self, annotation_id, completed, model_token=None):
         """수정점 상태 업데이트 (완료/미완료)"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -505,30 +580,36 @@ class ModelDatabase:
         
         conn.commit()
         conn.close()
+        
+        get_viewer_cache().invalidate_token(model_token)
     
-    def delete_annotation(self, annotation_id):
+    def delete_annotation(self, annotation_id, model_token=None):
         """수정점 삭제"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute('DELETE FROM annotations WHERE id = ?', (annotation_id,))
         
         conn.commit()
         conn.close()
+        
+        get_viewer_cache().invalidate_token(model_token)
     
     def delete_model_annotations(self, model_token):
         """모델의 모든 수정점 삭제"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute('DELETE FROM annotations WHERE model_token = ?', (model_token,))
         
         conn.commit()
         conn.close()
+        
+        get_viewer_cache().invalidate_token(model_token)
     
     def update_model_height(self, model_id, height):
         """모델의 실제 높이 업데이트"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -539,6 +620,7 @@ class ModelDatabase:
             ''', (height, model_id))
             
             conn.commit()
+            get_viewer_cache().invalidate_model(model_id)
             return True
         except Exception as e:
             print(f"Error updating model height: {e}")
@@ -552,8 +634,8 @@ class ModelDatabase:
             if show_progress:
                 st.info("🔄 웹서버 DB와 동기화를 시작합니다...")
             
-            # WebDBSync 클래스를 사용하여 동기화
-            success = self.web_db_sync.sync_databases(show_progress=show_progress)
+            # 백그라운드 동기화가 실행 중이면 끝날 때까지 기다렸다가 실행 (동시 실행 방지)
+            success = self.sync_worker.run_once(full=True, show_progress=show_progress, wait=True)
             
             if success and show_progress:
                 st.success("✅ 웹서버 DB와 동기화가 완료되었습니다!")
@@ -567,13 +649,12 @@ class ModelDatabase:
             return False
     
     def auto_sync_with_web(self):
-        """앱 시작 시 자동 동기화 (조용히)"""
+        """변경분 동기화를 지금 실행 (조용히) - 평소에는 백그라운드 워커가 주기적으로 실행"""
         try:
-            # 동기화 필요 여부 빠르게 확인
-            if self.web_db_sync.quick_sync_check():
-                # 동기화 필요하면 수행 (UI 표시 없음)
-                self.web_db_sync.sync_databases(show_progress=False)
-                return True
+            # 마지막 기준점 이후 변경분만 받아서 반영 (UI 표시 없음)
+            if self.sync_worker.run_once(wait=True):
+                summary = self.sync_worker.status()['last_summary']
+                return bool(summary and any(summary.values()))
             return False
         except:
             # 자동 동기화 실패 시 조용히 넘어감
@@ -583,16 +664,20 @@ class ModelDatabase:
         """동기화 상태 확인"""
         try:
             # 로컬 DB 모델 수
-            conn = sqlite3.connect(self.db_path)
+            conn = connect(self.db_path)
             cursor = conn.cursor()
             cursor.execute("SELECT COUNT(*) FROM models")
             local_count = cursor.fetchone()[0]
             conn.close()
             
-            # 웹서버 DB 확인은 필요시에만
+            # 웹서버 DB 확인은 백그라운드 워커의 마지막 결과 사용
+            status = self.sync_worker.status()
             return {
                 'local_count': local_count,
-                'synced': True  # 기본적으로 동기화됨으로 표시
+                'synced': status['last_error'] is None,
+                'syncing': status['running'],
+                'last_sync': status['last_success'],
+                'last_error': status['last_error']
             }
         except:
             return {
@@ -608,15 +693,11 @@ def load_model_files(model_data):
     storage_type = model_data.get('storage_type', 'local')
     
     if storage_type == 'web':
-        # 웹서버에서 로드 시도
-        result = web_storage.load_model_from_server(model_data['file_paths'])
+        # 웹서버에서 로드 시도 (실패한 파일만 로컬 백업에서 보충)
+        result = web_storage.load_model_from_server(model_data['file_paths'], model_data.get('backup_paths'))
         
         if result[0] is not None:  # 성공
             return result
-        
-        # 웹서버 실패 시 로컬 백업에서 로드
-        if model_data.get('backup_paths'):
-            return local_backup.load_model_backup(model_data['backup_paths'])
     else:
         # 구 형식 호환성 - obj_path가 있으면 구 형식
         if 'obj_path' in model_data:
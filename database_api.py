@@ -4,12 +4,87 @@
 로컬 SQLite 의존성 완전 제거
 """
 
+import os
 import json
 import uuid
 import requests
+import threading
 import streamlit as st
-from datetime import datetime
+from collections import OrderedDict
+import http_transport
 from web_storage import WebServerStorage, LocalBackupStorage
+from viewer_cache import get_viewer_cache
+from metadata_cache import get_metadata_cache
+from mesh_compiler import MESH_FILENAME
+from mesh_lod import LOD_TARGETS, lod_filename
+from texture_names import is_pyramid_level
+from compressed_texture import is_variant as is_compressed_variant, source_name as compressed_source_name
+
+# 모델 목록 페이지 설정
+MODELS_PAGE_SIZE = int(os.getenv('MODELS_PAGE_SIZE', '20'))
+MODELS_PAGE_MAX = 200
+MODEL_SORT_FIELDS = ('created_at', 'name', 'author', 'access_count')
+
+# 메시/LOD 경로가 저장되지 않은 모델의 추측 경로 확인 결과 (모델 폴더 → 받은 LOD 수, 메시 없음은 None)
+# 한 번 404가 난 모델은 다시 추측하지 않아서 메시 404 → OBJ 재요청이 매번 반복되지 않음
+# (시간 초과/5xx 같은 일시적 오류는 기록하지 않음)
+MESH_PROBE_CACHE_SIZE = int(os.getenv('MESH_PROBE_CACHE_SIZE', '4096'))
+_mesh_probes = OrderedDict()
+_mesh_probes_lock = threading.Lock()
+
+def _normalize_model(model):
+    """API 응답 모델 정리 - file_paths JSON 파싱, 메시/LOD 경로 병합, real_height 기본값"""
+    if isinstance(model.get('file_paths'), str):
+        try:
+            model['file_paths'] = json.loads(model['file_paths'])
+        except:
+            model['file_paths'] = {}
+    
+    # save_model에서 함께 저장한 메시/LOD 경로 (별도 필드로 반환되는 경우)
+    if isinstance(model.get('file_paths'), dict):
+        if model.get('mesh_path'):
+            model['file_paths'].setdefault('mesh_path', model['mesh_path'])
+        lod_paths = model.get('lod_paths')
+        if isinstance(lod_paths, str):
+            try:
+                lod_paths = json.loads(lod_paths)
+            except ValueError:
+                lod_paths = None
+        if lod_paths:
+            model['file_paths'].setdefault('lod_paths', lod_paths)
+    
+    # real_height 기본값 설정 (PHP API가 반환하지 않을 경우)
+    if 'real_height' not in model:
+        model['real_height'] = 1.0
+    return model
+
+def _filter_models_page(models, offset=0, limit=MODELS_PAGE_SIZE, sort='created_at', order='desc',
+                        name=None, author=None, date_from=None, date_to=None):
+    """전체 목록에서 필터/정렬 후 한 페이지 잘라내기 (페이지 조회를 지원하지 않는 서버용)"""
+    name = (name or '').lower()
+    author = (author or '').lower()
+
+    matched = []
+    for model in models:
+        created = str(model.get('created_at') or '')[:10]
+        if name and name not in (model.get('name') or '').lower():
+            continue
+        if author and author not in (model.get('author') or '').lower():
+            continue
+        if date_from and created < str(date_from):
+            continue
+        if date_to and created > str(date_to):
+            continue
+        matched.append(model)
+
+    def sort_key(model):
+        value = model.get(sort)
+        if sort == 'access_count':
+            return int(value or 0)
+        return str(value or '').lower() if sort in ('name', 'author') else str(value or '')
+
+    matched.sort(key=sort_key, reverse=(order == 'desc'))
+    return {'models': matched[offset:offset + limit], 'total': len(matched)}
 
 class ModelDatabase:
     """웹서버 API 기반 데이터베이스 클래스"""
@@ -23,6 +98,7 @@ class ModelDatabase:
         # API 엔드포인트
         self.endpoints = {
             'get_all': f"{self.api_base_url}/api_get_models.php",
+            'count': f"{self.api_base_url}/api_count_models.php",
             'get_one': f"{self.api_base_url}/api_get_model.php",
             'save': f"{self.api_base_url}/api_save_model.php",  # 새로운 API 사용
             'delete': f"{self.api_base_url}/api_delete_model.php",
@@ -30,53 +106,44 @@ class ModelDatabase:
             'update_height': f"{self.api_base_url}/api_update_height.php",
             'annotations': f"{self.api_base_url}/api_annotations.php"
         }
-        
-        # 세션 캐시 (API 호출 최소화)
-        if 'models_cache' not in st.session_state:
-            st.session_state.models_cache = None
-            st.session_state.cache_time = None
+
+        # 모델 목록/개수는 프로세스 공용 캐시 사용 (모든 세션 공유)
+        self.metadata_cache = get_metadata_cache()
     
-    def _make_request(self, endpoint, method='GET', data=None, params=None):
-        """API 요청 헬퍼 함수"""
+    def _make_request(self, endpoint, method='GET', data=None, params=None, quiet=False):
+        """API 요청 헬퍼 함수 (quiet=True면 화면에 오류 표시 없이 로그만 - 백그라운드 갱신용)"""
+        def report(message):
+            if quiet:
+                print(f"[DEBUG] {message}")
+            else:
+                st.error(message)
+        
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            if method == 'GET':
-                response = requests.get(endpoint, params=params, headers=headers, timeout=30, verify=False)
-            elif method == 'POST':
-                if data:
-                    headers['Content-Type'] = 'application/json'
-                    response = requests.post(endpoint, json=data, headers=headers, timeout=30, verify=False)
-                else:
-                    response = requests.post(endpoint, headers=headers, timeout=30, verify=False)
-            elif method == 'PUT':
+            if method in ('GET', 'DELETE'):
+                response = http_transport.request(method, endpoint, endpoint='api', params=params, verify=False)
+            elif method in ('POST', 'PUT'):
                 if data:
-                    headers['Content-Type'] = 'application/json'
-                    response = requests.put(endpoint, json=data, headers=headers, timeout=30, verify=False)
+                    response = http_transport.request(method, endpoint, endpoint='api', json=data, verify=False)
                 else:
-                    response = requests.put(endpoint, headers=headers, timeout=30, verify=False)
-            elif method == 'DELETE':
-                response = requests.delete(endpoint, params=params, headers=headers, timeout=30, verify=False)
+                    response = http_transport.request(method, endpoint, endpoint='api', verify=False)
             else:
                 raise ValueError(f"Unsupported method: {method}")
             
             if response.status_code == 200:
                 return response.json()
             else:
-                st.error(f"API 오류: {response.status_code}")
+                report(f"API 오류: {response.status_code}")
                 return None
                 
         except requests.exceptions.RequestException as e:
-            st.error(f"네트워크 오류: {str(e)}")
+            report(f"네트워크 오류: {str(e)}")
             return None
         except json.JSONDecodeError as e:
-            st.error(f"응답 파싱 오류: {str(e)}")
+            report(f"응답 파싱 오류: {str(e)}")
             return None
     
-    def save_model(self, name, author, description, obj_content, mtl_content, texture_data, real_height=1.0):
-        """모델 저장 - 웹서버에만 저장"""
+    def save_model(self, name, author, description, obj_content, mtl_content, texture_data, real_height=1.0, mesh_data=None, lod_data=None):
+        """모델 저장 - 웹서버에만 저장 (mesh_data: 컴파일된 바이너리 메시, lod_data: LOD 목록)"""
         model_id = str(uuid.uuid4()).replace('-', '')
         share_token = str(uuid.uuid4())
         
@@ -86,7 +153,8 @@ class ModelDatabase:
         st.write("🌐 웹서버에 파일 업로드 중...")
         file_paths = self.web_storage.save_model_to_server(
             model_id, obj_content, mtl_content, texture_data,
-            name, author, description, share_token, real_height
+            name, author, description, share_token, real_height,
+            mesh_data=mesh_data, lod_data=lod_data
         )
         
         if not file_paths:
@@ -107,6 +175,11 @@ class ModelDatabase:
             'share_token': share_token,
             'real_height': real_height  # 실제 높이 추가
         }
+        # 컴파일된 메시/LOD 경로도 저장 (뷰어가 경로를 추측하지 않도록)
+        if file_paths.get('mesh_path'):
+            save_data['mesh_path'] = file_paths['mesh_path']
+        if file_paths.get('lod_paths'):
+            save_data['lod_paths'] = json.dumps(file_paths['lod_paths'])
         
         result = self._make_request(self.endpoints['save'], method='POST', data=save_data)
         
@@ -114,12 +187,12 @@ class ModelDatabase:
             st.success("✅ 데이터베이스 저장 성공!")
             
             # 캐시 무효화
-            st.session_state.models_cache = None
+            self.metadata_cache.invalidate()
             
             # 로컬 백업 (선택사항)
             try:
                 backup_paths = self.local_backup.save_model_backup(
-                    model_id, obj_content, mtl_content, texture_data
+                    model_id, obj_content, mtl_content, texture_data, mesh_data=mesh_data, lod_data=lod_data
                 )
                 if backup_paths:
                     st.write("💾 로컬 백업 완료")
@@ -133,39 +206,71 @@ class ModelDatabase:
             # 파일은 이미 업로드되었으므로 접근 가능
             return model_id, share_token
     
-    def get_all_models(self):
-        """모든 모델 목록 조회 - 웹서버 API 사용"""
-        # 캐시 확인 (5초 유효)
-        if st.session_state.models_cache and st.session_state.cache_time:
-            from datetime import timedelta
-            if datetime.now() - st.session_state.cache_time < timedelta(seconds=5):
-                return st.session_state.models_cache
-        
-        # API 호출
-        result = self._make_request(self.endpoints['get_all'])
+    def _fetch_all_models(self):
+        """웹서버 API에서 모델 목록 조회 (실패 시 None)"""
+        result = self._make_request(self.endpoints['get_all'], quiet=True)
         
         if result and result.get('status') == 'success':
-            models = result.get('models', [])
-            
-            # file_paths JSON 파싱 및 real_height 기본값 설정
-            for model in models:
-                if isinstance(model.get('file_paths'), str):
-                    try:
-                        model['file_paths'] = json.loads(model['file_paths'])
-                    except:
-                        model['file_paths'] = {}
-                
-                # real_height 기본값 설정 (PHP API가 반환하지 않을 경우)
-                if 'real_height' not in model:
-                    model['real_height'] = 1.0
-            
-            # 캐시 저장
-            st.session_state.models_cache = models
-            st.session_state.cache_time = datetime.now()
-            
-            return models
-        else:
+            return [_normalize_model(model) for model in result.get('models', [])]
+        return None
+    
+    def get_all_models(self):
+        """모든 모델 목록 조회 - 웹서버 API 사용 (프로세스 공용 캐시)"""
+        models = self.metadata_cache.get('models', self._fetch_all_models)
+        if models is None:
+            st.error("❌ 모델 목록을 불러오지 못했습니다.")
             return []
+        return models
+    
+    def get_models_page(self, offset=0, limit=MODELS_PAGE_SIZE, sort='created_at', order='desc',
+                        name=None, author=None, date_from=None, date_to=None):
+        """모델 목록 한 페이지 조회 (정렬/이름·작성자·날짜 필터)
+
+        서버가 페이지 조회를 지원하면(total 포함 응답) 해당 페이지만 받고,
+        지원하지 않으면 캐시된 전체 목록에서 같은 조건으로 잘라서 반환
+
+        Returns:
+            dict: {'models': [...], 'total': 조건에 맞는 전체 개수, 'offset', 'limit'}
+        """
+        sort = sort if sort in MODEL_SORT_FIELDS else 'created_at'
+        order = 'asc' if order == 'asc' else 'desc'
+        offset = max(int(offset), 0)
+        limit = min(max(int(limit), 1), MODELS_PAGE_MAX)
+        params = {
+            'offset': offset, 'limit': limit, 'sort': sort, 'order': order,
+            'name': name or None, 'author': author or None,
+            'date_from': str(date_from) if date_from else None,
+            'date_to': str(date_to) if date_to else None
+        }
+        params = {key: value for key, value in params.items() if value is not None}
+
+        def fetch_page():
+            result = self._make_request(self.endpoints['get_all'], params=params, quiet=True)
+            if result and result.get('status') == 'success' and 'total' in result:
+                return {
+                    'models': [_normalize_model(model) for model in result.get('models', [])],
+                    'total': int(result['total'])
+                }
+            # 구버전 API - 전체 목록에서 계산
+            models = self.metadata_cache.get('models', self._fetch_all_models)
+            if models is None:
+                return None
+            return _filter_models_page(models, **params)
+
+        page = self.metadata_cache.get(('page',) + tuple(sorted(params.items())), fetch_page)
+        if page is None:
+            st.error("❌ 모델 목록을 불러오지 못했습니다.")
+            page = {'models': [], 'total': 0}
+        return dict(page, offset=offset, limit=limit)
+    
+    def _fetch_model_count(self):
+        """모델 수 전용 API 조회 - 지원하지 않는 서버면 목록을 받아서 계산"""
+        result = self._make_request(self.endpoints['count'], quiet=True)
+        if result and result.get('status') == 'success' and 'count' in result:
+            return int(result['count'])
+        
+        models = self.metadata_cache.get('models', self._fetch_all_models)
+        return len(models) if models is not None else None
     
     def get_model_by_token(self, share_token):
         """공유 토큰으로 모델 조회"""
@@ -176,19 +281,7 @@ class ModelDatabase:
         
         if result and result.get('status') == 'success':
             model = result.get('model')
-            
-            # file_paths JSON 파싱
-            if model and isinstance(model.get('file_paths'), str):
-                try:
-                    model['file_paths'] = json.loads(model['file_paths'])
-                except:
-                    model['file_paths'] = {}
-            
-            # real_height 기본값 설정 (PHP API가 반환하지 않을 경우)
-            if model and 'real_height' not in model:
-                model['real_height'] = 1.0
-            
-            return model
+            return _normalize_model(model) if model else None
         else:
             return None
     
@@ -207,7 +300,8 @@ class ModelDatabase:
             st.success("✅ 모델이 삭제되었습니다.")
             
             # 캐시 무효화
-            st.session_state.models_cache = None
+            self.metadata_cache.invalidate()
+            get_viewer_cache().invalidate_model(model_id)
             
             # 로컬 백업도 삭제 (있는 경우)
             try:
@@ -221,9 +315,13 @@ class ModelDatabase:
             return False
     
     def get_model_count(self):
-        """저장된 모델 수 조회"""
-        models = self.get_all_models()
-        return len(models)
+        """저장된 모델 수 조회 - TTL 이내의 캐시된 목록이 있으면 그 길이, 없으면 개수 API"""
+        models = self.metadata_cache.peek('models', fresh=True)
+        if models is not None:
+            return len(models)
+        
+        count = self.metadata_cache.get('count', self._fetch_model_count)
+        return count if count is not None else 0
     
     def scan_and_rebuild(self, rebuild=False, show_progress=True):
         """웹서버 files 폴더 스캔하여 DB 재구축"""
@@ -256,7 +354,7 @@ class ModelDatabase:
                 """)
             
             # 캐시 무효화
-            st.session_state.models_cache = None
+            self.metadata_cache.invalidate()
             
             return True
         else:
@@ -301,7 +399,8 @@ class ModelDatabase:
         
         if result and result.get('status') == 'success':
             # 캐시 무효화
-            st.session_state.models_cache = None
+            self.metadata_cache.invalidate()
+            get_viewer_cache().invalidate_model(model_id)
             return True
         else:
             if result:
@@ -339,6 +438,7 @@ class ModelDatabase:
         )
         
         if result and result.get('status') == 'success':
+            get_viewer_cache().invalidate_token(share_token)
             return result.get('annotation_id')
         return None
     
@@ -357,10 +457,11 @@ class ModelDatabase:
         )
         
         if result and result.get('status') == 'success':
+            get_viewer_cache().invalidate_token(model_token)
             return True
         return False
     
-    def update_annotation_status(self, annotation_id, completed):
+    def update_annotation_status(self, annotation_id, completed, model_token=None):
         """수정점 상태 업데이트"""
         data = {
             'id': annotation_id,
@@ -374,10 +475,11 @@ class ModelDatabase:
         )
         
         if result and result.get('status') == 'success':
+            get_viewer_cache().invalidate_token(model_token)
             return True
         return False
     
-    def delete_annotation(self, annotation_id):
+    def delete_annotation(self, annotation_id, model_token=None):
         """수정점 삭제"""
         params = {'id': annotation_id}
         result = self._make_request(
@@ -387,29 +489,95 @@ class ModelDatabase:
         )
         
         if result and result.get('status') == 'success':
+            get_viewer_cache().invalidate_token(model_token)
             return True
         return False
 
+def _without_texture_levels(texture_paths, compressed=True):
+    """텍스처 경로 목록에서 해상도 단계(@512 등)와 그 압축 파생본 제외 (compressed=False면 압축 파생본 모두 제외)"""
+    texture_names = {os.path.basename(path) for path in texture_paths}
+    kept = []
+    for path in texture_paths:
+        name = os.path.basename(path)
+        if is_compressed_variant(name):
+            if not compressed:
+                continue
+            name = compressed_source_name(name)
+        if not is_pyramid_level(name, texture_names):
+            kept.append(path)
+    return kept
+
+def _record_mesh_probe(model_dir, file_paths, result, not_found_paths):
+    """추측한 메시/LOD 경로 확인 결과 기록 - 받지 못한 파일이 모두 404일 때만"""
+    if result[3] is not None:
+        # 받은 LOD 수 기록 (받지 못한 LOD 중 404가 아닌 것이 있으면 다음에 다시 확인)
+        missing_lods = file_paths.get('lod_paths', [])[len(result[4]):]
+        if not all(path in not_found_paths for path in missing_lods):
+            return
+        outcome = len(result[4])
+    elif file_paths.get('mesh_path') in not_found_paths:
+        outcome = None
+    else:
+        return
+    
+    with _mesh_probes_lock:
+        _mesh_probes[model_dir] = outcome
+        while len(_mesh_probes) > MESH_PROBE_CACHE_SIZE:
+            _mesh_probes.popitem(last=False)
+
 # 기존 코드와의 호환성을 위한 함수들
-def load_model_files(model_data):
-    """저장된 모델 파일들 로드 - 웹서버에서 직접"""
+def load_model_files(model_data, with_mesh=False, texture_levels=True, compressed_textures=True):
+    """저장된 모델 파일들 로드 - 웹서버에서 직접
+    
+    with_mesh=True면 (obj, mtl, textures, mesh, lods) 반환 - 컴파일된 바이너리 메시가 있으면
+    OBJ 대신 메시와 LOD를 받음 (obj는 None)
+    texture_levels=False면 텍스처 해상도 단계(@512 등)는 받지 않음 (base64 인라인 뷰어는 사용하지 않음)
+    compressed_textures=False면 GPU 압축 파생본(.basis)도 받지 않음
+    """
     web_storage = WebServerStorage()
+    local_backup = LocalBackupStorage()
+    file_paths = dict(model_data['file_paths'])
+    if not texture_levels:
+        file_paths['texture_paths'] = _without_texture_levels(file_paths.get('texture_paths', []), compressed_textures)
+    elif not compressed_textures:
+        file_paths['texture_paths'] = [
+            path for path in file_paths.get('texture_paths', []) if not is_compressed_variant(os.path.basename(path))
+        ]
+    
+    # 백업 경로가 없으면 기본 로컬 백업 위치 사용
+    backup_paths = model_data.get('backup_paths')
+    if not backup_paths and model_data.get('id'):
+        backup_paths = local_backup.default_backup_paths(model_data['id'], file_paths)
     
-    # 웹서버에서 로드
-    result = web_storage.load_model_from_server(model_data['file_paths'])
+    # 서버 DB에 메시/LOD 경로가 없으면 OBJ 옆의 model.bin, model.lodN.bin을 시도 (없으면 OBJ로 대체됨)
+    # 이전에 확인한 모델은 결과 재사용 - 메시가 없었으면 추측하지 않고, LOD는 받았던 개수만 요청
+    probe_dir = None
+    if with_mesh and not file_paths.get('mesh_path') and file_paths.get('obj_path'):
+        model_dir = os.path.dirname(file_paths['obj_path'])
+        with _mesh_probes_lock:
+            known = model_dir in _mesh_probes
+            lod_count = _mesh_probes.get(model_dir, len(LOD_TARGETS))
+            if known:
+                _mesh_probes.move_to_end(model_dir)
+        if lod_count is not None:
+            file_paths['mesh_path'] = f"{model_dir}/{MESH_FILENAME}"
+            file_paths.setdefault('lod_paths', [
+                f"{model_dir}/{lod_filename(level)}" for level in range(1, lod_count + 1)
+            ])
+        if not known:
+            probe_dir = model_dir
     
-    if result:
+    # 웹서버에서 로드 (실패한 파일만 로컬 백업에서 보충)
+    result = web_storage.load_model_from_server(file_paths, backup_paths, with_mesh=with_mesh)
+    
+    if probe_dir and result[1] is not None:
+        _record_mesh_probe(probe_dir, file_paths, result, web_storage.not_found_paths)
+    
+    if result[0] is not None or (with_mesh and result[3] is not None):
         return result
-    else:
-        # 로컬 백업 시도 (있는 경우)
-        local_backup = LocalBackupStorage()
-        backup_result = local_backup.load_model_backup(model_data.get('backup_paths'))
-        if backup_result:
-            st.warning("⚠️ 로컬 백업에서 로드됨")
-            return backup_result
-        else:
-            st.error("모델 파일 로드 실패")
-            return None
+    
+    st.error("모델 파일 로드 실패")
+    return (None, None, None, None, []) if with_mesh else (None, None, None)
 
 def generate_share_url(share_token):
     """공유 URL 생성"""
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+로컬 SQLite(database.ModelDatabase) 조회 성능 벤치마크
+임시 DB에 모델/수정점을 채운 뒤 인덱스 적용 전후의 조회 지연 시간을 비교
+"""
+
+import os
+import json
+import time
+import uuid
+import random
+import shutil
+import sqlite3
+import tempfile
+from database import ModelDatabase
+from sqlite_pool import close_pool
+from view_counter import close_view_counter
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def _report(label, samples):
+    """지연 시간 요약 출력 (ms)"""
+    print(
+        f"   {label}: p50 {_percentile(samples, 0.5) * 1000:.3f}ms, "
+        f"p95 {_percentile(samples, 0.95) * 1000:.3f}ms, "
+        f"평균 {sum(samples) / len(samples) * 1000:.3f}ms"
+    )
+    return {'p50': _percentile(samples, 0.5), 'p95': _percentile(samples, 0.95)}
+
+def populate(db_path, model_count, annotation_count, seed=42):
+    """테스트 데이터 채우기 - 모델 model_count개, 수정점 annotation_count개"""
+    rng = random.Random(seed)
+    tokens = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(model_count)]
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.executemany('''
+        INSERT INTO models (id, name, author, description, file_paths, backup_paths, storage_type, share_token, real_height)
+        VALUES (?, ?, ?, ?, ?, ?, 'web', ?, 1.0)
+    ''', [
+        (
+            uuid.UUID(int=rng.getrandbits(128)).hex,
+            f"Model {i}",
+            f"Author {i % 50}",
+            "benchmark",
+            json.dumps({'obj_path': f"{i}/model.obj", 'mtl_path': f"{i}/model.mtl", 'texture_paths': [f"{i}/texture.jpg"]}),
+            None,
+            token
+        )
+        for i, token in enumerate(tokens)
+    ])
+    cursor.executemany('''
+        INSERT INTO annotations (model_token, position_x, position_y, position_z, text, completed, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, datetime('now', ?))
+    ''', [
+        (rng.choice(tokens), rng.random(), rng.random(), rng.random(), f"note {i}", i % 3 == 0, f"-{rng.randint(0, 86400 * 30)} seconds")
+        for i in range(annotation_count)
+    ])
+    conn.commit()
+    conn.close()
+    return tokens
+
+def _drop_indexes(db_path):
+    """마이그레이션 이전 상태로 되돌림 (인덱스 삭제 + user_version 0)"""
+    conn = sqlite3.connect(db_path)
+    conn.execute('DROP INDEX IF EXISTS idx_annotations_model_token_created_at')
+    conn.execute('DROP INDEX IF EXISTS idx_models_share_token_covering')
+    conn.execute('PRAGMA user_version = 0')
+    conn.commit()
+    conn.close()
+
+def _time_lookups(db, tokens, lookups, rng):
+    annotation_samples = []
+    model_samples = []
+    for _ in range(lookups):
+        token = rng.choice(tokens)
+
+        started = time.perf_counter()
+        db.get_annotations(token)
+        annotation_samples.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        db.get_model_by_token(token)
+        model_samples.append(time.perf_counter() - started)
+    return annotation_samples, model_samples
+
+def benchmark_annotation_lookup(model_count=5000, annotation_count=100000, lookups=500):
+    """수정점/공유 토큰 조회 지연 시간 - 인덱스 없음 vs 마이그레이션 적용"""
+    print(f"⏱️ 조회 벤치마크: 모델 {model_count:,}개, 수정점 {annotation_count:,}개, 조회 {lookups}회")
+
+    directory = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(directory, "models.db")
+        db = ModelDatabase(db_path=db_path, auto_sync=False)
+        tokens = populate(db_path, model_count, annotation_count)
+
+        # 인덱스 없는 상태 (마이그레이션 이전 스키마)
+        _drop_indexes(db_path)
+        conn = sqlite3.connect(db_path)
+        rng = random.Random(7)
+        before = []
+        for _ in range(lookups):
+            started = time.perf_counter()
+            conn.execute('''
+                SELECT id, position_x, position_y, position_z, text, completed
+                FROM annotations WHERE model_token = ? ORDER BY created_at
+            ''', (rng.choice(tokens),)).fetchall()
+            before.append(time.perf_counter() - started)
+        conn.close()
+        print("📉 인덱스 없음:")
+        before_stats = _report("get_annotations 쿼리", before)
+
+        # 마이그레이션 다시 적용 (init_db → run_migrations)
+        db.init_db()
+        conn = sqlite3.connect(db_path)
+        rng = random.Random(7)
+        after = []
+        for _ in range(lookups):
+            started = time.perf_counter()
+            conn.execute('''
+                SELECT id, position_x, position_y, position_z, text, completed
+                FROM annotations WHERE model_token = ? ORDER BY created_at
+            ''', (rng.choice(tokens),)).fetchall()
+            after.append(time.perf_counter() - started)
+        conn.close()
+        print("📈 마이그레이션 적용 후:")
+        after_stats = _report("get_annotations 쿼리", after)
+
+        # 메서드 전체 (연결 열기/닫기 포함)
+        annotation_samples, model_samples = _time_lookups(db, tokens, lookups, random.Random(7))
+        _report("ModelDatabase.get_annotations", annotation_samples)
+        _report("ModelDatabase.get_model_by_token", model_samples)
+
+        print(f"   → 수정점 쿼리 p50 {before_stats['p50'] / max(after_stats['p50'], 1e-9):.0f}배 빠름")
+        return {'before': before_stats, 'after': after_stats}
+    finally:
+        close_view_counter(os.path.join(directory, "models.db"))
+        close_pool(os.path.join(directory, "models.db"))
+        shutil.rmtree(directory, ignore_errors=True)
+
+def benchmark_model_lookup(model_count=5000, lookups=5000):
+    """get_model_by_token 호출당 지연 시간 (공유 링크 조회 핫패스)"""
+    print(f"⏱️ get_model_by_token 벤치마크: 모델 {model_count:,}개, 조회 {lookups:,}회")
+
+    directory = tempfile.mkdtemp()
+    db_path = os.path.join(directory, "models.db")
+    try:
+        db = ModelDatabase(db_path=db_path, auto_sync=False)
+        tokens = populate(db_path, model_count, 0)
+        rng = random.Random(11)
+
+        # 워밍업 (연결 풀/문 캐시 채우기)
+        for token in tokens[:100]:
+            db.get_model_by_token(token)
+
+        samples = []
+        for _ in range(lookups):
+            token = rng.choice(tokens)
+            started = time.perf_counter()
+            model = db.get_model_by_token(token)
+            samples.append(time.perf_counter() - started)
+            assert model and model['share_token'] == token
+
+        stats = _report("ModelDatabase.get_model_by_token", samples)
+        print(f"   → 초당 {lookups / sum(samples):,.0f}회")
+        return stats
+    finally:
+        close_view_counter(db_path)
+        close_pool(db_path)
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    benchmark_annotation_lookup()
+    benchmark_model_lookup()
@@ -0,0 +1,188 @@
+"""
+프로세스 전역 HTTP 전송 계층
+모든 외부 요청이 하나의 연결 풀(keep-alive) 세션을 공유하도록 하여
+호스트별 TCP/TLS 연결 비용을 한 번만 지불
+"""
+
+import os
+import time
+import bisect
+import threading
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# SSL 경고 비활성화 (웹서버 요청은 verify=False 사용)
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+# 연결 풀 / 재시도 설정 (환경변수로 조정 가능)
+POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '8'))    # 호스트별 풀 개수
+POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '16'))           # 호스트당 최대 연결 수
+RETRY_TOTAL = int(os.getenv('HTTP_RETRY_TOTAL', '3'))
+RETRY_BACKOFF = float(os.getenv('HTTP_RETRY_BACKOFF', '0.5'))
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# 엔드포인트별 타임아웃 (초)
+ENDPOINT_TIMEOUTS = {
+    'default': 30,
+    'upload': 30,
+    'upload_chunk': 60,   # 청크 1개 (CHUNK_UPLOAD_SIZE) 기준
+    'download': 30,
+    'delete': 30,
+    'list': 30,
+    'api': 30,
+    'metadata': 10,
+    'auth': 10,
+    'sync': 30,
+    'sync_check': 10,
+    'connection_test': 10
+}
+
+# 지연 시간 히스토그램 구간 (초)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float('inf'))
+
+class LatencyHistogram:
+    """엔드포인트별 응답 시간 분포"""
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.total = 0
+        self.errors = 0
+        self.sum_seconds = 0.0
+
+    def observe(self, seconds, error=False):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += 1
+        self.sum_seconds += seconds
+        if error:
+            self.errors += 1
+
+    def quantile(self, q):
+        """구간 상한값 기준 근사 분위수"""
+        if not self.total:
+            return 0.0
+        target = q * self.total
+        running = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            running += count
+            if running >= target:
+                return bound
+        return LATENCY_BUCKETS[-1]
+
+    def summary(self):
+        return {
+            'count': self.total,
+            'errors': self.errors,
+            'mean': self.sum_seconds / self.total if self.total else 0.0,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'buckets': {
+                ('+inf' if bound == float('inf') else f"<={bound}s"): count
+                for bound, count in zip(LATENCY_BUCKETS, self.counts)
+            }
+        }
+
+class HttpTransport:
+    """연결 풀 + 재시도 정책 + 지연 시간 측정을 갖춘 공유 세션"""
+
+    def __init__(self, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                 retries=RETRY_TOTAL, backoff_factor=RETRY_BACKOFF, timeouts=None):
+        self.timeouts = dict(ENDPOINT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+
+        # 멱등 요청만 자동 재시도 (POST 업로드는 호출 측에서 재시도)
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE']),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': DEFAULT_USER_AGENT,
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive'
+        })
+
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def timeout_for(self, endpoint):
+        return self.timeouts.get(endpoint, self.timeouts['default'])
+
+    def request(self, method, url, endpoint='default', **kwargs):
+        """요청 실행 (타임아웃 기본값 적용 + 지연 시간 기록)"""
+        kwargs.setdefault('timeout', self.timeout_for(endpoint))
+        started = time.perf_counter()
+        error = True
+        try:
+            response = self.session.request(method, url, **kwargs)
+            error = response.status_code >= 500
+            return response
+        finally:
+            self._observe(endpoint, time.perf_counter() - started, error)
+
+    def get(self, url, endpoint='default', **kwargs):
+        return self.request('GET', url, endpoint=endpoint, **kwargs)
+
+    def post(self, url, endpoint='default', **kwargs):
+        return self.request('POST', url, endpoint=endpoint, **kwargs)
+
+    def put(self, url, endpoint='default', **kwargs):
+        return self.request('PUT', url, endpoint=endpoint, **kwargs)
+
+    def delete(self, url, endpoint='default', **kwargs):
+        return self.request('DELETE', url, endpoint=endpoint, **kwargs)
+
+    def _observe(self, endpoint, seconds, error):
+        with self._lock:
+            histogram = self._histograms.get(endpoint)
+            if histogram is None:
+                histogram = self._histograms[endpoint] = LatencyHistogram()
+            histogram.observe(seconds, error)
+
+    def latency_stats(self):
+        """엔드포인트별 지연 시간 통계"""
+        with self._lock:
+            return {endpoint: histogram.summary() for endpoint, histogram in self._histograms.items()}
+
+# 프로세스 전역 전송 계층
+_transport = None
+_transport_lock = threading.Lock()
+
+def get_transport():
+    """프로세스 전역 HttpTransport 반환"""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = HttpTransport()
+    return _transport
+
+def request(method, url, endpoint='default', **kwargs):
+    return get_transport().request(method, url, endpoint=endpoint, **kwargs)
+
+def get(url, endpoint='default', **kwargs):
+    return get_transport().get(url, endpoint=endpoint, **kwargs)
+
+def post(url, endpoint='default', **kwargs):
+    return get_transport().post(url, endpoint=endpoint, **kwargs)
+
+def put(url, endpoint='default', **kwargs):
+    return get_transport().put(url, endpoint=endpoint, **kwargs)
+
+def delete(url, endpoint='default', **kwargs):
+    return get_transport().delete(url, endpoint=endpoint, **kwargs)
+
+def latency_stats():
+    return get_transport().latency_stats()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+업로드 시 OBJ를 바이너리 메시로 미리 컴파일
+브라우저에서 OBJ 텍스트를 파싱하지 않고 BufferGeometry로 바로 올릴 수 있도록
+양자화된 정점(위치/UV/노멀)을 인터리브 버퍼로, 면은 인덱스 버퍼로 저장
+
+파일 구조 (리틀 엔디언):
+    magic 'MSH1' | header 길이 (uint32) | header JSON (4바이트 정렬) | 정점 버퍼 | 인덱스 버퍼
+"""
+
+import io
+import json
+import struct
+import numpy as np
+from obj_parser import parse_obj
+
+MESH_MAGIC = b'MSH1'
+MESH_VERSION = 1
+MESH_FILENAME = "model.bin"
+
+def _unique_rows(keys):
+    """(n, 4) 정수 키의 고유 행과 역인덱스
+
+    값 범위가 int64에 들어가면 한 개의 정수로 합쳐서 1차원 unique (axis=0보다 훨씬 빠름)
+    """
+    shifted = keys + 1  # -1(없음)을 0으로
+    radix = shifted.max(axis=0) + 1
+    if np.prod(radix.astype(np.float64)) < 2 ** 62:
+        packed = np.zeros(len(keys), dtype=np.int64)
+        for column in range(keys.shape[1]):
+            packed = packed * int(radix[column]) + shifted[:, column]
+        unique_packed, inverse = np.unique(packed, return_inverse=True)
+
+        unique_keys = np.empty((len(unique_packed), keys.shape[1]), dtype=np.int64)
+        for column in reversed(range(keys.shape[1])):
+            unique_keys[:, column] = unique_packed % int(radix[column]) - 1
+            unique_packed = unique_packed // int(radix[column])
+        return unique_keys, inverse.reshape(-1)
+
+    unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+    return unique_keys, inverse.reshape(-1)
+
+def build_render_mesh(parsed):
+    """파싱된 OBJ(obj_parser.ParsedObj)의 v/vt/vn 별도 인덱스를 GPU용 단일 인덱스 메시로 변환
+
+    같은 (재질, v, vt, vn) 조합은 하나의 정점으로 합치고, 삼각형은 재질별로 정렬하여
+    재질 그룹마다 연속된 인덱스 범위를 갖도록 함
+    """
+    corners = parsed.corners
+    face_materials = parsed.face_materials
+    has_uv = len(parsed.texcoords) > 0 and bool(np.all(corners[:, :, 1] >= 0))
+    has_normal = len(parsed.normals) > 0 and bool(np.all(corners[:, :, 2] >= 0))
+
+    # 재질 순서대로 삼각형 정렬 (같은 재질 내에서는 원래 순서 유지)
+    order = np.argsort(face_materials, kind='stable')
+    corners = corners[order]
+    face_materials = face_materials[order]
+
+    # 모서리별 고유 키 → 정점 중복 제거
+    keys = np.concatenate([
+        np.repeat(face_materials, 3)[:, None],
+        corners.reshape(-1, 3)
+    ], axis=1)
+    unique_keys, inverse = _unique_rows(keys)
+
+    mesh = {
+        'positions': parsed.positions[unique_keys[:, 1]].astype(np.float32),
+        'uvs': parsed.texcoords[unique_keys[:, 2]].astype(np.float32) if has_uv else None,
+        'normals': parsed.normals[unique_keys[:, 3]].astype(np.float32) if has_normal else None,
+        'indices': inverse.astype(np.uint32),
+        'groups': []
+    }
+
+    # 재질 그룹 (인덱스 버퍼 기준 시작 위치/개수)
+    materials, starts, counts = np.unique(face_materials, return_index=True, return_counts=True)
+    for material, start, count in zip(materials, starts, counts):
+        mesh['groups'].append({
+            'material': parsed.material_names[int(material)],
+            'start': int(start) * 3,
+            'count': int(count) * 3
+        })
+
+    return mesh
+
+def _quantize(values, bits=16):
+    """값 범위를 [0, 2^bits-1] 정수로 양자화"""
+    low = values.min(axis=0)
+    high = values.max(axis=0)
+    extent = np.where(high - low > 0, high - low, 1.0)
+    scale = (1 << bits) - 1
+    quantized = np.round((values - low) / extent * scale).astype(np.uint16)
+    return quantized, low.tolist(), high.tolist()
+
+def encode_mesh(mesh):
+    """렌더 메시를 바이너리로 인코딩"""
+    positions = mesh['positions']
+    uvs = mesh.get('uvs')
+    normals = mesh.get('normals')
+    indices = mesh['indices']
+    vertex_count = len(positions)
+
+    # 인터리브 정점 레이아웃: 위치 uint16x3(+패딩) | UV uint16x2 | 노멀 int8x3(+패딩)
+    fields = [('position', '<u2', (4,))]
+    if uvs is not None:
+        fields.append(('uv', '<u2', (2,)))
+    if normals is not None:
+        fields.append(('normal', 'i1', (4,)))
+    vertex_dtype = np.dtype(fields)
+    vertices = np.zeros(vertex_count, dtype=vertex_dtype)
+
+    attributes = {}
+    if vertex_count:
+        quantized, low, high = _quantize(positions)
+        vertices['position'][:, :3] = quantized
+        attributes['position'] = {'offset': vertex_dtype.fields['position'][1], 'type': 'uint16', 'components': 3, 'min': low, 'max': high}
+
+        if uvs is not None:
+            quantized, low, high = _quantize(uvs)
+            vertices['uv'] = quantized
+            attributes['uv'] = {'offset': vertex_dtype.fields['uv'][1], 'type': 'uint16', 'components': 2, 'min': low, 'max': high}
+
+        if normals is not None:
+            lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+            unit = normals / np.where(lengths > 0, lengths, 1.0)
+            vertices['normal'][:, :3] = np.round(unit * 127).astype(np.int8)
+            attributes['normal'] = {'offset': vertex_dtype.fields['normal'][1], 'type': 'int8', 'components': 3, 'normalized': True}
+
+    # 정점 수가 적으면 16비트 인덱스
+    index_type = 'uint16' if vertex_count <= 0xFFFF else 'uint32'
+    index_bytes = indices.astype('<u2' if index_type == 'uint16' else '<u4').tobytes()
+    vertex_bytes = vertices.tobytes()
+
+    header = {
+        'version': MESH_VERSION,
+        'vertex_count': vertex_count,
+        'index_count': int(len(indices)),
+        'index_type': index_type,
+        'stride': vertex_dtype.itemsize,
+        'attributes': attributes,
+        'groups': mesh['groups']
+    }
+
+    # 헤더 크기가 버퍼 오프셋에 영향을 주므로 두 번 계산
+    for _ in range(2):
+        header_json = json.dumps(header, separators=(',', ':')).encode('utf-8')
+        header_json += b' ' * (-len(header_json) % 4)
+        vertex_offset = 8 + len(header_json)
+        index_offset = vertex_offset + len(vertex_bytes) + (-len(vertex_bytes) % 4)
+        header['vertex_buffer'] = {'offset': vertex_offset, 'length': len(vertex_bytes)}
+        header['index_buffer'] = {'offset': index_offset, 'length': len(index_bytes)}
+
+    header_json = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    header_json += b' ' * (-len(header_json) % 4)
+    assert 8 + len(header_json) == header['vertex_buffer']['offset']
+
+    return b''.join([
+        MESH_MAGIC,
+        struct.pack('<I', len(header_json)),
+        header_json,
+        vertex_bytes,
+        b'\0' * (-len(vertex_bytes) % 4),
+        index_bytes
+    ])
+
+def decode_mesh(data):
+    """바이너리 메시를 렌더 메시로 복원 (검증/재가공용)"""
+    if data[:4] != MESH_MAGIC:
+        raise ValueError("컴파일된 메시 파일이 아닙니다.")
+
+    header_length = struct.unpack('<I', data[4:8])[0]
+    header = json.loads(bytes(data[8:8 + header_length]).decode('utf-8'))
+
+    fields = [('position', '<u2', (4,))]
+    if 'uv' in header['attributes']:
+        fields.append(('uv', '<u2', (2,)))
+    if 'normal' in header['attributes']:
+        fields.append(('normal', 'i1', (4,)))
+    vertex_dtype = np.dtype(fields)
+
+    vertex_buffer = header['vertex_buffer']
+    vertices = np.frombuffer(data, dtype=vertex_dtype, count=header['vertex_count'], offset=vertex_buffer['offset'])
+    index_buffer = header['index_buffer']
+    indices = np.frombuffer(
+        data, dtype='<u2' if header['index_type'] == 'uint16' else '<u4',
+        count=header['index_count'], offset=index_buffer['offset']
+    ).astype(np.uint32)
+
+    def dequantize(values, attribute):
+        low = np.array(attribute['min'])
+        high = np.array(attribute['max'])
+        return (low + values / 65535.0 * (high - low)).astype(np.float32)
+
+    attributes = header['attributes']
+    return {
+        'positions': dequantize(vertices['position'][:, :3], attributes['position']) if header['vertex_count'] else np.zeros((0, 3), np.float32),
+        'uvs': dequantize(vertices['uv'], attributes['uv']) if 'uv' in attributes else None,
+        'normals': (vertices['normal'][:, :3] / 127.0).astype(np.float32) if 'normal' in attributes else None,
+        'indices': indices,
+        'groups': header['groups']
+    }
+
+def _format_rows(values, fmt):
+    """(n, k) 배열 → OBJ 레코드 줄 (np.savetxt 일괄 포맷)"""
+    if len(values) == 0:
+        return ''
+    output = io.StringIO()
+    np.savetxt(output, values, fmt=fmt)
+    return output.getvalue()
+
+def write_obj(mesh, mtllib=None):
+    """렌더 메시를 OBJ 텍스트로 저장 (UV를 다시 계산한 메시를 OBJ로도 보관할 때 사용)
+
+    정점마다 v/vt/vn이 1:1이므로 면은 같은 번호를 반복 (f 1/1/1 2/2/2 3/3/3)
+    """
+    uvs = mesh.get('uvs')
+    normals = mesh.get('normals')
+    parts = ['# Generated by mesh_compiler.write_obj\n']
+    if mtllib:
+        parts.append(f'mtllib {mtllib}\n')
+    parts.append(_format_rows(mesh['positions'], 'v %.6f %.6f %.6f'))
+    if uvs is not None:
+        parts.append(_format_rows(uvs, 'vt %.6f %.6f'))
+    if normals is not None:
+        parts.append(_format_rows(normals, 'vn %.4f %.4f %.4f'))
+
+    if uvs is not None and normals is not None:
+        corner = '%d/%d/%d'
+    elif uvs is not None:
+        corner = '%d/%d'
+    elif normals is not None:
+        corner = '%d//%d'
+    else:
+        corner = '%d'
+    repeat = corner.count('%d')
+    face_format = 'f ' + ' '.join([corner] * 3)
+
+    for group in mesh['groups']:
+        triangles = mesh['indices'][group['start']:group['start'] + group['count']].reshape(-1, 3).astype(np.int64) + 1
+        parts.append(f"usemtl {group['material']}\n")
+        parts.append(_format_rows(np.repeat(triangles, repeat, axis=1), face_format))
+    return ''.join(parts)
+
+def compile_obj(obj_content):
+    """OBJ 텍스트를 바이너리 메시로 컴파일"""
+    parsed = parse_obj(obj_content)
+    if parsed.face_count == 0:
+        raise ValueError("OBJ 파일에 면(f) 정보가 없습니다.")
+    return encode_mesh(build_render_mesh(parsed))
+
+# 테스트 함수
+def test_mesh_compilation():
+    """컴파일/복원 왕복 테스트"""
+    print("🧪 바이너리 메시 컴파일 테스트")
+
+    test_obj = """# Test OBJ file
+v 0.0 0.0 0.0
+v 1.0 0.0 0.0
+v 1.0 1.0 0.0
+v 0.0 1.0 0.0
+vt 0.0 0.0
+vt 1.0 0.0
+vt 1.0 1.0
+vt 0.0 1.0
+vn 0.0 0.0 1.0
+usemtl Material1
+f 1/1/1 2/2/1 3/3/1 4/4/1
+usemtl Material2
+f -4/-4/-1 -2/-2/-1 -1/-1/-1
+"""
+
+    data = compile_obj(test_obj)
+    mesh = decode_mesh(data)
+
+    print(f"OBJ {len(test_obj):,} bytes → 바이너리 {len(data):,} bytes")
+    print(f"정점 {len(mesh['positions'])}개, 삼각형 {len(mesh['indices']) // 3}개")
+    for group in mesh['groups']:
+        print(f"  - {group['material']}: start={group['start']}, count={group['count']}")
+
+    assert [group['material'] for group in mesh['groups']] == ['Material1', 'Material2']
+    assert len(mesh['indices']) == 9
+    assert np.allclose(mesh['positions'][mesh['indices'][6:9]], [[0, 0, 0], [1, 1, 0], [0, 1, 0]], atol=1e-4)
+
+    # OBJ로 다시 저장해도 같은 메시
+    rendered = build_render_mesh(parse_obj(test_obj))
+    rewritten = build_render_mesh(parse_obj(write_obj(rendered, 'model.mtl')))
+    assert [group['material'] for group in rewritten['groups']] == ['Material1', 'Material2']
+    assert np.allclose(rewritten['positions'][rewritten['indices']], rendered['positions'][rendered['indices']])
+    assert np.allclose(rewritten['uvs'][rewritten['indices']], rendered['uvs'][rendered['indices']])
+
+if __name__ == "__main__":
+    test_mesh_compilation()
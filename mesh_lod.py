@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+업로드 시 LOD(단계별 저해상도) 메시 생성
+쿼드릭 오차(QEM) 기반 정점 클러스터링으로 삼각형 수를 줄여서
+뷰어가 가장 가벼운 LOD를 먼저 보여주고 고해상도로 교체할 수 있도록 함
+
+클러스터 키에 재질과 UV 셀을 포함해서 재질 경계와 UV 이음새(seam)는 합치지 않음
+"""
+
+import os
+import numpy as np
+from obj_parser import parse_obj
+from mesh_compiler import build_render_mesh, encode_mesh, _unique_rows
+
+# LOD별 목표 삼각형 수 (고해상도 → 저해상도 순서)
+LOD_TARGETS = [int(x) for x in os.getenv('MESH_LOD_TARGETS', '100000,20000').split(',') if x.strip()]
+
+# 원본 대비 이 비율보다 줄지 않으면 해당 LOD는 만들지 않음
+LOD_MIN_REDUCTION = float(os.getenv('MESH_LOD_MIN_REDUCTION', '0.5'))
+
+def lod_filename(level):
+    """LOD 파일 이름 (level 1이 가장 정밀, 숫자가 클수록 거침)"""
+    return f"model.lod{level}.bin"
+
+def _face_quadrics(positions, triangles):
+    """삼각형별 평면 쿼드릭 (면적 가중) - 대칭 4x4 행렬의 10개 성분"""
+    v0 = positions[triangles[:, 0]]
+    v1 = positions[triangles[:, 1]]
+    v2 = positions[triangles[:, 2]]
+    cross = np.cross(v1 - v0, v2 - v0)
+    double_area = np.linalg.norm(cross, axis=1)
+    normal = cross / np.where(double_area > 0, double_area, 1.0)[:, None]
+    d = -np.einsum('ij,ij->i', normal, v0)
+    weight = double_area * 0.5
+
+    a, b, c = normal[:, 0], normal[:, 1], normal[:, 2]
+    return np.stack([
+        a * a, a * b, a * c, a * d,
+        b * b, b * c, b * d,
+        c * c, c * d,
+        d * d
+    ], axis=1) * weight[:, None]
+
+def _cluster_positions(positions, clusters, cluster_count, quadrics, triangles):
+    """클러스터별 쿼드릭 합을 최소화하는 대표 위치 (정규화 포함 배치 풀이)"""
+    # 정점 쿼드릭 = 인접 삼각형 쿼드릭 합 → 클러스터별 합
+    corner_clusters = clusters[triangles].reshape(-1)
+    corner_quadrics = np.repeat(quadrics, 3, axis=0)
+    q = np.stack([
+        np.bincount(corner_clusters, weights=corner_quadrics[:, i], minlength=cluster_count)
+        for i in range(10)
+    ], axis=1)
+
+    counts = np.bincount(clusters, minlength=cluster_count).astype(np.float64)
+    counts = np.maximum(counts, 1.0)
+    mean = np.stack([
+        np.bincount(clusters, weights=positions[:, i], minlength=cluster_count)
+        for i in range(3)
+    ], axis=1) / counts[:, None]
+
+    low = np.full((cluster_count, 3), np.inf)
+    high = np.full((cluster_count, 3), -np.inf)
+    np.minimum.at(low, clusters, positions)
+    np.maximum.at(high, clusters, positions)
+
+    A = np.empty((cluster_count, 3, 3))
+    A[:, 0, 0], A[:, 0, 1], A[:, 0, 2] = q[:, 0], q[:, 1], q[:, 2]
+    A[:, 1, 0], A[:, 1, 1], A[:, 1, 2] = q[:, 1], q[:, 4], q[:, 5]
+    A[:, 2, 0], A[:, 2, 1], A[:, 2, 2] = q[:, 2], q[:, 5], q[:, 7]
+    b = -q[:, [3, 6, 8]]
+
+    # 평평한 영역(특이 행렬)은 평균 위치 쪽으로 당기는 정규화
+    trace = A[:, 0, 0] + A[:, 1, 1] + A[:, 2, 2]
+    regularization = np.maximum(trace * 1e-3, 1e-12)
+    A += np.eye(3)[None] * regularization[:, None, None]
+    b += mean * regularization[:, None]
+
+    solved = np.linalg.solve(A, b[:, :, None])[:, :, 0]
+    solved = np.where(np.isfinite(solved), solved, mean)
+
+    # 클러스터 경계 상자 밖으로 튀는 정점 방지
+    return np.clip(solved, low, high)
+
+def _normalize(values):
+    """값을 [0, 1] 범위로 정규화 (위치는 가장 긴 축 기준으로 비율 유지)"""
+    low = values.min(axis=0)
+    extent = np.maximum(values.max(axis=0) - low, 1e-12)
+    return (values - low) / (extent.max() if values.shape[1] == 3 else extent)
+
+def _grid_keys(unit_positions, unit_uvs, material_ids, resolution, uv_resolution):
+    """(재질, 위치 셀, UV 셀) 키로 클러스터 번호 계산"""
+    cells = np.minimum((unit_positions * resolution).astype(np.int64), resolution)
+    columns = [material_ids, cells[:, 0], cells[:, 1], cells[:, 2]]
+    if unit_uvs is not None:
+        uv_cells = np.minimum((unit_uvs * uv_resolution).astype(np.int64), uv_resolution)
+        columns.extend([uv_cells[:, 0], uv_cells[:, 1]])
+
+    _, clusters = _unique_rows(np.stack(columns, axis=1))
+    return clusters
+
+def _vertex_materials(mesh):
+    """정점별 재질 번호 (렌더 메시는 재질 그룹마다 정점이 따로 있음)"""
+    material_ids = np.zeros(len(mesh['positions']), dtype=np.int64)
+    for number, group in enumerate(mesh['groups']):
+        indices = mesh['indices'][group['start']:group['start'] + group['count']]
+        material_ids[indices] = number
+    return material_ids
+
+def simplify_mesh(mesh, target_triangles):
+    """렌더 메시(build_render_mesh 결과)를 목표 삼각형 수 근처로 단순화"""
+    positions = mesh['positions'].astype(np.float64)
+    uvs = mesh['uvs']
+    triangles = mesh['indices'].reshape(-1, 3).astype(np.int64)
+    material_ids = _vertex_materials(mesh)
+    triangle_materials = np.repeat(np.arange(len(mesh['groups'])), [group['count'] // 3 for group in mesh['groups']])
+
+    # 격자 해상도를 이분 탐색 - 클러스터 수가 목표 정점 수(삼각형의 약 절반)에 가깝도록
+    target_vertices = max(target_triangles // 2, 4)
+    unit_positions = _normalize(positions)
+    unit_uvs = _normalize(uvs.astype(np.float64)) if uvs is not None else None
+    low_resolution, high_resolution = 1, 4096
+    clusters = None
+    while low_resolution < high_resolution:
+        resolution = (low_resolution + high_resolution + 1) // 2
+        candidate = _grid_keys(unit_positions, unit_uvs, material_ids, resolution, max(resolution // 2, 1))
+        if candidate.max() + 1 > target_vertices:
+            high_resolution = resolution - 1
+        else:
+            low_resolution = resolution
+            clusters = candidate
+    if clusters is None:
+        clusters = _grid_keys(unit_positions, unit_uvs, material_ids, 1, 1)
+    cluster_count = int(clusters.max()) + 1
+
+    # 클러스터 대표 정점
+    quadrics = _face_quadrics(positions, triangles)
+    new_positions = _cluster_positions(positions, clusters, cluster_count, quadrics, triangles)
+
+    counts = np.maximum(np.bincount(clusters, minlength=cluster_count), 1)[:, None]
+    new_uvs = None
+    if uvs is not None:
+        new_uvs = np.stack([np.bincount(clusters, weights=uvs[:, i], minlength=cluster_count) for i in range(2)], axis=1) / counts
+    new_normals = None
+    if mesh['normals'] is not None:
+        summed = np.stack([np.bincount(clusters, weights=mesh['normals'][:, i], minlength=cluster_count) for i in range(3)], axis=1)
+        lengths = np.linalg.norm(summed, axis=1, keepdims=True)
+        new_normals = summed / np.where(lengths > 0, lengths, 1.0)
+
+    # 삼각형 재매핑 - 퇴화/중복 삼각형 제거 (재질 순서 유지)
+    remapped = clusters[triangles]
+    valid = (remapped[:, 0] != remapped[:, 1]) & (remapped[:, 1] != remapped[:, 2]) & (remapped[:, 0] != remapped[:, 2])
+    remapped = remapped[valid]
+    triangle_materials = triangle_materials[valid]
+    _, first = np.unique(np.sort(remapped, axis=1), axis=0, return_index=True)
+    keep = np.sort(first)
+    remapped = remapped[keep]
+    triangle_materials = triangle_materials[keep]
+
+    # 사용하지 않는 클러스터 제거
+    used, compact = np.unique(remapped, return_inverse=True)
+    indices = compact.reshape(-1).astype(np.uint32)
+
+    groups = []
+    for number, group in enumerate(mesh['groups']):
+        members = np.flatnonzero(triangle_materials == number)
+        if len(members):
+            groups.append({'material': group['material'], 'start': int(members[0]) * 3, 'count': len(members) * 3})
+
+    return {
+        'positions': new_positions[used].astype(np.float32),
+        'uvs': new_uvs[used].astype(np.float32) if new_uvs is not None else None,
+        'normals': new_normals[used].astype(np.float32) if new_normals is not None else None,
+        'indices': indices,
+        'groups': groups
+    }
+
+def build_lods(mesh, targets=None):
+    """LOD 목록 생성 (고해상도 → 저해상도) - 원본보다 충분히 작아지는 단계만"""
+    targets = LOD_TARGETS if targets is None else targets
+    triangle_count = len(mesh['indices']) // 3
+
+    lods = []
+    for target in sorted(targets, reverse=True):
+        if target > triangle_count * LOD_MIN_REDUCTION:
+            continue
+        lods.append(simplify_mesh(mesh, target))
+    return lods
+
+def compile_obj_with_lods(obj_content, targets=None):
+    """OBJ를 바이너리 메시 + LOD 바이너리 목록으로 컴파일
+
+    Returns:
+        tuple: (mesh_data, lod_data) - lod_data는 [lod1, lod2, ...] (뒤로 갈수록 거침)
+    """
+    parsed = parse_obj(obj_content)
+    if parsed.face_count == 0:
+        raise ValueError("OBJ 파일에 면(f) 정보가 없습니다.")
+
+    mesh = build_render_mesh(parsed)
+    return encode_mesh(mesh), [encode_mesh(lod) for lod in build_lods(mesh, targets)]
+
+# 테스트 함수
+def test_mesh_lod():
+    """격자 메시 LOD 생성 테스트"""
+    from obj_parser import _grid_obj
+    from mesh_compiler import decode_mesh
+
+    print("🧪 LOD 생성 테스트")
+
+    mesh_data, lod_data = compile_obj_with_lods(_grid_obj(200_000), targets=[50_000, 5_000])
+    full = decode_mesh(mesh_data)
+    print(f"원본: {len(full['indices']) // 3:,} 삼각형, {len(mesh_data):,} bytes")
+
+    previous = len(full['indices']) // 3
+    for level, data in enumerate(lod_data, start=1):
+        lod = decode_mesh(data)
+        triangles = len(lod['indices']) // 3
+        print(f"LOD{level}: {triangles:,} 삼각형, {len(data):,} bytes")
+
+        assert triangles < previous
+        assert [group['material'] for group in lod['groups']] == ['Front', 'Back']
+        assert np.allclose(lod['positions'].min(axis=0), full['positions'].min(axis=0), atol=0.05)
+        assert np.allclose(lod['positions'].max(axis=0), full['positions'].max(axis=0), atol=0.05)
+        previous = triangles
+
+    assert len(lod_data) == 2
+
+if __name__ == "__main__":
+    test_mesh_lod()
@@ -0,0 +1,192 @@
+"""
+모델 메타데이터 프로세스 공용 캐시
+세션별(st.session_state) 5초 캐시 대신 모든 세션이 같은 목록을 공유하고,
+TTL이 지난 값은 바로 돌려주면서 백그라운드에서 갱신 (stale-while-revalidate)
+
+- ttl 이내: 캐시 값 그대로 사용
+- ttl ~ ttl + stale_ttl: 캐시 값을 돌려주고 백그라운드에서 한 번만 갱신
+- 그 이후 또는 invalidate() 후: 호출한 쪽에서 바로 조회
+- 튜플 키(필터/정렬별 페이지 등 조건마다 생기는 키)는 최근 사용 순서로 최대 개수 제한
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+
+# 캐시 설정 (환경변수로 조정 가능)
+MODEL_CACHE_TTL = float(os.getenv('MODEL_CACHE_TTL', '30'))              # 초
+MODEL_CACHE_STALE_TTL = float(os.getenv('MODEL_CACHE_STALE_TTL', '600'))  # 초
+MODEL_QUERY_CACHE_SIZE = int(os.getenv('MODEL_QUERY_CACHE_SIZE', '64'))   # 튜플 키 최대 개수
+
+class MetadataCache:
+    """키별 값 + 조회 시각을 보관하는 스레드 안전 캐시"""
+
+    def __init__(self, ttl=MODEL_CACHE_TTL, stale_ttl=MODEL_CACHE_STALE_TTL, max_query_keys=MODEL_QUERY_CACHE_SIZE):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_query_keys = max_query_keys
+        self._entries = OrderedDict()  # key -> (value, loaded_at), 최근 사용한 키가 뒤쪽
+        self._refreshing = set()  # 백그라운드 갱신 중인 키
+        self._generation = 0      # invalidate()마다 증가 - 그 전에 시작된 조회 결과는 버림
+        self._lock = threading.Lock()
+
+        # 크기 산정용 카운터
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get(self, key, loader):
+        """캐시 조회 - loader()는 값 또는 실패 시 None 반환"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            generation = self._generation
+            if entry is not None:
+                self._entries.move_to_end(key)
+                value, loaded_at = entry
+                age = now - loaded_at
+                if age < self.ttl:
+                    self.hits += 1
+                    return value
+                if age < self.ttl + self.stale_ttl:
+                    self.stale_hits += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(
+                            target=self._refresh, args=(key, loader, generation),
+                            name=f'metadata-refresh-{key}', daemon=True
+                        ).start()
+                    return value
+            self.misses += 1
+
+        value = loader()
+        if value is None:
+            # 조회 실패 시 오래된 값이라도 있으면 사용
+            return entry[0] if entry is not None else None
+        self._store(key, value, generation)
+        return value
+
+    def _refresh(self, key, loader, generation):
+        try:
+            value = loader()
+            if value is not None:
+                self._store(key, value, generation)
+        except Exception as e:
+            print(f"[DEBUG] 메타데이터 백그라운드 갱신 실패 ({key}): {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _store(self, key, value, generation):
+        with self._lock:
+            if generation == self._generation:
+                self._put(key, value)
+
+    def _put(self, key, value):
+        """값 저장 + 튜플 키 개수 제한 (호출자가 lock 보유)"""
+        self._entries[key] = (value, time.time())
+        self._entries.move_to_end(key)
+        if isinstance(key, tuple):
+            query_keys = [other for other in self._entries if isinstance(other, tuple)]
+            for other in query_keys[:max(len(query_keys) - self.max_query_keys, 0)]:
+                del self._entries[other]
+
+    def peek(self, key, fresh=False):
+        """갱신 없이 현재 값만 확인 (없거나 너무 오래됐으면 None)
+
+        fresh=True면 ttl 이내의 값만 반환 (stale 구간의 값은 None)
+        """
+        max_age = self.ttl if fresh else self.ttl + self.stale_ttl
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[1] >= max_age:
+                return None
+            return entry[0]
+
+    def set(self, key, value):
+        with self._lock:
+            self._put(key, value)
+
+    def invalidate(self, key=None):
+        """키(없으면 전체) 무효화 - 다음 조회는 새로 가져옴"""
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'keys': len(self._entries),
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses
+            }
+
+# 프로세스 전역 캐시
+_metadata_cache = None
+_metadata_cache_lock = threading.Lock()
+
+def get_metadata_cache():
+    """프로세스 전역 MetadataCache 반환 (모든 세션 공유)"""
+    global _metadata_cache
+    if _metadata_cache is None:
+        with _metadata_cache_lock:
+            if _metadata_cache is None:
+                _metadata_cache = MetadataCache()
+    return _metadata_cache
+
+# 테스트 함수
+def test_metadata_cache():
+    """TTL/stale-while-revalidate/무효화 테스트"""
+    print("🧪 메타데이터 캐시 테스트")
+
+    calls = []
+    release = threading.Event()
+
+    def loader():
+        calls.append(time.time())
+        if len(calls) > 1:
+            release.wait(5)  # 느린 API 흉내
+        return [f"model-{len(calls)}"]
+
+    cache = MetadataCache(ttl=0.05, stale_ttl=60)
+    assert cache.get('models', loader) == ['model-1']
+    assert cache.get('models', loader) == ['model-1'] and len(calls) == 1, "TTL 이내에는 재조회 없음"
+
+    # TTL 경과 → 오래된 값을 바로 반환하고 갱신은 백그라운드에서 한 번만
+    time.sleep(0.06)
+    assert cache.peek('models') == ['model-1'] and cache.peek('models', fresh=True) is None
+    started = time.perf_counter()
+    assert cache.get('models', loader) == ['model-1']
+    assert cache.get('models', loader) == ['model-1']
+    assert time.perf_counter() - started < 0.5, "느린 API를 기다리지 않음"
+    release.set()
+    for _ in range(100):
+        if cache.peek('models') == ['model-2']:
+            break
+        time.sleep(0.01)
+    assert cache.peek('models') == ['model-2'] and len(calls) == 2
+
+    # 무효화 후에는 바로 새로 조회
+    cache.invalidate()
+    assert cache.peek('models') is None
+    assert cache.get('models', loader) == ['model-3']
+
+    # 조건별 튜플 키는 최근 사용 순서로 개수 제한 (문자열 키는 유지)
+    cache.max_query_keys = 2
+    for text in ('a', 'b', 'c'):
+        cache.get(('page', text), lambda: [text])
+        if text == 'b':
+            cache.get(('page', 'a'), loader)  # 'a'를 최근 사용으로
+    assert cache.peek(('page', 'b')) is None
+    assert cache.peek(('page', 'a')) == ['a'] and cache.peek(('page', 'c')) == ['c']
+    assert cache.peek('models') == ['model-3']
+
+    print(f"✅ {cache.stats()}")
+
+if __name__ == "__main__":
+    test_metadata_cache()
@@ -0,0 +1,223 @@
+"""
+multipart/form-data 스트리밍 본문
+업로드 버퍼(UploadedFile.getbuffer()의 memoryview 등)를 통째로 복사하지 않고
+requests가 read()로 읽어 가는 만큼만 잘라서 전송
+
+requests의 files= 인자는 전체 본문을 메모리에 한 번 더 만들기 때문에
+큰 OBJ(수백 MB)는 파일 크기만큼 추가 메모리가 필요했음
+"""
+
+import io
+import os
+import sys
+import uuid
+
+# read() 한 번에 넘길 최대 크기
+STREAM_CHUNK_BYTES = int(os.getenv('MULTIPART_CHUNK_BYTES', str(1024 * 1024)))
+
+def as_byte_view(content):
+    """str/bytes/bytearray/memoryview → 바이트 단위 memoryview (str만 인코딩 복사)"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    view = memoryview(content)
+    return view.cast('B') if view.format != 'B' or view.ndim != 1 else view
+
+class MultipartStream(io.RawIOBase):
+    """파일 1개 + 일반 필드로 된 multipart 본문을 읽기 전용 스트림으로 제공
+
+    len()이 있으므로 requests가 Content-Length를 설정함 (chunked 전송 아님 - PHP 호환)
+    """
+
+    def __init__(self, fields, file_field, filename, content, content_type='application/octet-stream',
+                 chunk_bytes=STREAM_CHUNK_BYTES):
+        super().__init__()
+        self.boundary = uuid.uuid4().hex
+        self.chunk_bytes = chunk_bytes
+
+        head = []
+        for name, value in fields.items():
+            head.append(
+                f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+            )
+        head.append(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        )
+
+        self._parts = [
+            memoryview(''.join(head).encode('utf-8')),
+            as_byte_view(content),
+            memoryview(f'\r\n--{self.boundary}--\r\n'.encode('utf-8'))
+        ]
+        self._length = sum(len(part) for part in self._parts)
+        self._part = 0
+        self._offset = 0
+
+    @property
+    def content_type(self):
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    def __len__(self):
+        return self._length
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return sum(len(part) for part in self._parts[:self._part]) + self._offset
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        """재시도/리다이렉트 시 처음부터 다시 보낼 수 있도록 위치 이동 지원"""
+        if whence == io.SEEK_CUR:
+            offset += self.tell()
+        elif whence == io.SEEK_END:
+            offset += self._length
+        offset = min(max(offset, 0), self._length)
+
+        self._part = 0
+        self._offset = offset
+        while self._part < len(self._parts) and self._offset >= len(self._parts[self._part]):
+            self._offset -= len(self._parts[self._part])
+            self._part += 1
+        if self._part == len(self._parts):
+            self._offset = 0
+        return offset
+
+    def read(self, size=-1):
+        """최대 size 바이트 반환 (size가 없으면 chunk_bytes 단위)"""
+        if size is None or size < 0:
+            size = self.chunk_bytes
+        size = min(size, self.chunk_bytes)
+
+        while self._part < len(self._parts):
+            part = self._parts[self._part]
+            if self._offset < len(part):
+                piece = part[self._offset:self._offset + size]
+                self._offset += len(piece)
+                return piece.tobytes()
+            self._part += 1
+            self._offset = 0
+        return b''
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+# 테스트 함수
+def test_multipart_stream():
+    """requests의 files= 인코딩과 같은 본문을 만드는지 확인"""
+    import email.parser
+    import email.policy
+
+    print("🧪 multipart 스트리밍 테스트")
+
+    content = bytearray(os.urandom(3 * 1024 * 1024 + 17))
+    stream = MultipartStream({'model_id': 'abc', 'action': 'upload'}, 'file', 'model.obj', memoryview(content),
+                             chunk_bytes=64 * 1024)
+    body = b''.join(iter(lambda: stream.read(10_000), b''))
+    assert len(body) == len(stream)
+
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        f'Content-Type: {stream.content_type}\r\n\r\n'.encode() + body
+    )
+    parts = {part.get_param('name', header='content-disposition'): part for part in message.iter_parts()}
+    assert parts['model_id'].get_content() == 'abc'
+    assert parts['action'].get_content() == 'upload'
+    assert parts['file'].get_filename() == 'model.obj'
+    assert parts['file'].get_payload(decode=True) == bytes(content)
+
+    # 처음으로 되감아서 다시 읽기 (재시도)
+    stream.seek(0)
+    assert stream.read(5) == body[:5]
+    stream.seek(len(stream) - 3)
+    assert stream.read() == body[-3:]
+
+    print(f"✅ {len(body):,} bytes 본문 일치")
+
+def _benchmark_worker(mode, size_mb, url):
+    """업로드 경로 1개 실행 후 최대 RSS 출력 (별도 프로세스에서 실행)"""
+    import resource
+    import tempfile
+    import http_transport
+
+    # Streamlit UploadedFile(BytesIO)과 같은 업로드 버퍼
+    chunk = os.urandom(1024 * 1024)
+    upload = io.BytesIO()
+    for _ in range(size_mb):
+        upload.write(chunk)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    if mode == 'legacy':
+        # 기존 경로: 임시 파일 저장 → 텍스트로 다시 읽기 → 인코딩 → requests files= 본문 생성
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'model.obj')
+            with open(path, 'wb') as f:
+                f.write(upload.getbuffer())
+            with open(path, 'r', encoding='latin-1') as f:
+                obj_content = f.read()
+        file_content = obj_content.encode('latin-1')
+        files = {'file': ('model.obj', file_content), 'model_id': (None, 'bench'), 'action': (None, 'upload')}
+        response = http_transport.post(url, endpoint='upload', files=files)
+    else:
+        stream = MultipartStream({'model_id': 'bench', 'action': 'upload'}, 'file', 'model.obj', upload.getbuffer())
+        response = http_transport.post(url, endpoint='upload', data=stream,
+                                       headers={'Content-Type': stream.content_type})
+
+    assert response.status_code == 200
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    scale = 1 if sys.platform == 'darwin' else 1024  # Linux는 KB 단위
+    print((peak - baseline) * scale)
+
+def benchmark_upload_memory(size_mb=200):
+    """기존 업로드 경로 vs 스트리밍 경로의 추가 최대 RSS 비교"""
+    import threading
+    import subprocess
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    print(f"⏱️ 업로드 메모리 벤치마크: OBJ {size_mb}MB")
+
+    class DiscardHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            remaining = int(self.headers.get('Content-Length', 0))
+            while remaining > 0:
+                remaining -= len(self.rfile.read(min(remaining, 1024 * 1024)))
+            body = b'{"success": true}'
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), DiscardHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/upload.php"
+
+    results = {}
+    try:
+        for mode in ('legacy', 'stream'):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--benchmark-worker', mode, str(size_mb), url],
+                capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+            ).stdout.strip().splitlines()[-1]
+            results[mode] = int(output)
+            print(f"   {mode}: 업로드 버퍼 외 추가 최대 RSS {results[mode] / (1024 * 1024):,.1f}MB")
+    finally:
+        server.shutdown()
+
+    saved = (results['legacy'] - results['stream']) / (1024 * 1024)
+    print(f"   → 업로드당 최대 메모리 {saved:,.1f}MB 감소")
+    return results
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--benchmark-worker':
+        _benchmark_worker(sys.argv[2], int(sys.argv[3]), sys.argv[4])
+    else:
+        test_multipart_stream()
+        benchmark_upload_memory()
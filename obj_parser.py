@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+NumPy 기반 OBJ 파서
+줄 단위 Python 루프 없이 바이트 배열에서 레코드 종류를 한 번에 분류하고,
+v/vt/vn/f 숫자는 청크 단위로 np.fromstring 일괄 변환
+
+지원 레코드: v, vt, vn, f (다각형은 부채꼴 삼각형 분할, 음수 인덱스), usemtl, o, g
+"""
+
+import os
+import numpy as np
+
+# 한 번에 변환할 청크 크기 (줄 경계 기준으로 자름)
+CHUNK_BYTES = int(os.getenv('OBJ_PARSE_CHUNK_BYTES', str(16 * 1024 * 1024)))
+
+DEFAULT_MATERIAL = 'default'
+DEFAULT_OBJECT = 'default'
+
+# 줄 종류
+_OTHER, _V, _VT, _VN, _F, _USEMTL, _OBJECT = range(7)
+
+_SPACE, _TAB, _CR, _LF, _SLASH, _HASH = 32, 9, 13, 10, 47, 35
+
+class ParsedObj:
+    """파싱된 OBJ 지오메트리
+
+    Attributes:
+        positions: (N, 3) float64 정점 좌표
+        texcoords: (M, 2) float64 UV 좌표
+        normals: (K, 3) float64 노멀
+        corners: (T, 3, 3) int64 삼각형 모서리별 [v, vt, vn] 인덱스 (0부터, 없으면 -1)
+        face_materials: (T,) int64 삼각형별 재질 번호 (material_names 인덱스)
+        face_objects: (T,) int64 삼각형별 오브젝트/그룹 번호 (object_names 인덱스)
+    """
+
+    def __init__(self, positions, texcoords, normals, corners, face_materials, material_names, face_objects, object_names):
+        self.positions = positions
+        self.texcoords = texcoords
+        self.normals = normals
+        self.corners = corners
+        self.face_materials = face_materials
+        self.material_names = material_names
+        self.face_objects = face_objects
+        self.object_names = object_names
+
+    @property
+    def vertex_count(self):
+        return len(self.positions)
+
+    @property
+    def face_count(self):
+        return len(self.corners)
+
+    @property
+    def faces(self):
+        """(T, 3) 정점 인덱스만"""
+        return self.corners[:, :, 0]
+
+    def material_groups(self):
+        """재질 이름 → 해당 삼각형 인덱스 배열"""
+        order = np.argsort(self.face_materials, kind='stable')
+        materials, starts = np.unique(self.face_materials[order], return_index=True)
+        groups = {}
+        for material, chunk in zip(materials, np.split(order, starts[1:])):
+            groups[self.material_names[int(material)]] = chunk
+        return groups
+
+    def bounds(self):
+        """면이 참조하는 정점의 경계 상자 (min, max)"""
+        if not self.face_count:
+            return np.zeros(3), np.zeros(3)
+        used = self.positions[np.unique(self.faces)]
+        return used.min(axis=0), used.max(axis=0)
+
+    def stats(self):
+        """간단한 통계"""
+        low, high = self.bounds()
+        return {
+            'vertices': self.vertex_count,
+            'texcoords': len(self.texcoords),
+            'normals': len(self.normals),
+            'triangles': self.face_count,
+            'materials': len(self.material_names),
+            'objects': len(self.object_names),
+            'bounds_min': low.tolist(),
+            'bounds_max': high.tolist()
+        }
+
+class _ParseState:
+    """청크 사이에 이어지는 상태 (정점 수, 현재 재질/오브젝트)"""
+
+    def __init__(self):
+        self.counts = {_V: 0, _VT: 0, _VN: 0}
+        self.material = -1
+        self.object = -1
+        self.material_ids = {}
+        self.material_names = []
+        self.object_ids = {}
+        self.object_names = []
+
+    def name_id(self, name, ids, names):
+        if name not in ids:
+            ids[name] = len(names)
+            names.append(name)
+        return ids[name]
+
+def _token_starts(buffer):
+    """공백 다음에 오는 공백 아닌 바이트 위치 (토큰 시작)"""
+    is_space = (buffer == _SPACE) | (buffer == _TAB) | (buffer == _CR) | (buffer == _LF)
+    starts = ~is_space
+    starts[1:] &= is_space[:-1]
+    return starts
+
+def _select_lines(buffer, line_lengths, mask):
+    """특정 종류 줄들의 바이트만 모아서 반환 (각 줄은 개행 포함, 줄 끝 '# 주석'은 공백으로 지움)"""
+    byte_mask = np.repeat(mask, line_lengths)
+    selected = buffer[byte_mask]
+
+    hash_positions = np.flatnonzero(selected == _HASH)
+    if len(hash_positions):
+        # 줄마다 첫 '#'부터 개행 전까지 공백으로 - 바이트 위치 → 줄 번호는 개행 위치 이진 탐색
+        newline_positions = np.flatnonzero(selected == _LF)
+        line_of_byte = np.searchsorted(newline_positions, np.arange(len(selected)))
+        first_hash = np.full(len(newline_positions) + 1, len(selected))
+        np.minimum.at(first_hash, np.searchsorted(newline_positions, hash_positions), hash_positions)
+        comment = np.arange(len(selected)) >= first_hash[line_of_byte]
+        comment &= selected != _LF
+        selected[comment] = _SPACE
+    return selected
+
+def _parse_vectors(buffer, line_lengths, mask, width):
+    """v/vt/vn 줄들을 (n, width) float 배열로 변환"""
+    line_count = int(mask.sum())
+    if not line_count:
+        return np.zeros((0, width))
+
+    selected = _select_lines(buffer, line_lengths, mask)
+    values = np.fromstring(selected.tobytes(), dtype=np.float64, sep=' ')
+
+    if len(values) == line_count * width:
+        return values.reshape(-1, width)
+
+    # 줄마다 값 개수가 다른 경우 (v x y z w, 정점 색상 등) 앞쪽 width개만 사용
+    token_positions = np.flatnonzero(_token_starts(selected))
+    token_line = np.searchsorted(np.flatnonzero(selected == _LF), token_positions)
+    per_line = np.bincount(token_line, minlength=line_count)
+    if per_line.sum() != len(values):
+        raise ValueError("OBJ 숫자 레코드를 해석할 수 없습니다.")
+
+    # 값이 부족한 줄 (vt u 등)은 0으로 채움
+    offsets = np.cumsum(per_line) - per_line
+    result = np.zeros((line_count, width))
+    for column in range(width):
+        present = per_line > column
+        result[present, column] = values[offsets[present] + column]
+    return result
+
+def _parse_faces(buffer, line_lengths, mask):
+    """f 줄들을 모서리별 [v, vt, vn] 원시 인덱스와 줄별 모서리 수로 변환"""
+    line_count = int(mask.sum())
+    if not line_count:
+        return np.zeros((0, 3), np.int64), np.zeros(0, np.int64)
+
+    # 'a//c' 형식과 'a/b/'처럼 끝이 '/'인 빈 필드는 0(없음)으로 채움 - OBJ 인덱스는 0을 쓰지 않음
+    selected = _select_lines(buffer, line_lengths, mask).tobytes().replace(b'//', b'/0/')
+    for separator in (b' ', b'\t', b'\r', b'\n'):
+        selected = selected.replace(b'/' + separator, b'/0' + separator)
+    selected = np.frombuffer(selected, dtype=np.uint8).copy()
+
+    # 바이트 위치 → 토큰/줄 번호는 정렬된 위치 배열에서 이진 탐색
+    token_positions = np.flatnonzero(_token_starts(selected))
+    newline_positions = np.flatnonzero(selected == _LF)
+    slash_positions = np.flatnonzero(selected == _SLASH)
+
+    token_count = len(token_positions)
+    token_of_slash = np.searchsorted(token_positions, slash_positions, side='right') - 1
+    fields = np.bincount(token_of_slash, minlength=token_count) + 1
+    corners_per_line = np.bincount(np.searchsorted(newline_positions, token_positions), minlength=line_count)
+
+    selected[slash_positions] = _SPACE
+    values = np.fromstring(selected.tobytes(), dtype=np.int64, sep=' ')
+    if len(values) != fields.sum():
+        raise ValueError("OBJ 면(f) 레코드를 해석할 수 없습니다.")
+
+    offsets = np.cumsum(fields) - fields
+    raw = np.zeros((token_count, 3), np.int64)
+    for column in range(3):
+        present = fields > column
+        raw[present, column] = values[offsets[present] + column]
+    return raw, corners_per_line
+
+def _resolve(raw, counts_before):
+    """1부터 시작하는 인덱스/음수 인덱스를 0부터 시작하는 인덱스로 (없으면 -1)"""
+    return np.where(raw > 0, raw - 1, np.where(raw < 0, counts_before + raw, -1))
+
+def _line_names(chunk, line_starts, line_ends, mask, keyword_length):
+    """usemtl/o/g 줄에서 이름 추출 (줄 수가 적으므로 Python으로 처리)"""
+    names = []
+    for start, end in zip(line_starts[mask], line_ends[mask]):
+        name = chunk[start + keyword_length:end].decode('utf-8', errors='ignore').strip()
+        names.append(name or DEFAULT_MATERIAL)
+    return names
+
+def _forward_fill(mask, ids, previous):
+    """각 줄 시점에 유효한 이름 번호 (이전 청크 값 이어받음)"""
+    position = np.cumsum(mask) - 1
+    table = np.concatenate([[previous], np.asarray(ids, dtype=np.int64)])
+    return table[position + 1]
+
+def _parse_chunk(chunk, state, out):
+    """줄 경계로 자른 청크 1개 파싱"""
+    if not chunk.endswith(b'\n'):
+        chunk += b'\n'
+
+    buffer = np.frombuffer(chunk, dtype=np.uint8).copy()
+    line_ends = np.flatnonzero(buffer == _LF)
+    line_starts = np.concatenate([[0], line_ends[:-1] + 1])
+    line_lengths = line_ends - line_starts + 1
+
+    # 들여쓰기된 줄이 있으면 이 청크만 앞 공백 제거 후 다시 파싱 (드문 경우)
+    first = buffer[line_starts]
+    if np.any((first == _SPACE) | (first == _TAB)):
+        stripped = b'\n'.join(line.lstrip(b' \t') for line in chunk.split(b'\n'))
+        if stripped != chunk:
+            return _parse_chunk(stripped, state, out)
+
+    second = buffer[np.minimum(line_starts + 1, len(buffer) - 1)]
+    separated = (second == _SPACE) | (second == _TAB)
+
+    kinds = np.full(len(line_starts), _OTHER, dtype=np.uint8)
+    kinds[(first == ord('v')) & separated] = _V
+    kinds[(first == ord('v')) & (second == ord('t'))] = _VT
+    kinds[(first == ord('v')) & (second == ord('n'))] = _VN
+    kinds[(first == ord('f')) & separated] = _F
+    kinds[((first == ord('o')) | (first == ord('g'))) & (separated | (second == _LF) | (second == _CR))] = _OBJECT
+    usemtl = (first == ord('u')) & (second == ord('s'))
+    usemtl[usemtl] = [chunk[start:start + 6] == b'usemtl' for start in line_starts[usemtl]]
+    kinds[usemtl] = _USEMTL
+
+    # 키워드 바이트를 공백으로 지워서 숫자만 남김
+    buffer[line_starts[kinds == _V]] = _SPACE
+    buffer[line_starts[kinds == _F]] = _SPACE
+    for kind in (_VT, _VN):
+        starts = line_starts[kinds == kind]
+        buffer[starts] = _SPACE
+        buffer[starts + 1] = _SPACE
+
+    out['positions'].append(_parse_vectors(buffer, line_lengths, kinds == _V, 3))
+    out['texcoords'].append(_parse_vectors(buffer, line_lengths, kinds == _VT, 2))
+    out['normals'].append(_parse_vectors(buffer, line_lengths, kinds == _VN, 3))
+
+    # 재질/오브젝트 이름 → 번호
+    material_ids = [
+        state.name_id(name, state.material_ids, state.material_names)
+        for name in _line_names(chunk, line_starts, line_ends, kinds == _USEMTL, 6)
+    ]
+    object_ids = [
+        state.name_id(name, state.object_ids, state.object_names)
+        for name in _line_names(chunk, line_starts, line_ends, kinds == _OBJECT, 1)
+    ]
+    line_materials = _forward_fill(kinds == _USEMTL, material_ids, state.material)
+    line_objects = _forward_fill(kinds == _OBJECT, object_ids, state.object)
+
+    # 면 파싱
+    face_mask = kinds == _F
+    raw, corners_per_line = _parse_faces(buffer, line_lengths, face_mask)
+    if len(raw):
+        face_lines = np.flatnonzero(face_mask)
+        corner_lines = np.repeat(face_lines, corners_per_line)
+
+        # 각 면 시점까지 정의된 v/vt/vn 개수 (음수 인덱스 기준)
+        resolved = np.empty_like(raw)
+        for column, kind in enumerate((_V, _VT, _VN)):
+            if np.any(raw[:, column] < 0):
+                counts_before = state.counts[kind] + np.cumsum(kinds == kind)[corner_lines]
+            else:
+                counts_before = 0
+            resolved[:, column] = _resolve(raw[:, column], counts_before)
+
+        # 부채꼴 삼각형 분할: (0, i, i+1)
+        triangles_per_line = np.maximum(corners_per_line - 2, 0)
+        first_corner = np.cumsum(corners_per_line) - corners_per_line
+        triangle_lines = np.repeat(np.arange(len(face_lines)), triangles_per_line)
+        step = np.arange(len(triangle_lines)) - np.repeat(np.cumsum(triangles_per_line) - triangles_per_line, triangles_per_line)
+        anchor = first_corner[triangle_lines]
+        corner_index = np.stack([anchor, anchor + step + 1, anchor + step + 2], axis=1)
+
+        out['corners'].append(resolved[corner_index])
+        out['face_materials'].append(line_materials[face_lines][triangle_lines])
+        out['face_objects'].append(line_objects[face_lines][triangle_lines])
+
+    for kind in (_V, _VT, _VN):
+        state.counts[kind] += int(np.count_nonzero(kinds == kind))
+    state.material = int(line_materials[-1])
+    state.object = int(line_objects[-1])
+
+def _iter_chunks(data, chunk_bytes):
+    """줄 경계 기준으로 청크 분할"""
+    start = 0
+    while start < len(data):
+        end = start + chunk_bytes
+        if end < len(data):
+            newline = data.rfind(b'\n', start, end)
+            end = newline + 1 if newline >= start else data.find(b'\n', end) + 1 or len(data)
+        yield data[start:end]
+        start = end
+
+def parse_obj(obj_content, chunk_bytes=CHUNK_BYTES):
+    """OBJ 텍스트/바이트를 ParsedObj로 파싱"""
+    if isinstance(obj_content, str):
+        data = obj_content.encode('utf-8')
+    else:
+        data = bytes(obj_content)
+
+    state = _ParseState()
+    out = {key: [] for key in ('positions', 'texcoords', 'normals', 'corners', 'face_materials', 'face_objects')}
+    for chunk in _iter_chunks(data, chunk_bytes):
+        _parse_chunk(chunk, state, out)
+
+    def concat(parts, shape, dtype):
+        return np.concatenate(parts).astype(dtype, copy=False) if parts else np.zeros(shape, dtype)
+
+    corners = concat(out['corners'], (0, 3, 3), np.int64)
+    face_materials = concat(out['face_materials'], (0,), np.int64)
+    face_objects = concat(out['face_objects'], (0,), np.int64)
+    material_names = list(state.material_names)
+    object_names = list(state.object_names)
+
+    # usemtl/o/g 이전에 나온 면은 기본 이름
+    if np.any(face_materials < 0):
+        material_names.append(DEFAULT_MATERIAL)
+        face_materials[face_materials < 0] = len(material_names) - 1
+    if np.any(face_objects < 0):
+        object_names.append(DEFAULT_OBJECT)
+        face_objects[face_objects < 0] = len(object_names) - 1
+
+    return ParsedObj(
+        concat(out['positions'], (0, 3), np.float64),
+        concat(out['texcoords'], (0, 2), np.float64),
+        concat(out['normals'], (0, 3), np.float64),
+        corners,
+        face_materials,
+        material_names,
+        face_objects,
+        object_names
+    )
+
+def load_obj(path, chunk_bytes=CHUNK_BYTES):
+    """파일 경로에서 OBJ 파싱"""
+    with open(path, 'rb') as f:
+        return parse_obj(f.read(), chunk_bytes=chunk_bytes)
+
+# 테스트 함수
+def test_obj_parser():
+    """레코드 종류별 파싱 테스트"""
+    print("🧪 OBJ 파서 테스트")
+
+    test_obj = """# Test OBJ file
+mtllib model.mtl
+o Cube
+v 0.0 0.0 0.0
+v 1.0 0.0 0.0 # c
+  v 1.0 1.0 0.0
+v 0.0 1.0 0.0 1.0 # w 포함
+vt 0.0 0.0
+vt 1.0 0.0
+vt 1.0 1.0
+vt 0.0 1.0
+vn 0.0 0.0 1.0
+f 1 2 3 # tri
+usemtl Material1
+f 1/1/1 2/2/1 3/3/1 4/4/1#quad
+g Lid
+usemtl Material2
+f -4//-1 -2//-1 -1//-1
+usemtl Material1
+f 2/2/ 3/3/ 4/4/
+"""
+
+    for chunk_bytes in (CHUNK_BYTES, 40):
+        parsed = parse_obj(test_obj, chunk_bytes=chunk_bytes)
+
+        assert parsed.vertex_count == 4
+        assert parsed.face_count == 5
+        assert parsed.material_names == ['Material1', 'Material2', DEFAULT_MATERIAL]
+        assert parsed.object_names == ['Cube', 'Lid']
+        assert parsed.face_materials.tolist() == [2, 0, 0, 1, 0]
+        assert parsed.face_objects.tolist() == [0, 0, 0, 1, 1]
+        assert parsed.corners[1:3, :, 0].tolist() == [[0, 1, 2], [0, 2, 3]]
+        assert parsed.corners[3].tolist() == [[0, -1, 0], [2, -1, 0], [3, -1, 0]]
+        assert parsed.corners[0, :, 1].tolist() == [-1, -1, -1]
+        assert parsed.corners[4, :, 2].tolist() == [-1, -1, -1]
+        assert {name: groups.tolist() for name, groups in parsed.material_groups().items()} == {
+            'Material1': [1, 2, 4], 'Material2': [3], DEFAULT_MATERIAL: [0]
+        }
+
+    print(f"✅ {parsed.stats()}")
+
+def _grid_obj(face_count):
+    """벤치마크용 격자 OBJ 생성 (사각형 면 → 삼각형 face_count개)"""
+    side = int(np.ceil(np.sqrt(face_count / 2)))
+    u, v = np.meshgrid(np.arange(side + 1), np.arange(side + 1))
+    u = u.ravel() / side
+    v = v.ravel() / side
+    z = np.sin(u * 6.0) * np.cos(v * 6.0) * 0.1
+
+    lines = ["mtllib model.mtl", "o Grid"]
+    lines.extend(f"v {x:.6f} {y:.6f} {h:.6f}" for x, y, h in zip(u, v, z))
+    lines.extend(f"vt {x:.6f} {y:.6f}" for x, y in zip(u, v))
+    lines.append("vn 0.0 0.0 1.0")
+
+    row = side + 1
+    quads = []
+    half = side // 2
+    for material, rows in (("Front", range(half)), ("Back", range(half, side))):
+        quads.append(f"usemtl {material}")
+        for j in rows:
+            for i in range(side):
+                a = j * row + i + 1
+                b, c, d = a + 1, a + row + 1, a + row
+                quads.append(f"f {a}/{a}/1 {b}/{b}/1 {c}/{c}/1 {d}/{d}/1")
+    lines.extend(quads)
+    return ("\n".join(lines) + "\n").encode('utf-8')
+
+def benchmark_obj_parser(face_count=1_000_000):
+    """trimesh.load와 파싱 시간 비교"""
+    import io
+    import time
+    import trimesh
+
+    data = _grid_obj(face_count)
+    print(f"⏱️ OBJ 파싱 벤치마크: {len(data) / (1024 * 1024):.1f}MB")
+
+    started = time.perf_counter()
+    parsed = parse_obj(data)
+    numpy_seconds = time.perf_counter() - started
+    print(f"   obj_parser.parse_obj: {numpy_seconds:.2f}초 ({parsed.face_count:,} 삼각형)")
+
+    started = time.perf_counter()
+    scene = trimesh.load(io.BytesIO(data), file_type='obj', process=False)
+    trimesh_seconds = time.perf_counter() - started
+    faces = sum(len(geometry.faces) for geometry in scene.geometry.values()) if hasattr(scene, 'geometry') else len(scene.faces)
+    print(f"   trimesh.load:         {trimesh_seconds:.2f}초 ({faces:,} 삼각형)")
+    print(f"   속도 비율: {trimesh_seconds / numpy_seconds:.1f}x")
+
+    return {'numpy_seconds': numpy_seconds, 'trimesh_seconds': trimesh_seconds, 'faces': parsed.face_count}
+
+if __name__ == "__main__":
+    test_obj_parser()
+    benchmark_obj_parser()
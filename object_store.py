@@ -0,0 +1,70 @@
+"""
+디스크 캐시 공용 파일 저장소
+해시 이름의 파일을 objects/ab/abcdef... 에 저장하고(임시 파일 + os.replace로 원자적 저장),
+인덱스(SQLite)의 항목을 오래 사용하지 않은 순서로 정리하는 LRU 제거를 제공
+asset_cache(웹서버 다운로드 파일)와 texture_cache(텍스처 최적화 결과)가 함께 사용
+"""
+
+import os
+import tempfile
+
+class ObjectStore:
+    """해시 이름 파일 저장소 (인덱스는 사용하는 쪽에서 관리)"""
+
+    def __init__(self, objects_dir):
+        self.objects_dir = objects_dir
+        os.makedirs(objects_dir, exist_ok=True)
+
+    def path(self, name):
+        """이름에 해당하는 파일 경로 (objects/ab/abcdef...)"""
+        return os.path.join(self.objects_dir, name[:2], name)
+
+    def exists(self, name):
+        return os.path.exists(self.path(name))
+
+    def write(self, name, data):
+        """원자적 저장 - 쓰는 도중의 파일이 다른 스레드/프로세스에 보이지 않음"""
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def read(self, name):
+        """파일 내용 (없으면 None)"""
+        try:
+            with open(self.path(name), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def remove(self, name):
+        try:
+            os.remove(self.path(name))
+        except OSError:
+            pass
+
+def evict_lru(candidates, total, max_bytes, drop):
+    """용량 한도 이하가 될 때까지 오래된 항목부터 제거
+
+    Args:
+        candidates: 마지막 사용 시간 오름차순 (키, 크기) 목록
+        total: 현재 전체 크기
+        drop: drop(키, 크기) → 실제로 줄어든 bytes (같은 파일을 다른 항목이 쓰고 있으면 0)
+
+    Returns:
+        int: 제거한 항목 수
+    """
+    evicted = 0
+    for key, size in candidates:
+        if total <= max_bytes:
+            break
+        total -= drop(key, size)
+        evicted += 1
+    return evicted
@@ -0,0 +1,262 @@
+"""
+SQLite 연결 풀 (모델 DB / 세션 DB 공용)
+요청마다 sqlite3.connect → close 하던 것을 파일별로 연결을 재사용하도록 변경
+- WAL 저널 모드: 읽기와 쓰기가 서로 막지 않음
+- synchronous=NORMAL: WAL에서는 커밋마다 fsync하지 않아도 DB가 깨지지 않음
+- busy_timeout: 쓰기 잠금 충돌 시 바로 실패하지 않고 대기
+- cached_statements: 연결을 유지하므로 준비된 SQL 문 캐시가 계속 재사용됨
+
+기존 코드처럼 conn = connect(path) ... conn.close() 형태로 사용하며,
+close()는 실제로 닫지 않고 풀에 반환 (끝나지 않은 트랜잭션은 롤백)
+"""
+
+import os
+import time
+import queue
+import sqlite3
+import threading
+
+# 풀 설정 (환경변수로 조정 가능)
+SQLITE_POOL_SIZE = int(os.getenv('SQLITE_POOL_SIZE', '8'))  # 파일별 유지할 유휴 연결 수
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+SQLITE_CACHED_STATEMENTS = int(os.getenv('SQLITE_CACHED_STATEMENTS', '256'))
+
+class PooledConnection:
+    """풀에서 빌린 연결 - close() 시 풀에 반환, 나머지는 sqlite3.Connection과 동일"""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        conn = self.__dict__.get('_conn')
+        if conn is None:
+            raise sqlite3.ProgrammingError("이미 풀에 반환된 연결입니다.")
+        return getattr(conn, name)
+
+    def close(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.release(conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._conn is not None:
+            if exc_type is None:
+                self._conn.commit()
+            else:
+                self._conn.rollback()
+        self.close()
+        return False
+
+    def __del__(self):
+        # close() 없이 버려진 연결도 풀로 회수
+        try:
+            self.close()
+        except Exception:
+            pass
+
+class SQLitePool:
+    """DB 파일 하나에 대한 스레드 안전 연결 풀"""
+
+    def __init__(self, db_path, max_idle=SQLITE_POOL_SIZE, busy_timeout_ms=SQLITE_BUSY_TIMEOUT_MS,
+                 cached_statements=SQLITE_CACHED_STATEMENTS):
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self._idle = queue.LifoQueue(maxsize=max_idle)
+        self._closed = False
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,  # 한 번에 한 스레드만 사용하도록 풀이 보장
+            cached_statements=self.cached_statements
+        )
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        return conn
+
+    def acquire(self):
+        """유휴 연결을 꺼내거나 새로 연결 (풀이 비어도 기다리지 않음)"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+        return PooledConnection(self, conn)
+
+    def release(self, conn):
+        """연결 반환 - 열린 트랜잭션은 롤백, 유휴 한도를 넘으면 닫음"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            return
+
+        if self._closed:
+            conn.close()
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close_all(self):
+        """유휴 연결을 모두 닫음 (DB 파일 삭제/교체 전 호출)"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+# 프로세스 전역 풀 (DB 파일 경로별)
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_path):
+    """DB 파일 경로별 공용 연결 풀 반환"""
+    key = os.path.abspath(db_path)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = SQLitePool(db_path)
+                _pools[key] = pool
+    return pool
+
+def connect(db_path):
+    """sqlite3.connect 대신 사용 - 풀에서 연결을 빌려옴"""
+    return get_pool(db_path).acquire()
+
+def close_pool(db_path):
+    """해당 DB 파일의 풀 정리 (reset 등으로 파일을 지우기 전에 호출)"""
+    with _pools_lock:
+        pool = _pools.pop(os.path.abspath(db_path), None)
+    if pool is not None:
+        pool.close_all()
+
+# 테스트 함수
+def benchmark_sqlite_pool(threads=8, seconds=3.0, write_ratio=0.2):
+    """부하 테스트 - 매번 연결 vs 풀 연결의 초당 읽기/쓰기 처리량"""
+    import random
+    import shutil
+    import tempfile
+
+    print(f"⏱️ SQLite 부하 테스트: 스레드 {threads}개, {seconds}초, 쓰기 비율 {write_ratio:.0%}")
+
+    directory = tempfile.mkdtemp()
+    try:
+        def run(label, open_connection, db_path):
+            setup = sqlite3.connect(db_path)
+            setup.execute('''
+                CREATE TABLE annotations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    model_token TEXT NOT NULL,
+                    text TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            setup.execute('CREATE INDEX idx_annotations_token ON annotations(model_token, created_at)')
+            setup.executemany('INSERT INTO annotations (model_token, text) VALUES (?, ?)',
+                              [(f"token-{i % 500}", f"note {i}") for i in range(20000)])
+            setup.commit()
+            setup.close()
+
+            counts = {'read': 0, 'write': 0, 'error': 0}
+            counts_lock = threading.Lock()
+            deadline = time.perf_counter() + seconds
+
+            def worker(seed):
+                rng = random.Random(seed)
+                reads = writes = errors = 0
+                while time.perf_counter() < deadline:
+                    token = f"token-{rng.randrange(500)}"
+                    try:
+                        conn = open_connection(db_path)
+                        cursor = conn.cursor()
+                        if rng.random() < write_ratio:
+                            cursor.execute('INSERT INTO annotations (model_token, text) VALUES (?, ?)', (token, "load"))
+                            conn.commit()
+                            writes += 1
+                        else:
+                            cursor.execute('SELECT id, text FROM annotations WHERE model_token = ? ORDER BY created_at', (token,))
+                            cursor.fetchall()
+                            reads += 1
+                        conn.close()
+                    except sqlite3.OperationalError:
+                        errors += 1
+                with counts_lock:
+                    counts['read'] += reads
+                    counts['write'] += writes
+                    counts['error'] += errors
+
+            workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+
+            print(f"   {label}: 읽기 {counts['read'] / seconds:,.0f}/s, 쓰기 {counts['write'] / seconds:,.0f}/s, "
+                  f"잠금 오류 {counts['error']}")
+            return counts
+
+        before = run("매번 connect/close", lambda path: sqlite3.connect(path), os.path.join(directory, "direct.db"))
+        pooled_path = os.path.join(directory, "pooled.db")
+        after = run("연결 풀 (WAL)", connect, pooled_path)
+        close_pool(pooled_path)
+
+        total_before = before['read'] + before['write']
+        total_after = after['read'] + after['write']
+        print(f"   → 처리량 {total_after / max(total_before, 1):.1f}배")
+        return before, after
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+def test_sqlite_pool():
+    """연결 재사용/PRAGMA/롤백 테스트"""
+    import shutil
+    import tempfile
+
+    print("🧪 SQLite 연결 풀 테스트")
+
+    directory = tempfile.mkdtemp()
+    db_path = os.path.join(directory, "test.db")
+    try:
+        conn = connect(db_path)
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+        conn.execute('CREATE TABLE items (value INTEGER)')
+        conn.commit()
+        raw = conn._conn
+        conn.close()
+
+        # 같은 연결 재사용 + 커밋하지 않은 변경은 반환 시 롤백
+        conn = connect(db_path)
+        assert conn._conn is raw
+        conn.execute('INSERT INTO items VALUES (1)')
+        conn.close()
+        conn = connect(db_path)
+        assert conn.execute('SELECT COUNT(*) FROM items').fetchone()[0] == 0
+        conn.close()
+
+        with connect(db_path) as conn:
+            conn.execute('INSERT INTO items VALUES (2)')
+        with connect(db_path) as conn:
+            assert conn.execute('SELECT value FROM items').fetchall() == [(2,)]
+
+        close_pool(db_path)
+        print("✅ 연결 재사용, WAL/NORMAL 설정, 미완료 트랜잭션 롤백 확인")
+    finally:
+        close_pool(db_path)
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_sqlite_pool()
+    benchmark_sqlite_pool()
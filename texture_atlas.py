@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+업로드 시 텍스처 아틀라스 생성
+재질(newmtl)마다 map_Kd 텍스처가 따로 있는 모델은 재질 수만큼 드로우 콜/텍스처 바인딩/요청이 생기므로,
+작은 텍스처들을 몇 장의 아틀라스로 합치고 재질별 UV를 아틀라스 좌표로 바꾼 뒤 같은 아틀라스를 쓰고
+속성(Kd, d, illum 등)이 같은 재질 그룹을 하나로 합침
+
+- 속성이 다른 재질은 아틀라스 페이지는 같이 쓰되 재질 그룹은 따로 유지
+- map_Kd 외의 텍스처 맵(map_d, map_Bump 등)이 있는 재질은 UV를 바꾸면 그 맵이 어긋나므로 아틀라스에서 제외
+
+- 뷰어는 모든 텍스처를 ClampToEdge로 쓰므로 [0, 1] 밖 UV는 잘라서 같은 결과를 유지
+- 타일 주변은 가장자리 픽셀로 채워서(padding) 밉맵/필터링 시 옆 타일 색이 섞이지 않도록 함
+- LOD는 재질 그룹을 합치기 전에 만들어서 다른 타일의 UV끼리 평균되지 않도록 함
+
+선택 기능: 업로드 화면에서 선택 (TEXTURE_ATLAS=1이면 기본으로 선택됨)
+"""
+
+import io
+import os
+import numpy as np
+from PIL import Image
+from obj_parser import parse_obj
+from mesh_compiler import build_render_mesh, encode_mesh, write_obj
+from mesh_lod import build_lods
+
+# 아틀라스 설정 (환경변수로 조정 가능)
+TEXTURE_ATLAS = os.getenv('TEXTURE_ATLAS', '0') == '1'
+TEXTURE_ATLAS_MIN_MATERIALS = int(os.getenv('TEXTURE_ATLAS_MIN_MATERIALS', '4'))  # 이보다 적으면 합치지 않음
+TEXTURE_ATLAS_PADDING = int(os.getenv('TEXTURE_ATLAS_PADDING', '8'))              # 타일 주변 여백 (px)
+TEXTURE_ATLAS_QUALITY = int(os.getenv('TEXTURE_ATLAS_QUALITY', '95'))             # 불투명 아틀라스 JPEG 품질
+
+ATLAS_PREFIX = 'atlas'
+TEXTURE_MAP_PREFIXES = ('map_Kd ', 'map_Ka ', 'map_Ks ', 'map_Bump ', 'map_d ', 'bump ')
+
+def parse_mtl_blocks(mtl_content):
+    """MTL → (첫 newmtl 전 줄들, [(재질 이름, 줄들)])"""
+    header = []
+    blocks = []
+    for line in mtl_content.split('\n'):
+        stripped = line.strip()
+        if stripped.startswith('newmtl '):
+            blocks.append((stripped[7:].strip(), [line]))
+        elif blocks:
+            blocks[-1][1].append(line)
+        else:
+            header.append(line)
+    return header, blocks
+
+def _diffuse_texture(lines):
+    """재질 블록의 map_Kd 파일명 (경로 제거, 없으면 None)"""
+    texture = None
+    for line in lines:
+        parts = line.strip().split()
+        if len(parts) >= 2 and parts[0] == 'map_Kd':
+            texture = os.path.basename(parts[-1].replace('\\', '/'))
+    return texture
+
+def _other_texture_maps(lines):
+    """map_Kd 외의 텍스처 맵 줄이 있는지 여부"""
+    return any(
+        line.strip().startswith(prefix) for line in lines for prefix in TEXTURE_MAP_PREFIXES if prefix != 'map_Kd '
+    )
+
+def _material_signature(lines):
+    """재질 속성 비교용 키 - newmtl/텍스처 맵/빈 줄/주석을 뺀 줄들 (공백 정리)"""
+    signature = []
+    for line in lines[1:]:
+        stripped = ' '.join(line.split())
+        if not stripped or stripped.startswith('#'):
+            continue
+        if any(stripped.startswith(prefix) for prefix in TEXTURE_MAP_PREFIXES):
+            continue
+        signature.append(stripped)
+    return tuple(signature)
+
+def _match_texture(reference, texture_names):
+    """MTL 참조 이름 → 업로드된 텍스처 이름 (정확히 → 대소문자 무시 → 확장자/공백/기호 무시)"""
+    if reference in texture_names:
+        return reference
+    lowered = {name.lower(): name for name in texture_names}
+    if reference.lower() in lowered:
+        return lowered[reference.lower()]
+
+    def normalize(name):
+        stem = os.path.splitext(name)[0]
+        return ''.join(char for char in stem if char not in ' _-').lower()
+
+    normalized = {normalize(name): name for name in texture_names}
+    return normalized.get(normalize(reference))
+
+def _next_power_of_2(n):
+    power = 1
+    while power < n:
+        power *= 2
+    return power
+
+def pack_tiles(sizes, page_size, padding=TEXTURE_ATLAS_PADDING):
+    """선반(shelf) 방식 패킹 - 높이 내림차순으로 줄을 채우고, 페이지가 차면 새 페이지
+
+    Args:
+        sizes: {이름: (너비, 높이)}
+
+    Returns:
+        tuple: ({이름: (페이지 번호, x, y)}, [(페이지 너비, 페이지 높이)]) - 좌표는 여백 안쪽 기준
+    """
+    placements = {}
+    pages = []  # [used_width, used_height, shelf_y, shelf_x, shelf_height]
+    for name, (width, height) in sorted(sizes.items(), key=lambda item: (-item[1][1], -item[1][0], item[0])):
+        slot_width = width + 2 * padding
+        slot_height = height + 2 * padding
+        placed = False
+        for number, page in enumerate(pages):
+            used_width, used_height, shelf_y, shelf_x, shelf_height = page
+            if shelf_x + slot_width <= page_size and shelf_y + slot_height <= page_size and slot_height <= shelf_height:
+                x, y = shelf_x, shelf_y
+            elif shelf_y + shelf_height + slot_height <= page_size and slot_width <= page_size:
+                # 새 줄
+                shelf_y += shelf_height
+                shelf_x, shelf_height = 0, slot_height
+                x, y = 0, shelf_y
+            else:
+                continue
+            pages[number] = [max(used_width, x + slot_width), max(used_height, y + slot_height),
+                             shelf_y, x + slot_width, shelf_height]
+            placements[name] = (number, x + padding, y + padding)
+            placed = True
+            break
+        if not placed:
+            pages.append([slot_width, slot_height, 0, slot_width, slot_height])
+            placements[name] = (len(pages) - 1, padding, padding)
+
+    dimensions = [(min(_next_power_of_2(page[0]), page_size), min(_next_power_of_2(page[1]), page_size)) for page in pages]
+    return placements, dimensions
+
+def _has_alpha(img):
+    return img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+
+def _compose_page(tiles, dimensions, padding):
+    """타일 이미지들을 한 장으로 합침 - 여백은 가장자리 픽셀 반복
+
+    Args:
+        tiles: [(이미지, x, y)]
+    """
+    has_alpha = any(_has_alpha(img) for img, _, _ in tiles)
+    mode = 'RGBA' if has_alpha else 'RGB'
+    page = np.zeros((dimensions[1], dimensions[0], len(mode)), dtype=np.uint8)
+    for img, x, y in tiles:
+        pixels = np.asarray(img.convert(mode))
+        padded = np.pad(pixels, ((padding, padding), (padding, padding), (0, 0)), mode='edge')
+        page[y - padding:y - padding + padded.shape[0], x - padding:x - padding + padded.shape[1]] = padded
+
+    output = io.BytesIO()
+    image = Image.fromarray(page, mode)
+    if has_alpha:
+        image.save(output, format='PNG', optimize=True, compress_level=6)
+        return output.getvalue(), '.png'
+    image.save(output, format='JPEG', quality=TEXTURE_ATLAS_QUALITY, optimize=True, subsampling=0)
+    return output.getvalue(), '.jpg'
+
+def remap_group_uvs(mesh, material_rects):
+    """재질 그룹의 UV를 아틀라스 좌표로 변환 (렌더 메시는 재질마다 정점이 따로 있으므로 그룹별로 독립)
+
+    Args:
+        material_rects: {재질 이름: (x, y, 너비, 높이, 페이지 너비, 페이지 높이)} - 픽셀, 이미지 좌상단 기준
+    """
+    uvs = mesh['uvs'].copy()
+    for group in mesh['groups']:
+        rect = material_rects.get(group['material'])
+        if rect is None:
+            continue
+        x, y, width, height, page_width, page_height = rect
+        vertices = np.unique(mesh['indices'][group['start']:group['start'] + group['count']])
+        # ClampToEdge와 같게 [0, 1]로 자르고, 반 텍셀 안쪽으로 좁혀서 옆 타일을 샘플링하지 않도록 함
+        u = np.clip(np.clip(uvs[vertices, 0], 0, 1) * width, 0.5, width - 0.5)
+        v = np.clip((1 - np.clip(uvs[vertices, 1], 0, 1)) * height, 0.5, height - 0.5)  # 이미지는 위쪽이 v=1
+        uvs[vertices, 0] = (x + u) / page_width
+        uvs[vertices, 1] = 1 - (y + v) / page_height
+    return dict(mesh, uvs=uvs)
+
+def merge_material_groups(mesh, rename):
+    """재질 이름을 바꾸고 같은 이름이 된 그룹의 인덱스를 이어 붙여 하나의 그룹으로 합침 (처음 나온 순서 유지)"""
+    slices = {}
+    for group in mesh['groups']:
+        name = rename.get(group['material'], group['material'])
+        slices.setdefault(name, []).append(mesh['indices'][group['start']:group['start'] + group['count']])
+
+    indices = []
+    groups = []
+    start = 0
+    for name, parts in slices.items():
+        count = sum(len(part) for part in parts)
+        indices.extend(parts)
+        groups.append({'material': name, 'start': start, 'count': count})
+        start += count
+
+    merged = dict(mesh, groups=groups)
+    merged['indices'] = np.concatenate(indices).astype(np.uint32) if indices else mesh['indices']
+    return merged
+
+def _atlas_block(name, texture, member_lines):
+    """합쳐진 재질 블록 - 속성은 멤버 재질과 같고(_material_signature가 같은 재질만 합침) 텍스처 맵은 아틀라스만 남김"""
+    lines = [f"newmtl {name}"]
+    for line in member_lines[1:]:
+        if not any(line.strip().startswith(prefix) for prefix in TEXTURE_MAP_PREFIXES):
+            lines.append(line)
+    while lines and not lines[-1].strip():
+        lines.pop()
+    lines.append(f"map_Kd {texture}")
+    lines.append('')
+    return lines
+
+def build_atlas_model(obj_content, mtl_content, texture_data, page_size=2048, lod_targets=None,
+                      min_materials=TEXTURE_ATLAS_MIN_MATERIALS, padding=TEXTURE_ATLAS_PADDING):
+    """작은 재질 텍스처를 아틀라스로 합친 모델 생성
+
+    Args:
+        obj_content: OBJ (str/bytes/memoryview)
+        mtl_content: MTL 텍스트 (텍스처 경로는 파일명만)
+        texture_data: {파일명: bytes} 최적화 전 텍스처
+        page_size: 아틀라스 최대 크기 (텍스처 최대 해상도와 같게 - 최적화 단계에서 줄어들지 않도록)
+
+    Returns:
+        dict | None: model(OBJ str), material(MTL str), textures, mesh, lods(bytes 목록), report
+                     합칠 재질이 min_materials개 미만이면 None
+    """
+    texture_names = list(texture_data)
+    header, blocks = parse_mtl_blocks(mtl_content)
+
+    parsed = parse_obj(obj_content)
+    if parsed.face_count == 0:
+        raise ValueError("OBJ 파일에 면(f) 정보가 없습니다.")
+    mesh = build_render_mesh(parsed)
+    used_materials = {group['material'] for group in mesh['groups']}
+
+    # 아틀라스에 넣을 재질/텍스처 선택
+    skipped = []
+    material_textures = {}
+    tiles = {}
+    max_tile = page_size // 2 - 2 * padding
+    for name, lines in blocks:
+        reference = _diffuse_texture(lines)
+        if name not in used_materials or reference is None:
+            continue
+        texture = _match_texture(reference, texture_names)
+        if texture is None:
+            skipped.append((name, f"텍스처 없음 ({reference})"))
+            continue
+        if texture not in tiles:
+            try:
+                with Image.open(io.BytesIO(texture_data[texture])) as img:
+                    img.load()
+                    tiles[texture] = img.copy()
+            except Exception as e:
+                skipped.append((name, f"이미지 열기 실패 ({e})"))
+                continue
+        if max(tiles[texture].size) > max_tile:
+            skipped.append((name, f"큰 텍스처 {tiles[texture].size} - 따로 유지"))
+            continue
+        if _other_texture_maps(lines):
+            skipped.append((name, "map_Kd 외 텍스처 맵 있음 - 따로 유지"))
+            continue
+        material_textures[name] = texture
+
+    if mesh['uvs'] is None or len(material_textures) < min_materials:
+        return None
+    tiles = {texture: tiles[texture] for texture in set(material_textures.values())}
+
+    # 패킹 + 아틀라스 이미지
+    placements, dimensions = pack_tiles({texture: img.size for texture, img in tiles.items()}, page_size, padding)
+    prefix = ATLAS_PREFIX
+    while any(name.lower().startswith(prefix) for name in texture_names + [block[0] for block in blocks]):
+        prefix = '_' + prefix
+
+    atlas_textures = {}
+    page_names = []
+    for number, page_dimensions in enumerate(dimensions):
+        page_tiles = [(tiles[texture], x, y) for texture, (page, x, y) in placements.items() if page == number]
+        data, extension = _compose_page(page_tiles, page_dimensions, padding)
+        page_names.append(f"{prefix}_{number}{extension}")
+        atlas_textures[page_names[-1]] = data
+
+    # 같은 페이지 + 같은 속성인 재질끼리 아틀라스 재질 하나로 (속성이 다르면 atlas_0_1처럼 따로)
+    material_lines = dict(blocks)
+    material_rects = {}
+    rename = {}
+    atlas_materials = {}   # (페이지, 속성) → 아틀라스 재질 이름
+    members = {}           # 아틀라스 재질 이름 → (페이지 이름, 첫 멤버 재질 줄)
+    for material, texture in material_textures.items():
+        page, x, y = placements[texture]
+        width, height = tiles[texture].size
+        material_rects[material] = (x, y, width, height, *dimensions[page])
+
+        key = (page, _material_signature(material_lines[material]))
+        if key not in atlas_materials:
+            count = sum(1 for other_page, _ in atlas_materials if other_page == page)
+            atlas_materials[key] = f"{prefix}_{page}" if count == 0 else f"{prefix}_{page}_{count}"
+            members[atlas_materials[key]] = (page_names[page], material_lines[material])
+        rename[material] = atlas_materials[key]
+
+    # UV 변환 → LOD (재질 그룹 분리 상태) → 그룹 합치기
+    mesh = remap_group_uvs(mesh, material_rects)
+    lods = build_lods(mesh, lod_targets)
+    merged = merge_material_groups(mesh, rename)
+    merged_lods = [merge_material_groups(lod, rename) for lod in lods]
+
+    # MTL: 합친 재질은 아틀라스 재질 하나로
+    lines_out = list(header)
+    for name, lines in blocks:
+        if name not in rename:
+            lines_out.extend(lines)
+    for atlas_material, (page_name, lines) in members.items():
+        lines_out.extend(_atlas_block(atlas_material, page_name, lines))
+
+    # 남은 재질이 참조하지 않는 텍스처는 제외
+    remaining_references = set()
+    for name, lines in blocks:
+        if name not in rename:
+            for line in lines:
+                parts = line.strip().split()
+                if len(parts) >= 2 and any(line.strip().startswith(map_prefix) for map_prefix in TEXTURE_MAP_PREFIXES):
+                    match = _match_texture(os.path.basename(parts[-1]), texture_names)
+                    if match:
+                        remaining_references.add(match)
+    textures = {
+        name: data for name, data in texture_data.items()
+        if name not in tiles or name in remaining_references
+    }
+    textures.update(atlas_textures)
+
+    report = {
+        'groups_before': len(mesh['groups']),
+        'groups_after': len(merged['groups']),
+        'textures_before': len(texture_data),
+        'textures_after': len(textures),
+        'pages': [(page_name, dimensions[number], sum(1 for page, _, _ in placements.values() if page == number))
+                  for number, page_name in enumerate(page_names)],
+        'atlased_materials': len(material_textures),
+        'skipped': skipped
+    }
+    return {
+        'model': write_obj(merged, 'model.mtl'),
+        'material': '\n'.join(lines_out),
+        'textures': textures,
+        'mesh': encode_mesh(merged),
+        'lods': [encode_mesh(lod) for lod in merged_lods],
+        'report': report
+    }
+
+# 테스트 함수
+def _make_test_model(material_count, tile_size=64):
+    """재질마다 사각형 1개 + 단색(오른쪽 위 모서리만 흰색) 텍스처 1장인 모델 (UV 하나는 [0, 1] 밖)"""
+    obj_lines = []
+    mtl_lines = ['# test']
+    textures = {}
+    colors = {}
+    for i in range(material_count):
+        x = i * 2
+        obj_lines += [f"v {x} 0 0", f"v {x + 1} 0 0", f"v {x + 1} 1 0", f"v {x} 1 0"]
+        obj_lines += ["vt 0.25 0.25", "vt 0.75 0.25", "vt 0.75 0.75", "vt 1.5 1.0"]
+        obj_lines += ["vn 0 0 1", f"usemtl mat_{i}"]
+        base = i * 4
+        obj_lines.append(f"f {base + 1}/{base + 1}/{i + 1} {base + 2}/{base + 2}/{i + 1} "
+                         f"{base + 3}/{base + 3}/{i + 1} {base + 4}/{base + 4}/{i + 1}")
+
+        colors[i] = ((i * 40) % 256, (i * 90) % 256, (i * 150) % 256)
+        img = Image.new('RGB', (tile_size, tile_size), colors[i])
+        img.paste((255, 255, 255), (tile_size - 4, 0, tile_size, 4))  # 오른쪽 위 (u=1, v=1)
+        output = io.BytesIO()
+        img.save(output, format='PNG')
+        textures[f"tex_{i}.png"] = output.getvalue()
+        mtl_lines += [f"newmtl mat_{i}", "Kd 1 1 1", f"map_Kd textures/tex_{i}.png", ""]
+    return '\n'.join(obj_lines), '\n'.join(mtl_lines), textures, colors
+
+def test_texture_atlas():
+    """아틀라스 패킹 + UV 변환 결과가 원래 텍스처와 같은 색을 가리키는지 테스트"""
+    from mesh_compiler import decode_mesh
+
+    print("🧪 텍스처 아틀라스 테스트")
+
+    placements, dimensions = pack_tiles({'a': (100, 50), 'b': (100, 50), 'c': (30, 30)}, 256, padding=4)
+    assert len(dimensions) == 1 and dimensions[0][0] <= 256
+    boxes = [(x, y, x + w, y + h) for (name, (_, x, y)), (w, h) in
+             zip(sorted(placements.items()), [(100, 50), (100, 50), (30, 30)])]
+    for i, a in enumerate(boxes):
+        for b in boxes[i + 1:]:
+            assert a[2] + 4 <= b[0] or b[2] + 4 <= a[0] or a[3] + 4 <= b[1] or b[3] + 4 <= a[1], "타일 겹침"
+
+    obj, mtl, textures, colors = _make_test_model(12)
+    atlas = build_atlas_model(obj, mtl, textures, page_size=512, lod_targets=[])
+    report = atlas['report']
+    assert report['groups_before'] == 12 and report['groups_after'] == 1
+    assert list(atlas['textures']) == ['atlas_0.jpg'] or list(atlas['textures']) == ['atlas_0.png']
+    assert 'map_Kd atlas_0' in atlas['material'] and 'mat_3' not in atlas['material']
+
+    # 변환된 UV로 아틀라스를 샘플링하면 원래 재질 색 (u=1.5는 잘려서 오른쪽 위 모서리)
+    mesh = decode_mesh(atlas['mesh'])
+    page = Image.open(io.BytesIO(next(iter(atlas['textures'].values())))).convert('RGB')
+    width, height = page.size
+    positions = mesh['positions']
+    for vertex, (uv, position) in enumerate(zip(mesh['uvs'], positions)):
+        material = int(round(position[0])) // 2
+        pixel = page.getpixel((min(int(uv[0] * width), width - 1), min(int((1 - uv[1]) * height), height - 1)))
+        expected = (255, 255, 255) if round(position[0]) % 2 == 0 and position[1] > 0.5 else colors[material]
+        assert all(abs(a - b) <= 8 for a, b in zip(pixel, expected)), (vertex, pixel, expected)
+
+    # OBJ로 다시 읽어도 같은 그룹 구성
+    reparsed = build_render_mesh(parse_obj(atlas['model']))
+    assert [group['material'] for group in reparsed['groups']] == ['atlas_0']
+
+    # 속성이 다른 재질은 같은 페이지를 쓰는 별도 그룹, 다른 텍스처 맵이 있는 재질은 아틀라스에서 제외
+    obj, mtl, textures, _ = _make_test_model(6)
+    mtl = mtl.replace("newmtl mat_4\nKd 1 1 1", "newmtl mat_4\nKd 0.5 0.5 0.5\nd 0.8\nillum 1")
+    mtl = mtl.replace("map_Kd textures/tex_5.png", "map_Kd textures/tex_5.png\nmap_Bump textures/tex_5.png")
+    atlas = build_atlas_model(obj, mtl, textures, page_size=512, lod_targets=[])
+    groups = [group['material'] for group in decode_mesh(atlas['mesh'])['groups']]
+    assert sorted(groups) == ['atlas_0', 'atlas_0_1', 'mat_5'], groups
+    assert "newmtl atlas_0_1\nKd 0.5 0.5 0.5\nd 0.8\nillum 1\nmap_Kd atlas_0" in atlas['material']
+    assert "map_Bump textures/tex_5.png" in atlas['material'] and 'tex_5.png' in atlas['textures']
+    assert ('mat_5', "map_Kd 외 텍스처 맵 있음 - 따로 유지") in atlas['report']['skipped']
+
+    # 재질이 적으면 아틀라스 생성 안 함
+    obj, mtl, textures, _ = _make_test_model(2)
+    assert build_atlas_model(obj, mtl, textures, page_size=512) is None
+
+    print(f"✅ 재질 {report['groups_before']}개 → 드로우 콜 {report['groups_after']}개, "
+          f"텍스처 {report['textures_before']}장 → {report['textures_after']}장 {report['pages']}")
+
+if __name__ == "__main__":
+    test_texture_atlas()
@@ -0,0 +1,270 @@
+"""
+텍스처 최적화 결과(파생본) 디스크 캐시
+같은 이미지를 다시 업로드하면 디코딩/리사이즈/인코딩을 건너뛰고 저장된 결과를 바로 사용
+
+키: sha256(입력 바이트) + max_size + quality + 출력 형식 + 최적화 버전
+파일 저장/LRU 제거는 asset_cache와 같은 object_store 사용
+전체 용량 한도를 넘으면 가장 오래 사용하지 않은 항목부터 제거 (LRU),
+파일 없는 '최적화 불필요' 표시는 개수 한도로 제한
+"""
+
+import os
+import time
+import hashlib
+import tempfile
+import threading
+from sqlite_pool import connect
+from object_store import ObjectStore, evict_lru
+
+# 기본 설정 (환경변수로 조정 가능)
+TEXTURE_CACHE_DIR = os.getenv('TEXTURE_CACHE_DIR', 'data/texture_cache')
+TEXTURE_CACHE_MAX_BYTES = int(os.getenv('TEXTURE_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))  # 512MB, 0이면 사용 안 함
+TEXTURE_CACHE_MAX_MARKERS = int(os.getenv('TEXTURE_CACHE_MAX_MARKERS', '20000'))  # 'original' 표시 최대 개수
+
+# 리사이즈/인코딩 방식이 바뀌면 올려서 이전 결과를 쓰지 않도록 함
+TEXTURE_OPTIMIZER_VERSION = 1
+
+class TextureCache:
+    """입력 해시 + 최적화 설정 → 최적화 결과"""
+
+    def __init__(self, cache_dir=TEXTURE_CACHE_DIR, max_bytes=TEXTURE_CACHE_MAX_BYTES, max_markers=TEXTURE_CACHE_MAX_MARKERS):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.index_path = os.path.join(cache_dir, "index.db")
+        self.max_bytes = max_bytes
+        self.max_markers = max_markers
+        self._lock = threading.Lock()
+
+        # 크기 산정용 카운터
+        self.hits = 0
+        self.misses = 0
+
+        self.objects = ObjectStore(self.objects_dir)
+        self._init_index()
+
+    def _init_index(self):
+        """인덱스 테이블 생성"""
+        conn = connect(self.index_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS derivatives (
+                cache_key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                original_width INTEGER,
+                original_height INTEGER,
+                width INTEGER,
+                height INTEGER,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_derivatives_last_used ON derivatives(last_used)')
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def make_key(data, max_size, quality, output_format='auto'):
+        """캐시 키 (입력 내용 + 최적화 설정)"""
+        digest = hashlib.sha256(data).hexdigest()
+        return f"{digest}:{max_size}:{quality}:{output_format}:v{TEXTURE_OPTIMIZER_VERSION}"
+
+    def object_path(self, cache_key):
+        return self.objects.path(self._object_name(cache_key))
+
+    @staticmethod
+    def _object_name(cache_key):
+        return hashlib.sha256(cache_key.encode('utf-8')).hexdigest()
+
+    def get(self, cache_key):
+        """캐시 조회 - 없으면 None
+
+        Returns:
+            dict: kind('jpeg' | 'png' | 'original'), data(original이면 None), original_dimensions, new_dimensions
+        """
+        conn = connect(self.index_path)
+        row = conn.execute('''
+            SELECT kind, size, original_width, original_height, width, height
+            FROM derivatives WHERE cache_key = ?
+        ''', (cache_key,)).fetchone()
+        conn.close()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        kind, size, original_width, original_height, width, height = row
+        data = None
+        if kind != 'original':
+            data = self.objects.read(self._object_name(cache_key))
+            if data is None or len(data) != size:
+                # 파일이 지워졌거나 손상됨 → 항목 삭제 후 새로 최적화
+                self.remove(cache_key)
+                self.misses += 1
+                return None
+
+        conn = connect(self.index_path)
+        conn.execute('UPDATE derivatives SET last_used = ? WHERE cache_key = ?', (time.time(), cache_key))
+        conn.commit()
+        conn.close()
+
+        self.hits += 1
+        return {
+            'kind': kind,
+            'data': data,
+            'original_dimensions': (original_width, original_height),
+            'new_dimensions': (width, height)
+        }
+
+    def put(self, cache_key, kind, data=None, original_dimensions=None, new_dimensions=None):
+        """최적화 결과 저장 (kind='original'이면 최적화 불필요 표시만 저장)"""
+        if self.max_bytes <= 0:
+            return
+        size = len(data) if data is not None else 0
+        if size > self.max_bytes:
+            return
+        original_dimensions = original_dimensions or (None, None)
+        new_dimensions = new_dimensions or (None, None)
+
+        with self._lock:
+            if data is not None:
+                self.objects.write(self._object_name(cache_key), data)
+
+            now = time.time()
+            conn = connect(self.index_path)
+            conn.execute('''
+                INSERT OR REPLACE INTO derivatives
+                    (cache_key, kind, size, original_width, original_height, width, height, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (cache_key, kind, size, *original_dimensions, *new_dimensions, now, now))
+            conn.commit()
+            conn.close()
+
+            self._evict()
+
+    def remove(self, cache_key):
+        """캐시 항목 삭제"""
+        with self._lock:
+            conn = connect(self.index_path)
+            conn.execute('DELETE FROM derivatives WHERE cache_key = ?', (cache_key,))
+            conn.commit()
+            conn.close()
+            self.objects.remove(self._object_name(cache_key))
+
+    def total_bytes(self):
+        conn = connect(self.index_path)
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM derivatives').fetchone()[0]
+        conn.close()
+        return total
+
+    def _evict(self):
+        """용량/개수 한도 초과 시 LRU 순서로 제거 (호출자가 lock 보유)"""
+        conn = connect(self.index_path)
+
+        # 파일 없는 'original' 표시는 용량에 잡히지 않으므로 개수로 제한
+        markers = conn.execute('SELECT COUNT(*) FROM derivatives WHERE size = 0').fetchone()[0]
+        evicted = 0
+        if markers > self.max_markers:
+            evicted += conn.execute('''
+                DELETE FROM derivatives WHERE cache_key IN (
+                    SELECT cache_key FROM derivatives WHERE size = 0 ORDER BY last_used ASC LIMIT ?
+                )
+            ''', (markers - self.max_markers,)).rowcount
+
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM derivatives').fetchone()[0]
+        if total > self.max_bytes:
+            candidates = conn.execute(
+                'SELECT cache_key, size FROM derivatives WHERE size > 0 ORDER BY last_used ASC'
+            ).fetchall()
+
+            def drop(cache_key, size):
+                conn.execute('DELETE FROM derivatives WHERE cache_key = ?', (cache_key,))
+                self.objects.remove(self._object_name(cache_key))
+                return size
+
+            evicted += evict_lru(candidates, total, self.max_bytes, drop)
+
+        conn.commit()
+        conn.close()
+        return evicted
+
+    def stats(self):
+        """캐시 통계"""
+        conn = connect(self.index_path)
+        entries = conn.execute('SELECT COUNT(*) FROM derivatives').fetchone()[0]
+        conn.close()
+
+        return {
+            'entries': entries,
+            'bytes': self.total_bytes(),
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+# 프로세스 전역 캐시
+_texture_cache = None
+_texture_cache_lock = threading.Lock()
+
+def get_texture_cache():
+    """프로세스 전역 TextureCache 반환 (TEXTURE_CACHE_MAX_BYTES=0이면 None)"""
+    global _texture_cache
+    if TEXTURE_CACHE_MAX_BYTES <= 0:
+        return None
+    if _texture_cache is None:
+        with _texture_cache_lock:
+            if _texture_cache is None:
+                _texture_cache = TextureCache()
+    return _texture_cache
+
+# 테스트 함수
+def test_texture_cache():
+    """저장/조회/LRU 제거 테스트"""
+    import shutil
+    from sqlite_pool import close_pool
+
+    print("🧪 텍스처 캐시 테스트")
+
+    cache_dir = tempfile.mkdtemp()
+    cache = TextureCache(cache_dir, max_bytes=100 * 1024)
+    try:
+        source = os.urandom(1000)
+        key = TextureCache.make_key(source, 1024, 90)
+        assert key != TextureCache.make_key(source, 2048, 90), "설정이 다르면 다른 키"
+        assert cache.get(key) is None
+
+        cache.put(key, 'jpeg', b'x' * 60 * 1024, (4096, 4096), (1024, 1024))
+        entry = cache.get(key)
+        assert entry['kind'] == 'jpeg' and len(entry['data']) == 60 * 1024
+        assert entry['new_dimensions'] == (1024, 1024)
+
+        # 최적화 불필요 표시는 디스크 파일 없이 저장
+        small_key = TextureCache.make_key(b'small', 1024, 90)
+        cache.put(small_key, 'original', None, (256, 256), (256, 256))
+        assert cache.get(small_key)['data'] is None
+
+        # 한도 초과 → 가장 오래 사용하지 않은 항목 제거
+        time.sleep(0.01)
+        other_key = TextureCache.make_key(b'other', 1024, 90)
+        cache.put(other_key, 'png', b'y' * 60 * 1024, (2048, 2048), (1024, 1024))
+        assert cache.get(key) is None and cache.get(other_key) is not None
+        assert cache.total_bytes() <= cache.max_bytes
+        assert cache.get(small_key) is not None, "용량 0인 항목은 용량 한도로 제거하지 않음"
+
+        # 'original' 표시는 개수 한도 초과 시 오래된 것부터 제거
+        cache.max_markers = 1
+        time.sleep(0.01)
+        newer_key = TextureCache.make_key(b'newer', 1024, 90)
+        cache.put(newer_key, 'original', None, (128, 128), (128, 128))
+        assert cache.get(small_key) is None and cache.get(newer_key) is not None
+
+        # 파일이 사라지면 미스로 처리
+        os.remove(cache.object_path(other_key))
+        assert cache.get(other_key) is None
+
+        print(f"✅ {cache.stats()}")
+    finally:
+        close_pool(cache.index_path)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_texture_cache()
@@ -0,0 +1,231 @@
+"""
+텍스처 인코딩 자동 선택 (WebP/AVIF)
+기존 방식(알파 있으면 PNG, 없으면 JPEG)의 결과를 기준으로 WebP(무손실/손실)와 AVIF 후보를 만들고,
+원본 대비 화질(SSIM/PSNR)이 기준을 넘는 것 중 가장 작은 인코딩을 사용
+
+- 알파 텍스처: PNG → WebP 무손실만으로도 보통 20~40% 감소
+- 화질 비교는 NumPy로 계산 (8x8 블록 SSIM, 채널별 최솟값 / 전체 PSNR)
+
+선택 기능: TEXTURE_ENCODING=auto 이거나 업로드 화면에서 선택한 경우에만 사용
+(AVIF는 지원하지 않는 브라우저가 있어 TEXTURE_AVIF=1 일 때만 후보에 포함)
+"""
+
+import io
+import os
+import numpy as np
+from PIL import Image, features
+
+# 인코딩 설정 (환경변수로 조정 가능)
+TEXTURE_ENCODING = os.getenv('TEXTURE_ENCODING', 'classic')  # classic(JPEG/PNG) | auto(WebP/AVIF 포함 자동 선택)
+TEXTURE_AVIF = os.getenv('TEXTURE_AVIF', '0') == '1'
+TEXTURE_MIN_SSIM = float(os.getenv('TEXTURE_MIN_SSIM', '0.98'))
+TEXTURE_MIN_PSNR = float(os.getenv('TEXTURE_MIN_PSNR', '40'))  # dB
+# 손실 인코딩은 품질을 이만큼씩 낮춰 가며 기준을 넘는 동안 계속 시도
+QUALITY_STEPS = (0, 10, 20)
+
+# 형식 → (확장자, PIL 형식)
+ENCODINGS = {
+    'jpeg': ('.jpg', 'JPEG'),
+    'png': ('.png', 'PNG'),
+    'webp': ('.webp', 'WEBP'),
+    'avif': ('.avif', 'AVIF')
+}
+
+SSIM_BLOCK = 8
+
+def is_auto(encoding=None):
+    """자동 선택 모드 여부 (encoding이 None이면 환경변수 설정 사용)"""
+    return (encoding or TEXTURE_ENCODING) == 'auto'
+
+def settings_key(encoding=None):
+    """인코딩 설정 문자열 (texture_cache 키에 포함 - 기존 방식은 이전 키 그대로)"""
+    if not is_auto(encoding):
+        return 'auto'
+    avif = 'avif' if avif_available() else 'noavif'
+    return f"select-{avif}-s{TEXTURE_MIN_SSIM}-p{TEXTURE_MIN_PSNR}"
+
+def avif_available():
+    return TEXTURE_AVIF and features.check('avif')
+
+def final_filename(filename, kind):
+    """최적화 결과 형식에 맞는 파일 이름 (기존 방식: PNG → JPEG 변환 시에만 .jpg)"""
+    if kind in ('webp', 'avif'):
+        return os.path.splitext(filename)[0] + ENCODINGS[kind][0]
+    if kind == 'jpeg' and filename.lower().endswith('.png'):
+        return filename[:-4] + '.jpg'
+    return filename
+
+def save_args(kind, quality, lossless=False):
+    """형식별 PIL save() 인자 (해상도 단계도 같은 설정으로 인코딩)"""
+    if kind == 'png':
+        return 'PNG', {'optimize': True, 'compress_level': 6}
+    if kind == 'jpeg':
+        return 'JPEG', {'quality': quality, 'optimize': True, 'subsampling': 0}
+    if kind == 'webp':
+        if lossless:
+            # exact: 투명한 픽셀의 RGB도 보존 (밉맵/필터링 시 가장자리 색 번짐 방지)
+            # 무손실은 압축 노력(method/quality)을 낮춰도 크기 차이가 거의 없고 4배 이상 빠름
+            return 'WEBP', {'lossless': True, 'exact': True, 'quality': 50, 'method': 1}
+        return 'WEBP', {'quality': quality, 'method': 4, 'alpha_quality': 100}
+    return 'AVIF', {'quality': quality, 'subsampling': '4:4:4'}
+
+def encode(img, kind, quality, lossless=False):
+    """이미지 → 바이트 (JPEG는 RGB, 나머지는 RGB/RGBA 유지)"""
+    format_name, options = save_args(kind, quality, lossless)
+    if format_name == 'JPEG' and img.mode != 'RGB':
+        img = img.convert('RGB')
+    elif img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA')
+    output = io.BytesIO()
+    img.save(output, format=format_name, **options)
+    return output.getvalue()
+
+def _pixels(img, mode):
+    """비교용 float32 배열 - 알파가 있으면 RGB에 알파를 곱해서 보이지 않는 픽셀 차이는 무시"""
+    if img.mode != mode:
+        img = img.convert(mode)
+    pixels = np.asarray(img, dtype=np.float32)
+    if mode == 'RGBA':
+        alpha = pixels[..., 3:4] / 255.0
+        pixels = np.concatenate([pixels[..., :3] * alpha, pixels[..., 3:4]], axis=-1)
+    return pixels
+
+def psnr(reference, candidate):
+    """PSNR (dB) - 같으면 inf"""
+    mse = float(np.mean((reference - candidate) ** 2, dtype=np.float64))
+    if mse == 0:
+        return float('inf')
+    return 10 * np.log10(255.0 ** 2 / mse)
+
+def ssim(reference, candidate, block=SSIM_BLOCK):
+    """8x8 블록 단위 SSIM의 채널별 평균 중 최솟값 (색 번짐이 한 채널에만 있어도 잡히도록)"""
+    height = reference.shape[0] // block * block
+    width = reference.shape[1] // block * block
+    if height == 0 or width == 0:
+        return 1.0 if np.array_equal(reference, candidate) else 0.0
+
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+    scores = []
+    for channel in range(reference.shape[2]):
+        x = reference[:height, :width, channel].reshape(height // block, block, width // block, block)
+        y = candidate[:height, :width, channel].reshape(height // block, block, width // block, block)
+        mean_x = x.mean(axis=(1, 3))
+        mean_y = y.mean(axis=(1, 3))
+        var_x = (x * x).mean(axis=(1, 3)) - mean_x ** 2
+        var_y = (y * y).mean(axis=(1, 3)) - mean_y ** 2
+        covariance = (x * y).mean(axis=(1, 3)) - mean_x * mean_y
+        score = ((2 * mean_x * mean_y + c1) * (2 * covariance + c2)) / \
+                ((mean_x ** 2 + mean_y ** 2 + c1) * (var_x + var_y + c2))
+        scores.append(float(score.mean()))
+    return min(scores)
+
+def _candidates(has_alpha, quality):
+    """(형식, 품질, 무손실) 후보 - 손실 형식은 품질 내림차순"""
+    candidates = []
+    if has_alpha:
+        candidates.append(('webp', 100, True))
+    lossy = ['webp'] + (['avif'] if avif_available() else [])
+    for kind in lossy:
+        for step in QUALITY_STEPS:
+            candidates.append((kind, max(quality - step, 1), False))
+    return candidates
+
+def select_encoding(img, baseline_kind, baseline_data, quality):
+    """기존 방식 결과(baseline)와 WebP/AVIF 후보 중 화질 기준을 넘는 가장 작은 인코딩 선택
+
+    화질 기준: SSIM/PSNR이 설정값 이상이거나, 기존 방식 결과보다 나쁘지 않으면 통과
+    (기존 JPEG 자체가 설정값에 못 미치는 텍스처에서 기존보다 불리하지 않도록)
+
+    Returns:
+        dict: kind, data, quality, lossless, ssim, psnr, baseline_kind, baseline_size, tried[(이름, bytes, 통과 여부)]
+    """
+    has_alpha = img.mode == 'RGBA'
+    mode = 'RGBA' if has_alpha else 'RGB'
+    reference = _pixels(img, mode)
+
+    def measure(data):
+        with Image.open(io.BytesIO(data)) as decoded:
+            pixels = _pixels(decoded, mode)
+        return ssim(reference, pixels), psnr(reference, pixels)
+
+    baseline_lossless = baseline_kind == 'png'
+    baseline_ssim, baseline_psnr = (1.0, float('inf')) if baseline_lossless else measure(baseline_data)
+    min_ssim = min(TEXTURE_MIN_SSIM, baseline_ssim)
+    min_psnr = min(TEXTURE_MIN_PSNR, baseline_psnr)
+
+    best = {
+        'kind': baseline_kind, 'data': baseline_data, 'quality': quality, 'lossless': baseline_lossless,
+        'ssim': baseline_ssim, 'psnr': baseline_psnr,
+        'baseline_kind': baseline_kind, 'baseline_size': len(baseline_data), 'tried': []
+    }
+    rejected = set()
+    for kind, candidate_quality, lossless in _candidates(has_alpha, quality):
+        if (kind, lossless) in rejected:
+            continue  # 더 높은 품질에서 이미 기준 미달
+        try:
+            data = encode(img, kind, candidate_quality, lossless)
+        except (OSError, ValueError) as e:
+            print(f"[DEBUG] {kind} 인코딩 실패: {e}")
+            rejected.add((kind, lossless))
+            continue
+
+        label = f"{kind.upper()} {'무손실' if lossless else f'q{candidate_quality}'}"
+        if len(data) >= len(best['data']):
+            best['tried'].append((label, len(data), None))
+            continue  # 더 작지 않으면 화질 계산 생략
+
+        score_ssim, score_psnr = (1.0, float('inf')) if lossless else measure(data)
+        passed = bool(score_ssim >= min_ssim and score_psnr >= min_psnr)
+        best['tried'].append((label, len(data), passed))
+        if not passed:
+            rejected.add((kind, lossless))
+            continue
+        best.update({
+            'kind': kind, 'data': data, 'quality': candidate_quality, 'lossless': lossless,
+            'ssim': score_ssim, 'psnr': score_psnr
+        })
+    return best
+
+# 테스트 함수
+def test_texture_encoding():
+    """화질 지표 + 인코딩 선택 테스트"""
+    global TEXTURE_MIN_PSNR
+    print("🧪 텍스처 인코딩 선택 테스트")
+
+    rng = np.random.default_rng(0)
+    smooth = np.clip(np.add.outer(np.arange(256), np.arange(256))[..., None] / 2 + rng.normal(0, 2, (256, 256, 3)), 0, 255)
+    reference = smooth.astype(np.float32)
+    assert psnr(reference, reference) == float('inf') and ssim(reference, reference) == 1.0
+    noisy = np.clip(reference + rng.normal(0, 20, reference.shape), 0, 255).astype(np.float32)
+    assert ssim(reference, noisy) < 0.9 and psnr(reference, noisy) < 30
+
+    # 알파 텍스처: PNG보다 작은 인코딩 선택, 무손실이면 픽셀 동일
+    img = Image.fromarray(smooth.astype(np.uint8), 'RGB')
+    img.putalpha(Image.linear_gradient('L').resize((256, 256)))
+    png = encode(img, 'png', 90)
+    selected = select_encoding(img, 'png', png, 90)
+    assert selected['kind'] == 'webp' and len(selected['data']) < len(png)
+    assert selected['ssim'] >= TEXTURE_MIN_SSIM and selected['psnr'] >= TEXTURE_MIN_PSNR
+    webp_lossless = encode(img, 'webp', 100, lossless=True)
+    with Image.open(io.BytesIO(webp_lossless)) as decoded:
+        assert np.array_equal(np.asarray(decoded), np.asarray(img)), "WebP 무손실은 투명 픽셀 RGB까지 보존"
+
+    # 기준을 넘는 후보가 없으면 기존 결과 유지 (불투명 텍스처는 무손실 후보 없음)
+    previous = TEXTURE_MIN_PSNR
+    TEXTURE_MIN_PSNR = float('inf')
+    try:
+        opaque = img.convert('RGB')
+        kept = select_encoding(opaque, 'png', encode(opaque, 'png', 90), 90)
+        assert kept['kind'] == 'png' and not any(passed for _, _, passed in kept['tried'])
+    finally:
+        TEXTURE_MIN_PSNR = previous
+
+    assert final_filename('body.png', 'webp') == 'body.webp'
+    assert final_filename('body.png', 'jpeg') == 'body.jpg' and final_filename('body.png', 'png') == 'body.png'
+
+    saved = len(png) - len(selected['data'])
+    print(f"✅ 알파 텍스처 PNG {len(png):,} → {selected['kind']} {len(selected['data']):,} bytes ({saved:,} bytes 절약)")
+
+if __name__ == "__main__":
+    test_texture_encoding()
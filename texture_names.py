@@ -0,0 +1,30 @@
+"""
+텍스처 해상도 단계 이름 규칙 (외부 패키지 의존 없음)
+뷰어 HTML 생성/모델 로드 경로에서 texture_optimizer(PIL, streamlit 등)를 불러오지 않고도
+단계 이름을 만들고 해석할 수 있도록 분리
+"""
+
+import os
+
+# 해상도 피라미드 (뷰어가 기기에 맞는 단계를 선택) - 원본보다 작은 단계만 생성
+TEXTURE_PYRAMID_LEVELS = tuple(
+    int(level) for level in os.getenv('TEXTURE_PYRAMID_LEVELS', '512,1024,2048,4096').split(',') if level.strip()
+)
+
+def pyramid_name(filename, level):
+    """텍스처 이름 → 해상도 단계 이름 (body.jpg, 512 → body@512.jpg)"""
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}@{level}{ext}"
+
+def parse_pyramid_name(name):
+    """해상도 단계 이름 → (원본 이름, 단계) - 단계 이름이 아니면 (name, None)"""
+    stem, ext = os.path.splitext(name)
+    base, separator, level = stem.rpartition('@')
+    if separator and base and level.isdigit():
+        return base + ext, int(level)
+    return name, None
+
+def is_pyramid_level(name, texture_names):
+    """원본 텍스처가 함께 있는 해상도 단계인지 여부"""
+    base, level = parse_pyramid_name(name)
+    return level is not None and base in texture_names
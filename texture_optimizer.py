@@ -6,137 +6,407 @@
 
 from PIL import Image
 import io
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 import streamlit as st
+from texture_cache import TextureCache, get_texture_cache
+from texture_encoding import (
+    TEXTURE_ENCODING, is_auto as encoding_is_auto, settings_key as encoding_settings_key, final_filename as encoded_filename,
+    encode as encode_image, select_encoding
+)
+from compressed_texture import (
+    is_available as compressed_available, is_variant as is_compressed_variant, encode_basis, variant_name, settings_key
+)
+from texture_names import TEXTURE_PYRAMID_LEVELS, pyramid_name, parse_pyramid_name
 
-def optimize_texture_data(texture_data, max_size=1024, quality=90):
+# 병렬 최적화 설정 (환경변수로 조정 가능)
+TEXTURE_WORKERS = int(os.getenv('TEXTURE_WORKERS', str(min(os.cpu_count() or 1, 8))))
+# Streamlit 서버는 스레드가 많으므로 fork 대신 spawn으로 작업 프로세스 생성
+TEXTURE_POOL_START_METHOD = os.getenv('TEXTURE_POOL_START_METHOD', 'spawn')
+
+def nearest_power_of_2(n):
+    """가장 가까운 2의 제곱수 반환"""
+    if n <= 0:
+        return 1
+    power = 1
+    while power < n:
+        power *= 2
+    # 더 가까운 2의 제곱수 선택
+    if abs(n - power/2) < abs(n - power):
+        return int(power/2)
+    return power
+
+def _optimize_image(filename, data, max_size, quality, encoding=TEXTURE_ENCODING):
+    """텍스처 1개 리사이즈/재인코딩 (Streamlit 호출 없음)
+    
+    encoding='auto'면 기존 방식(PNG/JPEG) 결과와 WebP/AVIF 후보 중 화질 기준을 넘는 가장 작은 인코딩 사용
+    
+    Returns:
+        dict: filename, final_filename, data, kind('jpeg' | 'png' | 'webp' | 'avif' | 'original'), failed,
+              dimensions(결과 이미지 크기), encoder((형식, 품질, 무손실) - 해상도 단계에도 사용),
+              stat(최적화한 경우), messages[(st 함수명, 문구)]
+    """
+    messages = []
+    fallback_kind = 'png' if filename.lower().endswith('.png') else 'jpeg'
+    result = {'filename': filename, 'final_filename': filename, 'data': data, 'kind': 'original', 'failed': False,
+              'dimensions': None, 'encoder': (fallback_kind, quality, False), 'stat': None, 'messages': messages}
+    
+    try:
+        # 원본 크기
+        original_size = len(data)
+        
+        # 이미지 열기
+        with Image.open(io.BytesIO(data)) as img:
+            original_dimensions = img.size
+            
+            # 최적화 여부 결정
+            needs_optimization = (
+                max(img.size) > max_size or  # 크기가 큰 경우
+                original_size > 5 * 1024 * 1024 or  # 5MB 이상인 경우
+                (encoding_is_auto(encoding) and img.format == 'PNG')  # 자동 선택 시 PNG는 WebP 후보와 비교
+            )
+            
+            if not needs_optimization:
+                # 최적화 불필요
+                result['dimensions'] = img.size
+                messages.append(('info', f"📝 {filename}: 최적화 불필요 ({original_size:,} bytes)"))
+                return result
+            
+            messages.append(('write', f"🔧 {filename} 최적화 중... (원본: {original_size:,} bytes, {original_dimensions})"))
+            
+            # 이미지 크기 조정
+            if max(img.size) > max_size:
+                ratio = max_size / max(img.size)
+                new_size = (int(img.size[0] * ratio), int(img.size[1] * ratio))
+                
+                # UV seam 문제를 줄이기 위해 2의 제곱수로 크기 맞춤 (UV 매핑 최적화)
+                new_width = nearest_power_of_2(new_size[0])
+                new_height = nearest_power_of_2(new_size[1])
+                
+                # 원본 비율 유지하면서 2의 제곱수 크기에 맞춤
+                if new_width / new_height > img.size[0] / img.size[1]:
+                    new_width = int(new_height * img.size[0] / img.size[1])
+                else:
+                    new_height = int(new_width * img.size[1] / img.size[0])
+                
+                final_size = (new_width, new_height)
+                messages.append(('write', f"   📐 크기 조정: {img.size} → {final_size} (2의 제곱수 최적화)"))
+                
+                # LANCZOS 리샘플링 사용 (최고 품질)
+                img = img.resize(final_size, Image.Resampling.LANCZOS)
+            
+            # 투명도 검사를 더 정확하게 수행
+            has_transparency = False
+            if img.mode in ('RGBA', 'LA'):
+                # 알파 채널이 있는 경우
+                has_transparency = True
+            elif img.mode == 'P':
+                # 팔레트 모드에서 투명도 검사
+                transparency = img.info.get('transparency')
+                has_transparency = transparency is not None
+            
+            # 투명도 여부에 따라 포맷 결정
+            output = io.BytesIO()
+            if has_transparency:
+                # 투명도가 있는 경우 PNG로 유지
+                if img.mode != 'RGBA':
+                    img = img.convert('RGBA')
+                # PNG 압축 레벨 낮춤 (품질 우선)
+                img.save(output, format='PNG', optimize=True, compress_level=6)
+                final_filename = filename
+                result['kind'] = 'png'
+                messages.append(('write', f"   📝 투명도 감지 - PNG 형식 유지"))
+            else:
+                # 투명도가 없는 경우 JPEG로 압축
+                if img.mode != 'RGB':
+                    img = img.convert('RGB')
+                
+                # 파일 확장자를 jpg로 변경
+                final_filename = encoded_filename(filename, 'jpeg')
+                
+                # 고품질 JPEG 저장 (서브샘플링 비활성화)
+                img.save(output, format='JPEG', quality=quality, optimize=True, subsampling=0)
+                result['kind'] = 'jpeg'
+                messages.append(('write', f"   📝 투명도 없음 - JPEG 형식으로 변환"))
+            
+            optimized = output.getvalue()
+            result['encoder'] = (result['kind'], quality, False)
+            
+            # WebP/AVIF 후보와 비교해서 더 작은 인코딩 선택
+            encoding_stat = None
+            if encoding_is_auto(encoding):
+                selected = select_encoding(img, result['kind'], optimized, quality)
+                saved = selected['baseline_size'] - len(selected['data'])
+                if selected['kind'] != result['kind'] or saved:
+                    mode = '무손실' if selected['lossless'] else f"품질 {selected['quality']}"
+                    messages.append(('write', f"   🧪 {selected['kind'].upper()} ({mode}) 선택: "
+                                              f"{selected['baseline_kind'].upper()} 대비 {saved:,} bytes 절약 "
+                                              f"(SSIM {selected['ssim']:.4f}, PSNR {selected['psnr']:.1f}dB)"))
+                optimized = selected['data']
+                result['kind'] = selected['kind']
+                result['encoder'] = (selected['kind'], selected['quality'], selected['lossless'])
+                final_filename = encoded_filename(filename, selected['kind'])
+                encoding_stat = {'encoding': selected['kind'], 'baseline_size': selected['baseline_size']}
+            
+            # 최적화 결과 계산
+            new_size = len(optimized)
+            compression_ratio = (1 - new_size/original_size) * 100
+            
+            result['final_filename'] = final_filename
+            result['data'] = optimized
+            result['dimensions'] = img.size
+            result['stat'] = {
+                'filename': filename,
+                'final_filename': final_filename,
+                'original_size': original_size,
+                'new_size': new_size,
+                'compression_ratio': compression_ratio,
+                'original_dimensions': original_dimensions,
+                'new_dimensions': img.size,
+                **(encoding_stat or {})
+            }
+            messages.append(('success', f"✅ {filename} → {final_filename}: {new_size:,} bytes ({compression_ratio:.1f}% 감소)"))
+    
+    except Exception as e:
+        messages.append(('warning', f"⚠️ {filename} 최적화 실패: {str(e)} - 원본 사용"))
+        result['final_filename'] = filename
+        result['data'] = data
+        result['kind'] = 'original'
+        result['failed'] = True
+        result['stat'] = None
+    
+    return result
+
+def _variant_specs(final_filename, dimensions, pyramid_levels, compressed):
+    """텍스처 1개에 딸린 파생본 목록 - (이름, 캐시 키 접미사, 해상도 단계(None이면 원본), 압축 여부)"""
+    specs = []
+    for level in sorted(set(pyramid_levels)):
+        if dimensions and level < max(dimensions):
+            name = pyramid_name(final_filename, level)
+            specs.append((name, f"pyramid-{level}", level, False))
+            if compressed:
+                specs.append((variant_name(name), f"pyramid-{level}:{settings_key()}", level, True))
+    if compressed:
+        specs.append((variant_name(final_filename), settings_key(), None, True))
+    return specs
+
+def _encode_level(img, size, encoder):
+    """해상도 단계 이미지 인코딩 (원본과 같은 형식/설정)"""
+    kind, quality, lossless = encoder
+    return encode_image(img.resize(size, Image.Resampling.LANCZOS), kind, quality, lossless)
+
+def _optimize_one(filename, data, max_size, quality, compressed=False, pyramid_levels=(), encoding=TEXTURE_ENCODING):
+    """텍스처 1개 최적화 + 파생본(해상도 단계, GPU 압축) 생성 (작업 프로세스에서 실행)
+    
+    Returns:
+        dict: _optimize_image 결과 + variants({파생본 이름: bytes})
+    """
+    result = _optimize_image(filename, data, max_size, quality, encoding)
+    result['variants'] = {}
+    if result['failed']:
+        return result
+    
+    specs = _variant_specs(result['final_filename'], result['dimensions'], pyramid_levels, compressed)
+    level_data = {None: result['data']}
+    try:
+        levels = [(name, level) for name, _, level, is_compressed in specs if not is_compressed]
+        if levels:
+            with Image.open(io.BytesIO(result['data'])) as img:
+                img.load()
+                width, height = img.size
+                for name, level in levels:
+                    ratio = level / max(width, height)
+                    size = (max(1, round(width * ratio)), max(1, round(height * ratio)))
+                    level_data[level] = result['variants'][name] = _encode_level(img, size, result['encoder'])
+                    result['messages'].append(('write', f"   🔻 {name}: {size[0]}x{size[1]}, {len(level_data[level]):,} bytes"))
+    except Exception as e:
+        # 단계 생성 실패 시 원본 텍스처만 사용
+        result['messages'].append(('warning', f"⚠️ {filename} 해상도 단계 생성 실패: {str(e)}"))
+        result['variants'] = {}
+        return result
+    
+    for name, _, level, is_compressed in specs:
+        if not is_compressed:
+            continue
+        variant = encode_basis(level_data[level])
+        if variant:
+            result['variants'][name] = variant
+            result['messages'].append(('write', f"   🗜️ GPU 압축 텍스처 생성: {name} ({len(variant):,} bytes)"))
+        else:
+            result['messages'].append(('warning', f"⚠️ {name} GPU 압축 텍스처 생성 실패 - 이미지 텍스처만 사용"))
+    return result
+
+def _result_from_cache(filename, data, cached, variants=None):
+    """캐시된 최적화 결과를 _optimize_one 결과 형식으로 변환"""
+    result = {'filename': filename, 'final_filename': filename, 'data': data, 'kind': cached['kind'],
+              'failed': False, 'dimensions': cached['new_dimensions'], 'stat': None, 'cached': True,
+              'variants': variants or {}}
+    if cached['kind'] != 'original':
+        result['final_filename'] = encoded_filename(filename, cached['kind'])
+    if cached['kind'] == 'original':
+        result['messages'] = [('info', f"📝 {filename}: 최적화 불필요 ({len(data):,} bytes, 캐시)")]
+        return result
+    
+    result['data'] = cached['data']
+    new_size = len(cached['data'])
+    compression_ratio = (1 - new_size/len(data)) * 100
+    result['stat'] = {
+        'filename': filename,
+        'final_filename': result['final_filename'],
+        'original_size': len(data),
+        'new_size': new_size,
+        'compression_ratio': compression_ratio,
+        'original_dimensions': cached['original_dimensions'],
+        'new_dimensions': cached['new_dimensions']
+    }
+    result['messages'] = [('success', f"♻️ {filename} → {result['final_filename']}: {new_size:,} bytes "
+                                      f"({compression_ratio:.1f}% 감소, 이전 최적화 결과 재사용)")]
+    return result
+
+def _cached_variants(cache, cache_key, filename, cached, pyramid_levels, compressed):
+    """캐시에서 파생본 전체 조회 - 하나라도 없으면 None"""
+    final_filename = encoded_filename(filename, cached['kind']) if cached['kind'] != 'original' else filename
+    variants = {}
+    for name, suffix, _, _ in _variant_specs(final_filename, cached['new_dimensions'], pyramid_levels, compressed):
+        entry = cache.get(f"{cache_key}:{suffix}")
+        if entry is None:
+            return None
+        variants[name] = entry['data']
+    return variants
+
+# 프로세스 전역 작업 풀 (작업 프로세스 시작 비용을 업로드마다 내지 않도록 재사용)
+_texture_pool = None
+_texture_pool_lock = threading.Lock()
+
+def get_texture_pool(workers=TEXTURE_WORKERS):
+    """텍스처 최적화용 ProcessPoolExecutor 반환 (작업 프로세스 수는 처음 만들 때 기준)"""
+    global _texture_pool
+    if _texture_pool is None:
+        with _texture_pool_lock:
+            if _texture_pool is None:
+                _texture_pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context(TEXTURE_POOL_START_METHOD)
+                )
+    return _texture_pool
+
+def shutdown_texture_pool():
+    """작업 풀 종료 (작업 프로세스가 죽어 풀이 깨진 경우에도 호출)"""
+    global _texture_pool
+    with _texture_pool_lock:
+        pool, _texture_pool = _texture_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def _optimize_parallel(items, max_size, quality, compressed, pyramid_levels, encoding, workers, on_result):
+    """작업 프로세스들에 나눠 최적화 - 완료되는 순서대로 on_result 호출 (호출 스레드에서)"""
+    pool = get_texture_pool(workers)
+    futures = {
+        pool.submit(_optimize_one, filename, data, max_size, quality, compressed, pyramid_levels, encoding): filename
+        for filename, data in items
+    }
+    remaining = dict(items)
+    try:
+        for future in as_completed(futures):
+            result = future.result()
+            remaining.pop(futures[future])
+            on_result(result)
+    except BrokenProcessPool as e:
+        # 작업 프로세스 비정상 종료 (메모리 부족 등) → 남은 텍스처는 현재 프로세스에서 처리
+        print(f"[DEBUG] 텍스처 작업 풀 오류 - 남은 {len(remaining)}개 직접 처리: {e}")
+        shutdown_texture_pool()
+        for filename, data in remaining.items():
+            on_result(_optimize_one(filename, data, max_size, quality, compressed, pyramid_levels, encoding))
+
+def optimize_texture_data(texture_data, max_size=1024, quality=90, workers=TEXTURE_WORKERS, use_cache=True,
+                          compressed=None, pyramid_levels=TEXTURE_PYRAMID_LEVELS, encoding=None):
     """
     텍스처 데이터를 최적화
     
+    텍스처가 여러 개이고 workers > 1이면 작업 프로세스에서 병렬로 디코딩/리사이즈/인코딩하고,
+    진행 상황 표시(st.*)는 호출한 스크립트 스레드에서만 수행
+    같은 내용/설정으로 이미 최적화한 텍스처는 texture_cache에서 결과를 바로 가져옴
+    원본보다 작은 해상도 단계(<이름>@512.jpg 등)와, compressed면 단계마다 GPU 압축 파생본(<이름>.basis)도
+    결과에 추가 (뷰어가 기기 화면 크기/네트워크에 맞는 단계를 선택)
+    
     Args:
         texture_data: dict {filename: bytes_data}
         max_size: 최대 이미지 크기 (기본: 1024px)
         quality: JPEG 품질 (기본: 90)
+        workers: 작업 프로세스 수 (1이면 현재 프로세스에서 순차 처리)
+        use_cache: 최적화 결과 디스크 캐시 사용 여부
+        compressed: GPU 압축 텍스처 생성 여부 (None이면 compressed_texture 설정/basisu 유무로 결정)
+        pyramid_levels: 생성할 해상도 단계 (빈 값이면 생성 안 함)
+        encoding: 'classic'(PNG/JPEG) | 'auto'(WebP/AVIF 포함 자동 선택), None이면 TEXTURE_ENCODING 설정
     
     Returns:
         dict: 최적화된 텍스처 데이터
     """
+    # 작업 프로세스로 보내려면 memoryview(getbuffer()) 대신 bytes 필요
+    items = [(filename, data if isinstance(data, bytes) else bytes(data)) for filename, data in texture_data.items()]
+    results = {}
+    progress = st.progress(0.0) if len(items) > 1 else None
+    cache = get_texture_cache() if use_cache else None
+    cache_keys = {}
+    if compressed is None:
+        compressed = compressed_available()
+    encoding = encoding or TEXTURE_ENCODING
+    
+    def on_result(result):
+        results[result['filename']] = result
+        if cache is not None and not result.get('cached') and not result['failed']:
+            stat = result['stat'] or {}
+            cache_key = cache_keys[result['filename']]
+            cache.put(
+                cache_key, result['kind'],
+                result['data'] if result['kind'] != 'original' else None,
+                stat.get('original_dimensions'), result['dimensions']
+            )
+            specs = _variant_specs(result['final_filename'], result['dimensions'], pyramid_levels, compressed)
+            for name, suffix, _, is_compressed in specs:
+                if name in result['variants']:
+                    cache.put(f"{cache_key}:{suffix}", 'basis' if is_compressed else 'pyramid', result['variants'][name])
+        for level, message in result['messages']:
+            getattr(st, level)(message)
+        if progress is not None:
+            progress.progress(len(results) / len(items), text=f"텍스처 최적화 {len(results)}/{len(items)}")
+    
+    # 캐시에 있는 텍스처는 바로 사용하고 나머지만 최적화
+    pending = []
+    for filename, data in items:
+        if cache is not None:
+            cache_keys[filename] = TextureCache.make_key(data, max_size, quality, encoding_settings_key(encoding))
+            cached = cache.get(cache_keys[filename])
+            variants = None
+            if cached is not None:
+                variants = _cached_variants(cache, cache_keys[filename], filename, cached, pyramid_levels, compressed)
+            if variants is not None:
+                on_result(_result_from_cache(filename, data, cached, variants))
+                continue
+        pending.append((filename, data))
+    
+    if workers > 1 and len(pending) > 1:
+        _optimize_parallel(pending, max_size, quality, compressed, pyramid_levels, encoding, workers, on_result)
+    else:
+        for filename, data in pending:
+            on_result(_optimize_one(filename, data, max_size, quality, compressed, pyramid_levels, encoding))
+    
+    # 입력 순서대로 결과 구성
     optimized_data = {}
     optimization_stats = []
-    
-    for filename, data in texture_data.items():
-        try:
-            # 원본 크기
-            original_size = len(data)
-            
-            # 이미지 열기
-            with Image.open(io.BytesIO(data)) as img:
-                original_dimensions = img.size
-                
-                # 최적화 여부 결정
-                needs_optimization = (
-                    max(img.size) > max_size or  # 크기가 큰 경우
-                    original_size > 5 * 1024 * 1024  # 5MB 이상인 경우
-                )
-                
-                if needs_optimization:
-                    st.write(f"🔧 {filename} 최적화 중... (원본: {original_size:,} bytes, {original_dimensions})")
-                    
-                    # 이미지 크기 조정
-                    if max(img.size) > max_size:
-                        ratio = max_size / max(img.size)
-                        new_size = (int(img.size[0] * ratio), int(img.size[1] * ratio))
-                        
-                        # UV seam 문제를 줄이기 위해 2의 제곱수로 크기 맞춤
-                        def nearest_power_of_2(n):
-                            """가장 가까운 2의 제곱수 반환"""
-                            if n <= 0:
-                                return 1
-                            power = 1
-                            while power < n:
-                                power *= 2
-                            # 더 가까운 2의 제곱수 선택
-                            if abs(n - power/2) < abs(n - power):
-                                return int(power/2)
-                            return power
-                        
-                        # 2의 제곱수로 크기 조정 (UV 매핑 최적화)
-                        new_width = nearest_power_of_2(new_size[0])
-                        new_height = nearest_power_of_2(new_size[1])
-                        
-                        # 원본 비율 유지하면서 2의 제곱수 크기에 맞춤
-                        if new_width / new_height > img.size[0] / img.size[1]:
-                            new_width = int(new_height * img.size[0] / img.size[1])
-                        else:
-                            new_height = int(new_width * img.size[1] / img.size[0])
-                        
-                        final_size = (new_width, new_height)
-                        st.write(f"   📐 크기 조정: {img.size} → {final_size} (2의 제곱수 최적화)")
-                        
-                        # LANCZOS 리샘플링 사용 (최고 품질)
-                        img = img.resize(final_size, Image.Resampling.LANCZOS)
-                    
-                    # 투명도 검사를 더 정확하게 수행
-                    has_transparency = False
-                    if img.mode in ('RGBA', 'LA'):
-                        # 알파 채널이 있는 경우
-                        has_transparency = True
-                    elif img.mode == 'P':
-                        # 팔레트 모드에서 투명도 검사
-                        transparency = img.info.get('transparency')
-                        has_transparency = transparency is not None
-                    
-                    # 투명도 여부에 따라 포맷 결정
-                    if has_transparency:
-                        # 투명도가 있는 경우 PNG로 유지
-                        output = io.BytesIO()
-                        if img.mode != 'RGBA':
-                            img = img.convert('RGBA')
-                        # PNG 압축 레벨 낮춤 (품질 우선)
-                        img.save(output, format='PNG', optimize=True, compress_level=6)
-                        optimized_data[filename] = output.getvalue()
-                        final_filename = filename
-                        st.write(f"   📝 투명도 감지 - PNG 형식 유지")
-                    else:
-                        # 투명도가 없는 경우 JPEG로 압축
-                        if img.mode != 'RGB':
-                            img = img.convert('RGB')
-                        
-                        # 파일 확장자를 jpg로 변경
-                        if filename.lower().endswith('.png'):
-                            final_filename = filename[:-4] + '.jpg'
-                        else:
-                            final_filename = filename
-                        
-                        output = io.BytesIO()
-                        # 고품질 JPEG 저장 (서브샘플링 비활성화)
-                        img.save(output, format='JPEG', quality=quality, optimize=True, subsampling=0)
-                        optimized_data[final_filename] = output.getvalue()
-                        st.write(f"   📝 투명도 없음 - JPEG 형식으로 변환")
-                    
-                    # 최적화 결과 계산
-                    new_size = len(optimized_data[final_filename])
-                    compression_ratio = (1 - new_size/original_size) * 100
-                    
-                    optimization_stats.append({
-                        'filename': filename,
-                        'final_filename': final_filename,
-                        'original_size': original_size,
-                        'new_size': new_size,
-                        'compression_ratio': compression_ratio,
-                        'original_dimensions': original_dimensions,
-                        'new_dimensions': img.size
-                    })
-                    
-                    st.success(f"✅ {filename} → {final_filename}: {new_size:,} bytes ({compression_ratio:.1f}% 감소)")
-                
-                else:
-                    # 최적화 불필요
-                    optimized_data[filename] = data
-                    st.info(f"📝 {filename}: 최적화 불필요 ({original_size:,} bytes)")
-        
-        except Exception as e:
-            st.warning(f"⚠️ {filename} 최적화 실패: {str(e)} - 원본 사용")
-            optimized_data[filename] = data
+    variant_count = 0
+    level_count = 0
+    for filename, _ in items:
+        result = results[filename]
+        optimized_data[result['final_filename']] = result['data']
+        optimized_data.update(result['variants'])
+        variant_count += sum(1 for name in result['variants'] if is_compressed_variant(name))
+        level_count += sum(1 for name in result['variants'] if not is_compressed_variant(name))
+        if result['stat']:
+            optimization_stats.append(result['stat'])
     
     # 최적화 요약 표시
     if optimization_stats:
@@ -145,6 +415,20 @@ def optimize_texture_data(texture_data, max_size=1024, quality=90):
         total_savings = (1 - total_new/total_original) * 100
         
         st.info(f"📊 텍스처 최적화 완료: {len(optimization_stats)}개 파일, {total_savings:.1f}% 용량 절약")
+        
+        # 인코딩 자동 선택 결과 (텍스처별 절약량)
+        selected = [stat for stat in optimization_stats if 'baseline_size' in stat]
+        if selected:
+            encoding_saved = sum(stat['baseline_size'] - stat['new_size'] for stat in selected)
+            st.info(f"🧪 인코딩 자동 선택: PNG/JPEG 대비 {encoding_saved:,} bytes 절약")
+            for stat in selected:
+                st.write(f"   {stat['final_filename']} ({stat['encoding'].upper()}): "
+                         f"{stat['baseline_size']:,} → {stat['new_size']:,} bytes "
+                         f"({stat['baseline_size'] - stat['new_size']:,} bytes 절약)")
+    if level_count:
+        st.info(f"🔻 해상도 단계 {level_count}개 생성 (기기 화면 크기에 맞게 선택)")
+    if variant_count:
+        st.info(f"🗜️ GPU 압축 텍스처 {variant_count}개 생성 (지원 기기에서 우선 사용)")
     
     return optimized_data
 
@@ -162,7 +446,7 @@ def check_texture_size_warnings(texture_data):
     
     return warnings
 
-def auto_optimize_textures(texture_data, max_size=1024, quality=90):
+def auto_optimize_textures(texture_data, max_size=1024, quality=90, pyramid_levels=TEXTURE_PYRAMID_LEVELS, encoding=None):
     """
     자동 텍스처 최적화 (업로드 시 호출)
     
@@ -181,7 +465,8 @@ def auto_optimize_textures(texture_data, max_size=1024, quality=90):
         st.info("자동으로 최적화를 진행합니다...")
     
     # 최적화 실행
-    optimized_data = optimize_texture_data(texture_data, max_size, quality)
+    optimized_data = optimize_texture_data(texture_data, max_size, quality, pyramid_levels=pyramid_levels,
+                                           encoding=encoding)
     
     return optimized_data, True
 
@@ -202,10 +487,157 @@ def test_optimization():
     print(f"원본 크기: {len(test_data['test_large.png']):,} bytes")
     
     # 최적화 실행
-    optimized = optimize_texture_data(test_data, max_size=1024, quality=80)
+    optimized = optimize_texture_data(test_data, max_size=1024, quality=80, use_cache=False)
     
     for filename, data in optimized.items():
         print(f"최적화 후: {filename} - {len(data):,} bytes")
 
+def _make_test_textures(count, size):
+    """벤치마크용 노이즈 텍스처 (JPEG, 일부는 알파 포함 PNG)"""
+    textures = {}
+    for i in range(count):
+        img = Image.merge('RGB', [Image.effect_noise((size, size), 40 + i * 3) for _ in range(3)])
+        output = io.BytesIO()
+        if i % 4 == 3:
+            img.putalpha(Image.linear_gradient('L').resize((size, size)))
+            img.save(output, format='PNG', compress_level=1)
+            textures[f'texture_{i}.png'] = output.getvalue()
+        else:
+            img.save(output, format='JPEG', quality=95)
+            textures[f'texture_{i}.jpg'] = output.getvalue()
+    return textures
+
+def test_parallel_optimization():
+    """병렬 결과가 순차 결과와 같은지 테스트"""
+    print("🧪 병렬 텍스처 최적화 테스트")
+    
+    textures = _make_test_textures(4, 1536)
+    textures['broken.png'] = b'not an image'
+    
+    serial = optimize_texture_data(textures, max_size=512, workers=1, use_cache=False)
+    parallel = optimize_texture_data(textures, max_size=512, workers=2, use_cache=False)
+    assert list(serial) == list(parallel), "입력 순서 유지"
+    assert serial == parallel, "병렬 결과는 순차 결과와 동일"
+    assert parallel['broken.png'] == b'not an image', "실패한 텍스처는 원본 사용"
+    assert 'texture_0.jpg' in parallel and 'texture_3.png' in parallel
+    shutdown_texture_pool()
+    
+    print(f"✅ {len(parallel)}개 텍스처 결과 일치")
+
+def test_texture_pyramid():
+    """해상도 단계 생성/이름 규칙 테스트"""
+    print("🧪 텍스처 해상도 단계 테스트")
+    
+    assert pyramid_name('body.jpg', 512) == 'body@512.jpg'
+    assert parse_pyramid_name('body@512.jpg') == ('body.jpg', 512)
+    assert parse_pyramid_name('mail@home.png') == ('mail@home.png', None)
+    
+    textures = _make_test_textures(4, 1536)
+    textures['small.jpg'] = _make_test_textures(1, 256)['texture_0.jpg']
+    optimized = optimize_texture_data(textures, max_size=2048, workers=1, use_cache=False,
+                                      compressed=False, pyramid_levels=(512, 1024, 2048))
+    
+    # 원본보다 작은 단계만 생성, 형식(JPEG/PNG 알파)은 원본과 동일
+    assert [name for name in optimized if name.startswith('texture_0')] == [
+        'texture_0.jpg', 'texture_0@512.jpg', 'texture_0@1024.jpg'
+    ]
+    assert 'small@512.jpg' not in optimized
+    with Image.open(io.BytesIO(optimized['texture_0@512.jpg'])) as img:
+        assert img.size == (512, 512) and img.format == 'JPEG'
+    with Image.open(io.BytesIO(optimized['texture_3@1024.png'])) as img:
+        assert img.size == (1024, 1024) and img.mode == 'RGBA'
+    
+    levels = sum(1 for name in optimized if parse_pyramid_name(name)[1])
+    print(f"✅ 텍스처 {len(textures)}개 → 해상도 단계 {levels}개")
+
+def test_auto_encoding():
+    """WebP/AVIF 자동 선택 - 결과가 기존 방식보다 크지 않고, 해상도 단계도 같은 형식인지 테스트"""
+    print("🧪 텍스처 인코딩 자동 선택 테스트")
+    
+    textures = _make_test_textures(4, 1024)
+    classic = optimize_texture_data(textures, max_size=512, workers=1, use_cache=False, compressed=False,
+                                    pyramid_levels=(256,), encoding='classic')
+    auto = optimize_texture_data(textures, max_size=512, workers=1, use_cache=False, compressed=False,
+                                 pyramid_levels=(256,), encoding='auto')
+    
+    assert 'texture_3.webp' in auto and 'texture_3@256.webp' in auto, "알파 텍스처는 WebP로 저장"
+    with Image.open(io.BytesIO(auto['texture_3@256.webp'])) as img:
+        assert img.format == 'WEBP' and img.mode == 'RGBA' and img.size == (256, 256)
+    
+    classic_main = sum(len(data) for name, data in classic.items() if '@' not in name)
+    auto_main = sum(len(data) for name, data in auto.items() if '@' not in name)
+    assert auto_main <= classic_main
+    print(f"✅ 기존 {classic_main:,} → 자동 선택 {auto_main:,} bytes ({classic_main - auto_main:,} bytes 절약)")
+
+def test_texture_cache_reuse(count=4, size=4096):
+    """같은 텍스처 재업로드 시 캐시된 결과 사용 - 결과 일치 + 소요 시간"""
+    import time
+    import shutil
+    import tempfile
+    import texture_cache
+    from sqlite_pool import close_pool
+    
+    print(f"🧪 텍스처 캐시 재사용 테스트: {size}px 텍스처 {count}개")
+    
+    textures = _make_test_textures(count, size)
+    textures['small.jpg'] = _make_test_textures(1, 256)['texture_0.jpg']
+    opaque = io.BytesIO()
+    Image.open(io.BytesIO(textures['texture_0.jpg'])).save(opaque, format='PNG', compress_level=1)
+    textures['opaque.png'] = opaque.getvalue()  # 캐시에서도 .png → .jpg 이름 변환 유지
+    cache_dir = tempfile.mkdtemp()
+    previous = texture_cache._texture_cache
+    texture_cache._texture_cache = TextureCache(cache_dir)
+    try:
+        started = time.perf_counter()
+        first = optimize_texture_data(textures, max_size=2048, workers=1)
+        cold = time.perf_counter() - started
+        
+        misses = texture_cache._texture_cache.misses
+        started = time.perf_counter()
+        second = optimize_texture_data(textures, max_size=2048, workers=1)
+        warm = time.perf_counter() - started
+        
+        assert first == second and list(first) == list(second), "캐시 결과는 최적화 결과와 동일"
+        assert texture_cache._texture_cache.misses == misses, "해상도 단계까지 모두 캐시에서 사용"
+        assert 'opaque.jpg' in second and 'opaque.png' not in second
+        
+        # 설정이 바뀌면 다시 최적화
+        third = optimize_texture_data(textures, max_size=1024, workers=1)
+        assert third['texture_0.jpg'] != first['texture_0.jpg']
+        
+        print(f"✅ 첫 업로드 {cold:.2f}초 → 재업로드 {warm * 1000:.1f}ms ({cold / warm:,.0f}배)")
+    finally:
+        close_pool(texture_cache._texture_cache.index_path)
+        texture_cache._texture_cache = previous
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+def benchmark_texture_optimization(count=12, size=4096, max_size=2048):
+    """순차 vs 작업 프로세스 병렬 최적화 시간 비교"""
+    import time
+    
+    workers = max(TEXTURE_WORKERS, 2)
+    print(f"⏱️ 텍스처 최적화 벤치마크: {size}px 텍스처 {count}개 → {max_size}px, CPU {os.cpu_count()}개")
+    textures = _make_test_textures(count, size)
+    
+    # 작업 프로세스 시작 비용은 업로드마다 들지 않으므로 미리 띄워 둠
+    get_texture_pool(workers).submit(nearest_power_of_2, 1).result()
+    
+    timings = {}
+    for label, worker_count in (('순차', 1), (f'병렬 {workers}개', workers)):
+        started = time.perf_counter()
+        optimize_texture_data(textures, max_size=max_size, workers=worker_count, use_cache=False)
+        timings[label] = time.perf_counter() - started
+        print(f"   {label}: {timings[label]:.2f}초")
+    
+    shutdown_texture_pool()
+    serial, parallel = timings.values()
+    print(f"   → {serial / parallel:.1f}배")
+    return timings
+
 if __name__ == "__main__":
     test_optimization()
+    test_parallel_optimization()
+    test_texture_pyramid()
+    test_auto_encoding()
+    test_texture_cache_reuse()
+    benchmark_texture_optimization()
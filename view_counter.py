@@ -0,0 +1,331 @@
+"""
+공유 링크 조회수 지연 기록 (write-behind)
+get_model_by_token이 조회마다 UPDATE + 커밋하던 것을 메모리에 모아 두었다가
+주기적으로(또는 일정 개수가 쌓이면) 한 트랜잭션으로 반영
+
+비정상 종료 대비:
+- 조회 한 건마다 저널 파일에 한 줄 추가 (append-only)
+- 반영할 때 저널을 배치 파일로 이름을 바꾸고, 배치 ID를 같은 트랜잭션에서
+  view_count_batches 테이블에 기록 → 재시작 시 남은 배치 파일을 중복 없이 다시 반영
+"""
+
+import os
+import time
+import uuid
+import atexit
+import threading
+from collections import Counter
+from sqlite_pool import connect
+
+# 설정 (환경변수로 조정 가능)
+VIEW_COUNT_FLUSH_INTERVAL = float(os.getenv('VIEW_COUNT_FLUSH_INTERVAL', '5'))  # 초
+VIEW_COUNT_FLUSH_THRESHOLD = int(os.getenv('VIEW_COUNT_FLUSH_THRESHOLD', '1000'))  # 쌓인 조회 수
+VIEW_COUNT_BATCH_RETENTION_DAYS = 7  # 적용 완료 배치 ID 보관 기간
+
+BATCH_SUFFIX = '.batch'
+
+def _utc_timestamp(epoch):
+    """CURRENT_TIMESTAMP와 같은 형식 (UTC)"""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(epoch))
+
+class ViewCounter:
+    """모델 DB 하나에 대한 조회수 지연 기록기"""
+
+    def __init__(self, db_path, journal_path=None, flush_interval=VIEW_COUNT_FLUSH_INTERVAL,
+                 flush_threshold=VIEW_COUNT_FLUSH_THRESHOLD, background=True):
+        self.db_path = db_path
+        self.journal_path = journal_path or f"{db_path}.views.journal"
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+
+        self._lock = threading.Lock()         # 메모리 카운트/저널 파일
+        self._flush_lock = threading.Lock()   # 배치 반영은 한 번에 하나
+        self._counts = Counter()
+        self._last_seen = {}
+        self._pending = 0
+        self._journal = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+        # 이전 프로세스가 남긴 저널/배치 반영
+        self.recover()
+
+        if background:
+            self._thread = threading.Thread(target=self._run, name='view-counter', daemon=True)
+            self._thread.start()
+
+    # ---------- 기록 ----------
+    def record(self, share_token):
+        """조회 1회 기록 (DB 쓰기 없음)"""
+        now = time.time()
+        with self._lock:
+            if self._journal is None:
+                self._journal = open(self.journal_path, 'a', encoding='utf-8')
+            self._journal.write(f"{share_token}\t{now:.3f}\n")
+            self._journal.flush()
+
+            self._counts[share_token] += 1
+            self._last_seen[share_token] = now
+            self._pending += 1
+            should_flush = self._pending >= self.flush_threshold
+
+        if should_flush:
+            self._wake.set()
+
+    def pending_count(self, share_token):
+        """아직 DB에 반영되지 않은 조회 수"""
+        with self._lock:
+            return self._counts.get(share_token, 0)
+
+    # ---------- 반영 ----------
+    def flush(self):
+        """모아 둔 조회수를 한 트랜잭션으로 반영
+
+        Returns:
+            int: 반영된 조회 수
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                counts, last_seen = self._counts, self._last_seen
+                self._counts, self._last_seen, self._pending = Counter(), {}, 0
+
+                # 현재 저널을 배치 파일로 넘기고 새 저널 시작
+                batch_path = None
+                if self._journal is not None:
+                    self._journal.close()
+                    self._journal = None
+                    batch_path = f"{self.journal_path}.{uuid.uuid4().hex}{BATCH_SUFFIX}"
+                    os.replace(self.journal_path, batch_path)
+
+            batch_id = os.path.basename(batch_path) if batch_path else uuid.uuid4().hex
+            try:
+                self._apply(batch_id, counts, last_seen)
+            except Exception as e:
+                # 배치 파일은 남겨 두고 다음 시작 시(recover) 다시 반영
+                print(f"[DEBUG] 조회수 반영 실패 (배치 보관): {e}")
+                return 0
+
+            if batch_path:
+                os.remove(batch_path)
+            return sum(counts.values())
+
+    def _apply(self, batch_id, counts, last_seen):
+        """배치 반영 - 이미 적용된 배치 ID면 건너뜀"""
+        conn = connect(self.db_path)
+        try:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('SELECT 1 FROM view_count_batches WHERE batch_id = ?', (batch_id,))
+            if cursor.fetchone():
+                cursor.execute('ROLLBACK')
+                return False
+
+            cursor.executemany('''
+                UPDATE models
+                SET access_count = COALESCE(access_count, 0) + ?,
+                    last_accessed = ?
+                WHERE share_token = ?
+            ''', [(count, _utc_timestamp(last_seen[token]), token) for token, count in counts.items()])
+            cursor.execute('INSERT INTO view_count_batches (batch_id) VALUES (?)', (batch_id,))
+            cursor.execute(
+                "DELETE FROM view_count_batches WHERE applied_at < datetime('now', ?)",
+                (f"-{VIEW_COUNT_BATCH_RETENTION_DAYS} days",)
+            )
+            cursor.execute('COMMIT')
+            return True
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def recover(self):
+        """남아 있는 저널/배치 파일 반영 (시작 시 호출)"""
+        directory = os.path.dirname(os.path.abspath(self.journal_path))
+        prefix = os.path.basename(self.journal_path)
+
+        with self._flush_lock:
+            if os.path.exists(self.journal_path):
+                os.replace(self.journal_path, f"{self.journal_path}.{uuid.uuid4().hex}{BATCH_SUFFIX}")
+
+            recovered = 0
+            for name in sorted(os.listdir(directory)):
+                if not (name.startswith(prefix + '.') and name.endswith(BATCH_SUFFIX)):
+                    continue
+                path = os.path.join(directory, name)
+
+                counts = Counter()
+                last_seen = {}
+                with open(path, encoding='utf-8') as f:
+                    for line in f:
+                        # 쓰다 만 마지막 줄은 무시
+                        parts = line.rstrip('\n').split('\t')
+                        if len(parts) != 2 or not line.endswith('\n'):
+                            continue
+                        token, seen = parts[0], float(parts[1])
+                        counts[token] += 1
+                        last_seen[token] = max(seen, last_seen.get(token, 0))
+
+                try:
+                    if counts and self._apply(name, counts, last_seen):
+                        recovered += sum(counts.values())
+                    os.remove(path)
+                except Exception as e:
+                    print(f"[DEBUG] 조회수 배치 복구 실패 ({name}): {e}")
+
+            if recovered:
+                print(f"[DEBUG] 조회수 저널 복구: {recovered}회 반영")
+            return recovered
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        """백그라운드 스레드 종료 + 남은 조회수 반영"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+# 프로세스 전역 카운터 (DB 파일 경로별)
+_counters = {}
+_counters_lock = threading.Lock()
+
+def get_view_counter(db_path):
+    """DB 파일 경로별 공용 ViewCounter 반환 (종료 시 자동 반영)"""
+    key = os.path.abspath(db_path)
+    counter = _counters.get(key)
+    if counter is None:
+        with _counters_lock:
+            counter = _counters.get(key)
+            if counter is None:
+                counter = ViewCounter(db_path)
+                atexit.register(counter.close)
+                _counters[key] = counter
+    return counter
+
+def close_view_counter(db_path):
+    """해당 DB의 카운터 종료 (남은 조회수 반영 후 DB 파일을 지우거나 교체할 때)"""
+    with _counters_lock:
+        counter = _counters.pop(os.path.abspath(db_path), None)
+    if counter is not None:
+        atexit.unregister(counter.close)
+        counter.close()
+
+# 테스트 함수
+def test_view_counter():
+    """배치 반영/비정상 종료 복구/중복 반영 방지 테스트"""
+    import shutil
+    import tempfile
+    from sqlite_pool import close_pool
+
+    print("🧪 조회수 지연 기록 테스트")
+
+    directory = tempfile.mkdtemp()
+    db_path = os.path.join(directory, "models.db")
+    try:
+        conn = connect(db_path)
+        conn.execute('CREATE TABLE models (share_token TEXT UNIQUE, access_count INTEGER DEFAULT 0, last_accessed TIMESTAMP)')
+        conn.execute('CREATE TABLE view_count_batches (batch_id TEXT PRIMARY KEY, applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)')
+        conn.executemany('INSERT INTO models (share_token) VALUES (?)', [('a',), ('b',)])
+        conn.commit()
+        conn.close()
+
+        def access_counts():
+            conn = connect(db_path)
+            rows = dict(conn.execute('SELECT share_token, access_count FROM models').fetchall())
+            conn.close()
+            return rows
+
+        counter = ViewCounter(db_path, background=False)
+        for _ in range(5):
+            counter.record('a')
+        counter.record('b')
+        assert access_counts() == {'a': 0, 'b': 0}, "flush 전에는 DB 쓰기 없음"
+        assert counter.flush() == 6
+        assert access_counts() == {'a': 5, 'b': 1}
+
+        # 비정상 종료: 저널만 남은 상태에서 새 카운터가 복구
+        for _ in range(3):
+            counter.record('b')
+        counter._journal.close()
+        recovered = ViewCounter(db_path, background=False)
+        assert access_counts() == {'a': 5, 'b': 4}
+
+        # 반영 후 파일 삭제 전에 죽은 경우: 같은 배치는 다시 반영하지 않음
+        recovered.record('a')
+        recovered._journal.close()
+        recovered._journal = None
+        batch_path = f"{recovered.journal_path}.replay{BATCH_SUFFIX}"
+        os.replace(recovered.journal_path, batch_path)
+        recovered._apply(os.path.basename(batch_path), Counter({'a': 1}), {'a': time.time()})
+        ViewCounter(db_path, background=False)
+        assert access_counts() == {'a': 6, 'b': 4}
+
+        print("✅ 배치 반영, 저널 복구, 중복 반영 방지 확인")
+    finally:
+        close_pool(db_path)
+        shutil.rmtree(directory, ignore_errors=True)
+
+def benchmark_view_counter(views=20000):
+    """조회마다 UPDATE+커밋 vs 지연 기록 처리량"""
+    import shutil
+    import tempfile
+    from sqlite_pool import close_pool
+
+    print(f"⏱️ 조회수 기록 벤치마크: {views:,}회 (인기 링크 10개)")
+
+    directory = tempfile.mkdtemp()
+    db_path = os.path.join(directory, "models.db")
+    try:
+        conn = connect(db_path)
+        conn.execute('CREATE TABLE models (share_token TEXT UNIQUE, access_count INTEGER DEFAULT 0, last_accessed TIMESTAMP)')
+        conn.execute('CREATE TABLE view_count_batches (batch_id TEXT PRIMARY KEY, applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)')
+        conn.executemany('INSERT INTO models (share_token) VALUES (?)', [(f"t{i}",) for i in range(10)])
+        conn.commit()
+        conn.close()
+
+        started = time.perf_counter()
+        for i in range(views):
+            conn = connect(db_path)
+            conn.execute('''
+                UPDATE models SET access_count = access_count + 1, last_accessed = CURRENT_TIMESTAMP
+                WHERE share_token = ?
+            ''', (f"t{i % 10}",))
+            conn.commit()
+            conn.close()
+        direct = time.perf_counter() - started
+
+        counter = ViewCounter(db_path, background=False)
+        started = time.perf_counter()
+        for i in range(views):
+            counter.record(f"t{i % 10}")
+        counter.flush()
+        batched = time.perf_counter() - started
+
+        conn = connect(db_path)
+        total = conn.execute('SELECT SUM(access_count) FROM models').fetchone()[0]
+        conn.close()
+        assert total == views * 2
+
+        print(f"   조회마다 UPDATE: {views / direct:,.0f}회/s")
+        print(f"   지연 기록: {views / batched:,.0f}회/s ({direct / batched:.1f}배)")
+    finally:
+        close_pool(db_path)
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_view_counter()
+    benchmark_view_counter()
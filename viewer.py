@@ -2,6 +2,8 @@ import streamlit as st
 import importlib
 import sys
 from database_api import ModelDatabase, load_model_files, generate_share_url
+from viewer_cache import get_viewer_cache, make_viewer_key, annotation_revision
+from asset_server import publish_model_assets, touch_published_assets, is_enabled as asset_server_enabled
 
 # viewer_utils 모듈 강제 리로드
 if 'viewer_utils' in sys.modules:
@@ -76,11 +78,11 @@ def show_viewer_page(model_data):
                             for change in data.get('changes', []):
                                 try:
                                     if change['action'] == 'complete':
-                                        db.update_annotation_status(int(change['id']), True)
+                                        db.update_annotation_status(int(change['id']), True, model_token=share_token)
                                         changed_count += 1
                                         print(f"Annotation {change['id']} marked as completed")
                                     elif change['action'] == 'delete':
-                                        db.delete_annotation(int(change['id']))
+                                        db.delete_annotation(int(change['id']), model_token=share_token)
                                         changed_count += 1
                                         print(f"Annotation {change['id']} deleted")
                                 except Exception as e:
@@ -154,7 +156,7 @@ def show_viewer_page(model_data):
                 # 수정점 완료 처리
                 annotation_id = query_params.get("annotation_id", "")
                 if annotation_id:
-                    db.update_annotation_status(int(annotation_id), True)
+                    db.update_annotation_status(int(annotation_id), True, model_token=share_token)
                     st.query_params.clear()
                     st.rerun()
             
@@ -162,7 +164,7 @@ def show_viewer_page(model_data):
                 # 수정점 삭제
                 annotation_id = query_params.get("annotation_id", "")
                 if annotation_id:
-                    db.delete_annotation(int(annotation_id))
+                    db.delete_annotation(int(annotation_id), model_token=share_token)
                     st.query_params.clear()
                     st.rerun()
         except Exception as e:
@@ -263,9 +265,6 @@ def show_viewer_page(model_data):
         # URL 파라미터에서 배경색 가져오기 (기본값: white)
         background_color = bg_param
         
-        # 모델 파일 로드
-        obj_content, mtl_content, texture_data = load_model_files(model_data)
-        
         # 데이터베이스에서 annotations 로드 (share_token이 있는 경우에만)
         annotations = []
         share_token = model_data.get('share_token', None)
@@ -273,18 +272,45 @@ def show_viewer_page(model_data):
             db = ModelDatabase()
             annotations = db.get_annotations(share_token)
         
-        # 3D 뷰어 HTML 생성 (배경색, annotations 및 실제 높이 포함)
-        from viewer_utils import create_3d_viewer_html
         real_height = model_data.get('real_height', 1.0)  # 데이터베이스에서 실제 높이 가져오기
-        viewer_html = create_3d_viewer_html(
-            obj_content, 
-            mtl_content, 
-            texture_data, 
-            background_color,
-            model_token=share_token,
-            annotations=annotations,
-            real_height=real_height
-        )
+        
+        # 완성된 뷰어 HTML 캐시 확인 (인기 링크는 메모리에서 바로 제공)
+        viewer_cache = get_viewer_cache()
+        cache_key = make_viewer_key(share_token, background_color, annotation_revision(annotations), real_height)
+        viewer_html = viewer_cache.get(cache_key) if share_token else None
+        
+        # 캐시된 HTML의 에셋 사용 시간 갱신 (이미 정리된 에셋이 있으면 다시 생성해서 등록)
+        if viewer_html is not None and not touch_published_assets(viewer_html):
+            viewer_html = None
+        
+        if viewer_html is None:
+            # 모델 파일 로드 (컴파일된 바이너리 메시/LOD가 있으면 OBJ 대신 사용)
+            # 텍스처 해상도 단계/압축 파생본은 에셋 서버 URL로만 선택 가능하므로 인라인 뷰어에서는 받지 않음
+            use_asset_urls = asset_server_enabled()
+            obj_content, mtl_content, texture_data, mesh_data, lod_data = load_model_files(
+                model_data, with_mesh=True, texture_levels=use_asset_urls, compressed_textures=use_asset_urls
+            )
+            
+            # 에셋 서버가 설정되어 있으면 텍스처/메시를 URL로 제공 (브라우저 캐시 사용)
+            asset_urls = publish_model_assets(texture_data, mesh_data, lod_data)
+            
+            # 3D 뷰어 HTML 생성 (배경색, annotations 및 실제 높이 포함)
+            from viewer_utils import create_3d_viewer_html
+            viewer_html = create_3d_viewer_html(
+                obj_content, 
+                mtl_content, 
+                texture_data, 
+                background_color,
+                model_token=share_token,
+                annotations=annotations,
+                real_height=real_height,
+                mesh_data=mesh_data,
+                lod_data=lod_data,
+                asset_urls=asset_urls
+            )
+            
+            if share_token:
+                viewer_cache.put(cache_key, viewer_html, model_id=model_data.get('id'))
         
         # 전체 화면 뷰어 표시
         st.components.v1.html(viewer_html, width=None, height=None, scrolling=False)
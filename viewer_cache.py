@@ -0,0 +1,136 @@
+"""
+완성된 뷰어 HTML 메모리 캐시
+공유 링크 조회 시 모델 파일 다운로드 + base64 인코딩 + 템플릿 생성을 건너뛰기 위한
+바이트 크기 기반 LRU 캐시
+"""
+
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+# 기본 최대 캐시 크기 (환경변수로 조정 가능)
+DEFAULT_MAX_BYTES = int(os.getenv('VIEWER_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+DEFAULT_MAX_ENTRIES = int(os.getenv('VIEWER_CACHE_MAX_ENTRIES', '64'))
+
+def annotation_revision(annotations):
+    """수정점 목록의 리비전 값 계산 (내용이 바뀌면 값도 바뀜)"""
+    payload = json.dumps(annotations or [], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+def make_viewer_key(share_token, background_color, annotations_rev, real_height):
+    """캐시 키 생성 - (share_token, 배경색, 수정점 리비전, 실제 높이)"""
+    height = float(real_height) if real_height is not None else 1.0
+    return (share_token, background_color, annotations_rev, height)
+
+class ViewerCache:
+    """바이트 크기를 고려하는 스레드 안전 LRU 캐시"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (html, size)
+        self._model_tokens = {}        # model_id -> share_token (id 기반 무효화용)
+        self._lock = threading.Lock()
+        self._current_bytes = 0
+
+        # 크기 산정용 카운터
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """캐시 조회 (없으면 None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            # 최근 사용으로 이동
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, html, model_id=None):
+        """캐시 저장 - 한도를 넘으면 오래된 항목부터 제거"""
+        size = len(html.encode('utf-8')) if isinstance(html, str) else len(html)
+
+        # 단일 항목이 전체 한도보다 크면 저장하지 않음
+        if size > self.max_bytes:
+            return False
+
+        with self._lock:
+            if key in self._entries:
+                self._current_bytes -= self._entries.pop(key)[1]
+
+            self._entries[key] = (html, size)
+            self._current_bytes += size
+
+            if model_id:
+                self._model_tokens[model_id] = key[0]
+
+            while self._entries and (self._current_bytes > self.max_bytes or len(self._entries) > self.max_entries):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._current_bytes -= evicted_size
+                self.evictions += 1
+
+        return True
+
+    def invalidate_token(self, share_token):
+        """특정 공유 토큰의 모든 변형(배경색/높이 등) 제거"""
+        if not share_token:
+            return 0
+
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == share_token]
+            for key in keys:
+                self._current_bytes -= self._entries.pop(key)[1]
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def invalidate_model(self, model_id, share_token=None):
+        """모델 ID 기준 무효화 (삭제/높이 변경 시)"""
+        with self._lock:
+            token = share_token or self._model_tokens.pop(model_id, None)
+            self._model_tokens.pop(model_id, None)
+        return self.invalidate_token(token)
+
+    def clear(self):
+        """전체 캐시 비우기"""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._model_tokens.clear()
+            self._current_bytes = 0
+
+    def stats(self):
+        """캐시 통계 (크기 조정용)"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._current_bytes,
+                'max_bytes': self.max_bytes,
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_rate': (self.hits / total) if total else 0.0
+            }
+
+# 프로세스 전역 캐시 (모든 세션이 공유)
+_viewer_cache = None
+_viewer_cache_lock = threading.Lock()
+
+def get_viewer_cache():
+    """프로세스 전역 뷰어 캐시 반환"""
+    global _viewer_cache
+    if _viewer_cache is None:
+        with _viewer_cache_lock:
+            if _viewer_cache is None:
+                _viewer_cache = ViewerCache()
+    return _viewer_cache
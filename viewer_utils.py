@@ -1,9 +1,18 @@
 import base64
 import json
 from pathlib import Path
+from compressed_texture import is_variant as is_compressed_variant, source_name as compressed_source_name
+from texture_names import parse_pyramid_name, is_pyramid_level
 
-def create_3d_viewer_html(obj_content, mtl_content, texture_data, background_color="white", model_token=None, annotations=None, real_height=None):
-    """Three.js 기반 3D 뷰어 HTML 생성 - 치수선 기능 포함"""
+def create_3d_viewer_html(obj_content, mtl_content, texture_data, background_color="white", model_token=None, annotations=None, real_height=None, mesh_data=None, lod_data=None, asset_urls=None):
+    """Three.js 기반 3D 뷰어 HTML 생성 - 치수선 기능 포함
+    
+    mesh_data가 있으면 OBJ 텍스트 대신 컴파일된 바이너리 메시를 BufferGeometry로 바로 로드
+    lod_data(정밀 → 거침 순서)가 있으면 가장 거친 LOD를 먼저 표시하고 단계적으로 교체
+    asset_urls(asset_server.publish_model_assets 결과)가 있으면 텍스처/메시를 base64 대신 URL로 로드
+    (텍스처 해상도 단계가 있으면 가장 작은 단계를 먼저 표시하고 기기에 맞는 단계로 교체,
+    GPU 압축 파생본도 URL로 제공할 때만 사용)
+    """
     
     # 배경색 설정
     bg_colors = {
@@ -13,10 +22,39 @@ def create_3d_viewer_html(obj_content, mtl_content, texture_data, background_col
     }
     bg_color = bg_colors.get(background_color, "#ffffff")
     
-    # 텍스처를 base64로 인코딩
-    texture_base64 = {}
-    for name, data in texture_data.items():
-        texture_base64[name] = base64.b64encode(data).decode('utf-8')
+    if asset_urls:
+        # 에셋 서버 URL 사용 - 브라우저 캐시 활용, HTML에는 URL만 포함
+        texture_loading_code = create_texture_url_loading_code(asset_urls['textures'])
+        mesh_sources = [{'url': url} for url in reversed(asset_urls['lods'])]
+        if asset_urls.get('mesh'):
+            mesh_sources.append({'url': asset_urls['mesh']})
+        else:
+            mesh_sources = []
+    else:
+        # 텍스처를 base64로 인코딩 (해상도 단계와 압축 파생본은 HTML 크기를 늘리지 않도록 제외 -
+        # 이미지 하나만 넣음, 기기별 선택은 에셋 서버 URL을 쓸 때만)
+        texture_base64 = {}
+        for name, data in texture_data.items():
+            if is_compressed_variant(name) or _is_pyramid_level(name, texture_data):
+                continue
+            texture_base64[name] = base64.b64encode(data).decode('utf-8')
+        texture_loading_code = create_texture_loading_code(texture_base64)
+        
+        # 거친 LOD → 전체 메시 순서
+        mesh_sources = []
+        if mesh_data:
+            mesh_sources = [base64.b64encode(data).decode('utf-8') for data in reversed(lod_data or [])]
+            mesh_sources.append(base64.b64encode(mesh_data).decode('utf-8'))
+    
+    # 컴파일된 메시가 있으면 OBJ 텍스트는 넣지 않음
+    obj_source = '' if mesh_sources else obj_content
+    
+    # GPU 압축 텍스처가 있을 때만 BasisTextureLoader 로드
+    texture_names = asset_urls['textures'] if asset_urls else texture_base64
+    basis_loader_script = (
+        '<script src="https://unpkg.com/three@0.128.0/examples/js/loaders/BasisTextureLoader.js"></script>'
+        if has_compressed_textures(texture_names) else ''
+    )
     
     html_content = f"""
     <!DOCTYPE html>
@@ -987,7 +1025,7 @@ def create_3d_viewer_html(obj_content, mtl_content, texture_data, background_col
         <script src="https://unpkg.com/three@0.128.0/examples/js/loaders/OBJLoader.js"></script>
         <script src="https://unpkg.com/three@0.128.0/examples/js/loaders/MTLLoader.js"></script>
         <script src="https://unpkg.com/three@0.128.0/examples/js/controls/OrbitControls.js"></script>
-        
+        {basis_loader_script}
         <script>
             let scene, camera, renderer, controls;
             let model;
@@ -1977,7 +2015,7 @@ def create_3d_viewer_html(obj_content, mtl_content, texture_data, background_col
                                                     phongMat.map.encoding = THREE.LinearEncoding; // Linear 유지
                                                     phongMat.map.minFilter = THREE.LinearMipmapLinearFilter;
                                                     phongMat.map.magFilter = THREE.LinearFilter;
-                                                    phongMat.map.generateMipmaps = true;
+                                                    phongMat.map.generateMipmaps = !phongMat.map.isCompressedTexture;  // 압축 텍스처는 밉맵 포함
                                                     phongMat.map.anisotropy = Math.min(4, renderer.capabilities.getMaxAnisotropy());
                                                     phongMat.map.wrapS = THREE.ClampToEdgeWrapping;
                                                     phongMat.map.wrapT = THREE.ClampToEdgeWrapping;
@@ -2044,7 +2082,7 @@ def create_3d_viewer_html(obj_content, mtl_content, texture_data, background_col
                                                 phongMat.map.encoding = THREE.LinearEncoding; // Linear 유지
                                                 phongMat.map.minFilter = THREE.LinearMipmapLinearFilter;
                                                 phongMat.map.magFilter = THREE.LinearFilter;
-                                                phongMat.map.generateMipmaps = true;
+                                                phongMat.map.generateMipmaps = !phongMat.map.isCompressedTexture;  // 압축 텍스처는 밉맵 포함
                                                 phongMat.map.anisotropy = Math.min(4, renderer.capabilities.getMaxAnisotropy());
                                                 phongMat.map.wrapS = THREE.ClampToEdgeWrapping;
                                                 phongMat.map.wrapT = THREE.ClampToEdgeWrapping;
@@ -2179,6 +2217,8 @@ def create_3d_viewer_html(obj_content, mtl_content, texture_data, background_col
                 }}
             }}
             
+            {create_compiled_mesh_loading_code(mesh_sources)}
+            
             // 로딩 완료 시 페이드 아웃
             function hideLoadingOverlay() {{
                 const loadingOverlay = document.getElementById('loadingOverlay');
@@ -2291,7 +2331,7 @@ def create_3d_viewer_html(obj_content, mtl_content, texture_data, background_col
                 }}
             }}
             
-            function loadModel() {{
+            async function loadModel() {{
                 try {{
                     console.log('Starting model load...');
                     
@@ -2304,7 +2344,7 @@ def create_3d_viewer_html(obj_content, mtl_content, texture_data, background_col
                     const textures = {{}};
                     
                     // 텍스처 로딩
-                    {create_texture_loading_code(texture_base64)}
+                    {texture_loading_code}
                     
                     console.log('Textures loaded:', Object.keys(textures));
                     
@@ -2418,11 +2458,11 @@ def create_3d_viewer_html(obj_content, mtl_content, texture_data, background_col
                             basicMaterial.map.encoding = THREE.LinearEncoding;
                             basicMaterial.map.minFilter = THREE.LinearMipmapLinearFilter;
                             basicMaterial.map.magFilter = THREE.LinearFilter;
-                            basicMaterial.map.generateMipmaps = true;
+                            basicMaterial.map.generateMipmaps = !basicMaterial.map.isCompressedTexture;  // 압축 텍스처는 밉맵 포함
                             basicMaterial.map.anisotropy = Math.min(4, renderer.capabilities.getMaxAnisotropy());
                             basicMaterial.map.wrapS = THREE.ClampToEdgeWrapping;
                             basicMaterial.map.wrapT = THREE.ClampToEdgeWrapping;
-                            basicMaterial.map.needsUpdate = true;
+                            if (!basicMaterial.map.isCompressedTexture) basicMaterial.map.needsUpdate = true;
                             
                             // 기존 material을 basicMaterial로 교체
                             materials.materials[materialName] = basicMaterial;
@@ -2448,12 +2488,24 @@ def create_3d_viewer_html(obj_content, mtl_content, texture_data, background_col
                     
                     console.log('Materials loaded');
                     
-                    // OBJ 로더
-                    console.log('Loading OBJ...');
-                    const objLoader = new THREE.OBJLoader();
-                    objLoader.setMaterials(materials);
-                    
-                    const object = objLoader.parse(`{obj_content}`);
+                    let object;
+                    let pendingMeshLevels = [];
+                    if (compiledMeshSources.length) {{
+                        // 컴파일된 바이너리 메시 - 파싱 없이 BufferGeometry 생성
+                        // LOD가 있으면 가장 거친 단계를 먼저 보여주고 나머지는 표시 후 교체
+                        const meshLevels = startMeshLevels(compiledMeshSources);
+                        console.log('Loading compiled mesh... levels:', meshLevels.length);
+                        const firstLevel = await resolveMeshLevel(meshLevels[0]);
+                        object = buildCompiledMesh(decodeCompiledMesh(firstLevel), materials.materials);
+                        pendingMeshLevels = meshLevels.slice(1);
+                    }} else {{
+                        // OBJ 로더
+                        console.log('Loading OBJ...');
+                        const objLoader = new THREE.OBJLoader();
+                        objLoader.setMaterials(materials);
+                        
+                        object = objLoader.parse(`{obj_source}`);
+                    }}
                     
                     // UV 좌표 조정 - 0.001~0.999 범위로 제한
                     object.traverse((child) => {{
@@ -2543,6 +2595,7 @@ def create_3d_viewer_html(obj_content, mtl_content, texture_data, background_col
                             renderer.domElement.style.opacity = '1';
                             renderer.render(scene, camera);
                             animate();
+                            refineCompiledMesh(object, pendingMeshLevels);
                             console.log('Mobile optimization complete');
                         }}, delay);
                     }} else {{
@@ -2551,6 +2604,7 @@ def create_3d_viewer_html(obj_content, mtl_content, texture_data, background_col
                             renderer.domElement.style.opacity = '1';
                             renderer.render(scene, camera);
                             animate();
+                            refineCompiledMesh(object, pendingMeshLevels);
                         }}, 120);
                     }}
                 }} catch (error) {{
@@ -2800,39 +2854,421 @@ def create_3d_viewer_html(obj_content, mtl_content, texture_data, background_col
     
     return html_content
 
+COMPRESSED_TEXTURE_JS = """
+                // GPU 압축 텍스처(.basis) - 압축 형식을 지원하는 기기에서만 사용, 실패 시 이미지로 대체
+                const compressedTextureExtensions = [
+                    'WEBGL_compressed_texture_astc', 'WEBGL_compressed_texture_etc1', 'WEBGL_compressed_texture_etc',
+                    'WEBGL_compressed_texture_s3tc', 'WEBGL_compressed_texture_pvrtc', 'EXT_texture_compression_bptc'
+                ];
+                let basisLoader = null;
+                if (typeof THREE.BasisTextureLoader !== 'undefined' &&
+                    compressedTextureExtensions.some((name) => renderer.extensions.has(name))) {
+                    basisLoader = new THREE.BasisTextureLoader();
+                    basisLoader.setTranscoderPath('https://unpkg.com/three@0.128.0/examples/js/libs/basis/');
+                    basisLoader.detectSupport(renderer);
+                    console.log('Compressed textures enabled');
+                }
+                
+                // Linear 색상 공간 + UV Seam 방지 설정 (원본 색상 정확히 표현)
+                function configureImageTexture(tex) {
+                    tex.encoding = THREE.LinearEncoding;
+                    tex.flipY = true;
+                    tex.generateMipmaps = true;
+                    tex.minFilter = THREE.LinearMipmapLinearFilter;
+                    tex.magFilter = THREE.LinearFilter;
+                    tex.anisotropy = renderer.capabilities.getMaxAnisotropy();
+                    tex.wrapS = THREE.ClampToEdgeWrapping;
+                    tex.wrapT = THREE.ClampToEdgeWrapping;
+                    tex.format = THREE.RGBAFormat; // RGBA 포맷 (알파 채널 포함)
+                    tex.type = THREE.UnsignedByteType;
+                    return tex;
+                }
+                
+                function loadPreferCompressed(name, imageSource, compressedSource, onDone) {
+                    const done = onDone || (() => {});
+                    if (!basisLoader || !compressedSource) {
+                        return configureImageTexture(textureLoader.load(imageSource, done, undefined, done));
+                    }
+                    // 변환 시 상하 반전 + 밉맵 생성 완료 (compressed_texture.encode_basis)
+                    const tex = basisLoader.load(compressedSource, () => {
+                        console.log('Compressed texture loaded: ' + name);
+                        done();
+                    }, undefined, (error) => {
+                        console.warn('Compressed texture failed, using image: ' + name, error);
+                        new THREE.ImageLoader().setCrossOrigin('anonymous').load(imageSource, (image) => {
+                            tex.isCompressedTexture = false;
+                            tex.mipmaps = [];
+                            tex.image = image;
+                            configureImageTexture(tex).needsUpdate = true;
+                            done();
+                        }, undefined, done);
+                    });
+                    tex.wrapS = THREE.ClampToEdgeWrapping;
+                    tex.wrapT = THREE.ClampToEdgeWrapping;
+                    return tex;
+                }
+"""
+
+TEXTURE_PYRAMID_JS = """
+                // 해상도 단계 선택 - 뷰어 캔버스 크기 × DPR, GPU 최대 텍스처 크기, 네트워크 상태 기준
+                // (navigator.connection이 없는 브라우저(Safari 등)는 캔버스 크기만 사용)
+                function textureTargetSize() {
+                    const dpr = Math.min(window.devicePixelRatio || 1, 2);
+                    const canvas = renderer.domElement;
+                    const width = canvas.clientWidth || window.innerWidth;
+                    const height = canvas.clientHeight || window.innerHeight;
+                    let target = Math.max(width, height) * dpr;
+                    const connection = navigator.connection;
+                    if (connection) {
+                        if (connection.saveData || ['slow-2g', '2g'].includes(connection.effectiveType)) {
+                            target = Math.min(target, 512);
+                        } else if (connection.effectiveType === '3g') {
+                            target = Math.min(target, 1024);
+                        }
+                    }
+                    return Math.min(target, renderer.capabilities.maxTextureSize);
+                }
+                
+                // levels: 작은 단계 → 원본(size: Infinity) 순서
+                // 목표 크기와 배율(log2) 차이가 가장 작은 단계 선택 - 원본은 가장 큰 단계의 2배로 가정
+                function pickTextureLevel(levels, target) {
+                    const largest = levels.length > 1 ? levels[levels.length - 2].size : target;
+                    let chosen = levels[0];
+                    let bestDistance = Infinity;
+                    levels.forEach((level) => {
+                        const size = Number.isFinite(level.size) ? level.size : largest * 2;
+                        const distance = Math.abs(Math.log2(size / target));
+                        if (distance < bestDistance) {
+                            chosen = level;
+                            bestDistance = distance;
+                        }
+                    });
+                    return chosen;
+                }
+                
+                // 가장 작은 단계로 먼저 표시하고, 첫 화면이 그려진 뒤 선택한 단계로 교체
+                const textureUpgrades = [];
+                let initialTexturesPending = 0;
+                let textureUpgradesStarted = false;
+                
+                function startTextureUpgrades() {
+                    if (textureUpgradesStarted) return;
+                    textureUpgradesStarted = true;
+                    requestAnimationFrame(() => requestAnimationFrame(() => {
+                        textureUpgrades.forEach((upgrade) => upgrade());
+                    }));
+                }
+                
+                function onInitialTextureDone() {
+                    initialTexturesPending -= 1;
+                    if (initialTexturesPending === 0) startTextureUpgrades();
+                }
+                setTimeout(startTextureUpgrades, 3000);
+                
+                function applyTextureLevel(tex, loaded) {
+                    const isCompressed = loaded.isCompressedTexture === true;
+                    tex.image = loaded.image;
+                    tex.mipmaps = loaded.mipmaps || [];
+                    tex.isCompressedTexture = isCompressed;
+                    tex.format = isCompressed ? loaded.format : THREE.RGBAFormat;
+                    tex.flipY = !isCompressed;
+                    tex.generateMipmaps = !isCompressed;
+                    tex.minFilter = isCompressed ? loaded.minFilter : THREE.LinearMipmapLinearFilter;
+                    tex.needsUpdate = true;
+                }
+                
+                function upgradeTexture(tex, name, level) {
+                    const loadImage = () => textureLoader.load(level.image, (loaded) => {
+                        applyTextureLevel(tex, loaded);
+                        console.log('Texture upgraded: ' + name + ' (' + level.size + ')');
+                    });
+                    if (basisLoader && level.compressed) {
+                        basisLoader.load(level.compressed, (loaded) => {
+                            applyTextureLevel(tex, loaded);
+                            console.log('Compressed texture upgraded: ' + name + ' (' + level.size + ')');
+                        }, undefined, loadImage);
+                    } else {
+                        loadImage();
+                    }
+                }
+                
+                function loadTexturePyramid(name, levels) {
+                    const chosen = pickTextureLevel(levels, textureTargetSize());
+                    const first = levels[0];
+                    initialTexturesPending += 1;
+                    const tex = loadPreferCompressed(name, first.image, first.compressed, onInitialTextureDone);
+                    if (chosen !== first) {
+                        textureUpgrades.push(() => upgradeTexture(tex, name, chosen));
+                    }
+                    return tex;
+                }
+"""
+
+TEXTURE_MIME_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.webp': 'image/webp',
+    '.avif': 'image/avif'
+}
+
+def _is_pyramid_level(name, texture_names):
+    """원본 텍스처가 함께 있는 해상도 단계(또는 그 압축 파생본)인지 여부"""
+    if is_compressed_variant(name):
+        name = compressed_source_name(name)
+    return is_pyramid_level(name, texture_names)
+
+def _split_texture_levels(images, variants):
+    """이미지 텍스처 → {원본 이름: [해상도 단계(작은 순) ... 원본]} (단계가 없는 텍스처는 제외)"""
+    levels = {}
+    for name, value in images.items():
+        base, level = parse_pyramid_name(name)
+        if level is not None and base in images:
+            levels.setdefault(base, []).append({'size': level, 'image': value, 'compressed': variants.get(name)})
+    for base, entries in levels.items():
+        entries.sort(key=lambda entry: entry['size'])
+        entries.append({'size': None, 'image': images[base], 'compressed': variants.get(base)})
+    return levels
+
+def _split_compressed_variants(textures):
+    """텍스처 목록 → (이미지 텍스처, {이미지 이름: 압축 파생본})"""
+    images = {}
+    variants = {}
+    for name, value in textures.items():
+        if is_compressed_variant(name):
+            variants[compressed_source_name(name)] = value
+        else:
+            images[name] = value
+    return images, variants
+
+def has_compressed_textures(texture_names):
+    """압축 텍스처 파생본 포함 여부 (BasisTextureLoader 스크립트 추가 여부 결정)"""
+    return any(is_compressed_variant(name) for name in texture_names)
+
 def create_texture_loading_code(texture_base64):
-    """텍스처 로딩 JavaScript 코드 생성"""
+    """텍스처 로딩 JavaScript 코드 생성 (압축 파생본이 있으면 지원 기기에서 우선 사용)"""
     if not texture_base64:
         return "// No textures available"
     
-    code_lines = []
-    for name, data in texture_base64.items():
-        safe_name = name.replace('.', '_').replace('-', '_')
+    images, variants = _split_compressed_variants(texture_base64)
+    code_lines = [COMPRESSED_TEXTURE_JS]
+    for name, data in images.items():
         ext = Path(name).suffix.lower()
-        mime_type = 'image/jpeg' if ext in ['.jpg', '.jpeg'] else 'image/png'
+        mime_type = TEXTURE_MIME_TYPES.get(ext, 'image/png')
+        compressed_source = f"'data:application/octet-stream;base64,{variants[name]}'" if name in variants else 'null'
         code_lines.append(f"""
                 // {name} 텍스처 로딩
-                const img_{safe_name} = new Image();
-                img_{safe_name}.src = 'data:{mime_type};base64,{data}';
-                const tex_{safe_name} = textureLoader.load(img_{safe_name}.src);
-                
-                // Linear 색상 공간 사용 (원본 색상 정확히 표현)
-                tex_{safe_name}.encoding = THREE.LinearEncoding;
-                tex_{safe_name}.flipY = true;
-                
-                // UV Seam 방지 + 색상 정확도
-                tex_{safe_name}.generateMipmaps = true;
-                tex_{safe_name}.minFilter = THREE.LinearMipmapLinearFilter;
-                tex_{safe_name}.magFilter = THREE.LinearFilter;
-                tex_{safe_name}.anisotropy = renderer.capabilities.getMaxAnisotropy();
-                tex_{safe_name}.wrapS = THREE.ClampToEdgeWrapping;
-                tex_{safe_name}.wrapT = THREE.ClampToEdgeWrapping;
-                tex_{safe_name}.format = THREE.RGBAFormat; // RGBA 포맷 (알파 채널 포함)
-                tex_{safe_name}.type = THREE.UnsignedByteType;
-                tex_{safe_name}.needsUpdate = true;
-                
-                textures['{name}'] = tex_{safe_name};
+                textures[{json.dumps(name)}] = loadPreferCompressed(
+                    {json.dumps(name)}, 'data:{mime_type};base64,{data}', {compressed_source}
+                );
                 console.log('Texture loaded with original colors: {name}');
         """)
     
     return '\n'.join(code_lines)
+
+def create_texture_url_loading_code(texture_urls):
+    """텍스처 URL 로딩 JavaScript 코드 생성 (에셋 서버 사용 시 - 이미지/압축 중 하나만 요청,
+    해상도 단계가 있으면 가장 작은 단계 → 기기에 맞는 단계 순서로 요청)"""
+    if not texture_urls:
+        return "// No textures available"
+    
+    images, variants = _split_compressed_variants(texture_urls)
+    pyramids = _split_texture_levels(images, variants)
+    code_lines = ["textureLoader.setCrossOrigin('anonymous');", COMPRESSED_TEXTURE_JS]
+    if pyramids:
+        code_lines.append(TEXTURE_PYRAMID_JS)
+    for name, url in images.items():
+        if _is_pyramid_level(name, images):
+            continue
+        if name in pyramids:
+            # 원본 단계 크기는 알 수 없으므로 Infinity (항상 마지막 후보)
+            levels = json.dumps(pyramids[name]).replace('"size": null', '"size": Infinity')
+            code_lines.append(f"""
+                // {name} 텍스처 로딩 (해상도 단계 {len(pyramids[name]) - 1}개 - 기기에 맞게 선택)
+                textures[{json.dumps(name)}] = loadTexturePyramid({json.dumps(name)}, {levels});
+                console.log('Texture requested: {name}');
+        """)
+            continue
+        code_lines.append(f"""
+                // {name} 텍스처 로딩 (캐시 가능한 URL)
+                textures[{json.dumps(name)}] = loadPreferCompressed(
+                    {json.dumps(name)}, {json.dumps(url)}, {json.dumps(variants.get(name))}
+                );
+                console.log('Texture requested: {name}');
+        """)
+    
+    return '\n'.join(code_lines)
+
+COMPILED_MESH_LOADER_JS = """
+            // 메시 단계별 소스 준비 - URL은 바로 병렬 요청 시작, base64는 사용할 때 디코딩
+            function startMeshLevels(sources) {
+                return sources.map((source) => {
+                    if (typeof source === 'string') return source;
+                    return fetch(source.url).then((response) => {
+                        if (!response.ok) throw new Error('Mesh fetch failed: ' + response.status);
+                        return response.arrayBuffer();
+                    });
+                });
+            }
+            
+            async function resolveMeshLevel(level) {
+                if (typeof level !== 'string') return await level;
+                
+                const binary = atob(level);
+                const bytes = new Uint8Array(binary.length);
+                for (let i = 0; i < binary.length; i++) {
+                    bytes[i] = binary.charCodeAt(i);
+                }
+                return bytes.buffer;
+            }
+            
+            // 컴파일된 바이너리 메시 디코딩 (mesh_compiler.py 형식)
+            function decodeCompiledMesh(buffer) {
+                const headerLength = new DataView(buffer).getUint32(4, true);
+                const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, headerLength)));
+                const count = header.vertex_count;
+                const stride = header.stride;
+                const vertexOffset = header.vertex_buffer.offset;
+                const words = new Uint16Array(buffer, vertexOffset, header.vertex_buffer.length / 2);
+                const signedBytes = new Int8Array(buffer, vertexOffset, header.vertex_buffer.length);
+                
+                // 양자화된 값을 Float32로 복원
+                function dequantize(attribute, components) {
+                    const out = new Float32Array(count * components);
+                    const base = attribute.offset / 2;
+                    for (let c = 0; c < components; c++) {
+                        const low = attribute.min[c];
+                        const range = (attribute.max[c] - low) / 65535;
+                        for (let i = 0; i < count; i++) {
+                            out[i * components + c] = low + words[i * stride / 2 + base + c] * range;
+                        }
+                    }
+                    return out;
+                }
+                
+                const mesh = {
+                    positions: dequantize(header.attributes.position, 3),
+                    uvs: header.attributes.uv ? dequantize(header.attributes.uv, 2) : null,
+                    normals: null,
+                    groups: header.groups
+                };
+                
+                if (header.attributes.normal) {
+                    const normals = new Float32Array(count * 3);
+                    const offset = header.attributes.normal.offset;
+                    for (let i = 0; i < count; i++) {
+                        for (let c = 0; c < 3; c++) {
+                            normals[i * 3 + c] = signedBytes[i * stride + offset + c] / 127;
+                        }
+                    }
+                    mesh.normals = normals;
+                }
+                
+                const IndexArray = header.index_type === 'uint16' ? Uint16Array : Uint32Array;
+                mesh.indices = new IndexArray(buffer, header.index_buffer.offset, header.index_count);
+                return mesh;
+            }
+            
+            // 재질 그룹별 BufferGeometry 생성 (정점 속성은 공유)
+            function buildCompiledGeometries(mesh) {
+                const position = new THREE.BufferAttribute(mesh.positions, 3);
+                const uv = mesh.uvs ? new THREE.BufferAttribute(mesh.uvs, 2) : null;
+                const normal = mesh.normals ? new THREE.BufferAttribute(mesh.normals, 3) : null;
+                
+                return mesh.groups.map((materialGroup) => {
+                    const geometry = new THREE.BufferGeometry();
+                    geometry.setAttribute('position', position);
+                    if (uv) geometry.setAttribute('uv', uv);
+                    if (normal) geometry.setAttribute('normal', normal);
+                    geometry.setIndex(new THREE.BufferAttribute(
+                        mesh.indices.subarray(materialGroup.start, materialGroup.start + materialGroup.count), 1
+                    ));
+                    return {name: materialGroup.material, geometry: geometry};
+                });
+            }
+            
+            // 재질 그룹 1개 → Mesh (재질이 없으면 회색 기본 재질)
+            function buildCompiledPart(part, materialMap) {
+                const material = materialMap[part.name] || new THREE.MeshBasicMaterial({
+                    color: 0xcccccc,
+                    side: THREE.DoubleSide
+                });
+                const child = new THREE.Mesh(part.geometry, material);
+                child.name = part.name;
+                return child;
+            }
+            
+            // 재질 그룹별 Mesh 생성 - OBJLoader 결과와 같은 구조
+            // (거친 LOD에서 빠진 작은 재질 그룹은 교체할 때 추가하므로 재질 목록 보관)
+            function buildCompiledMesh(mesh, materialMap) {
+                const group = new THREE.Group();
+                group.userData.materialMap = materialMap;
+                
+                buildCompiledGeometries(mesh).forEach((part) => {
+                    group.add(buildCompiledPart(part, materialMap));
+                });
+                
+                return group;
+            }
+            
+            // LOD → 고해상도 순서로 지오메트리 교체 (Mesh/재질은 그대로 유지,
+            // 이전 단계에 없던 재질 그룹은 새 Mesh로 추가)
+            function refineCompiledMesh(object, levels) {
+                if (!levels || levels.length === 0) return;
+                
+                setTimeout(async () => {
+                    let buffer;
+                    try {
+                        buffer = await resolveMeshLevel(levels[0]);
+                    } catch (error) {
+                        // 고해상도 단계를 못 받으면 현재 단계 유지
+                        console.warn('Mesh refinement stopped:', error);
+                        return;
+                    }
+                    
+                    const started = performance.now();
+                    const parts = buildCompiledGeometries(decodeCompiledMesh(buffer));
+                    
+                    parts.forEach((part) => {
+                        // 기존 로딩과 같은 UV 범위 제한
+                        const uvAttribute = part.geometry.attributes.uv;
+                        if (uvAttribute && !uvAttribute.clamped) {
+                            const uvArray = uvAttribute.array;
+                            for (let i = 0; i < uvArray.length; i++) {
+                                uvArray[i] = Math.max(0.001, Math.min(0.999, uvArray[i]));
+                            }
+                            uvAttribute.clamped = true;
+                        }
+                        if (!part.geometry.attributes.normal) {
+                            part.geometry.computeVertexNormals();
+                        }
+                        
+                        const child = object.children.find((candidate) => candidate.isMesh && candidate.name === part.name);
+                        if (child) {
+                            child.geometry.dispose();
+                            child.geometry = part.geometry;
+                            return;
+                        }
+                        
+                        // 거친 LOD에서 사라졌던 재질 그룹 (작은 부품) - 첫 로딩과 같은 재질 설정으로 추가
+                        const added = buildCompiledPart(part, object.userData.materialMap || {});
+                        added.material.vertexColors = false;
+                        added.material.needsUpdate = true;
+                        object.add(added);
+                    });
+                    
+                    console.log('Mesh refined (' + (levels.length - 1) + ' levels left) in ' + Math.round(performance.now() - started) + 'ms');
+                    refineCompiledMesh(object, levels.slice(1));
+                }, 50);
+            }
+"""
+
+def create_compiled_mesh_loading_code(mesh_sources):
+    """컴파일된 바이너리 메시 로딩 JavaScript 코드 생성
+
+    mesh_sources: 거친 LOD → 전체 메시 순서의 base64 문자열 또는 {'url': ...} 목록
+    """
+    if not mesh_sources:
+        return "const compiledMeshSources = [];\n            function refineCompiledMesh() {}"
+    
+    return f"const compiledMeshSources = {json.dumps(mesh_sources)};\n" + COMPILED_MESH_LOADER_JS
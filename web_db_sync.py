@@ -6,20 +6,33 @@
 import sqlite3
 import requests
 import tempfile
+import http_transport
 import os
 import json
 import streamlit as st
 from datetime import datetime
 import shutil
+import time
+import random
+import threading
+from sqlite_pool import connect
+from viewer_cache import get_viewer_cache
+
+# 변경분 동기화 기준점 (sync_state 테이블 키)
+SYNC_CURSOR_KEY = 'web_models_since'
+
+# 백그라운드 동기화 주기 (환경변수로 조정 가능)
+WEB_SYNC_INTERVAL = float(os.getenv('WEB_SYNC_INTERVAL', '300'))  # 초
+WEB_SYNC_JITTER = float(os.getenv('WEB_SYNC_JITTER', '0.1'))      # 주기의 ±비율 (여러 프로세스가 동시에 요청하지 않도록)
 
 class WebDBSync:
-    def __init__(self):
+    def __init__(self, local_db_path="data/models.db"):
         # 웹서버의 DB 직접 접근 URL
         self.web_db_url = "https://www.airbible.kr/streamlit_data/streamlit_3d.db"
         # API 대체 URL (DB 직접 접근 실패 시)
         self.api_base_url = "https://www.airbible.kr/streamlit_data"
         self.get_models_url = f"{self.api_base_url}/get_all_models.php"
-        self.local_db_path = "data/models.db"
+        self.local_db_path = local_db_path
         self.temp_db_path = None
         
     def download_web_db(self):
@@ -33,12 +46,11 @@ class WebDBSync:
                 
                 # 헤더 추가하여 DB 파일 다운로드
                 headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
                     'Accept': '*/*',
                     'Referer': 'https://www.airbible.kr/'
                 }
                 
-                response = requests.get(self.web_db_url, headers=headers, timeout=30, verify=False)
+                response = http_transport.get(self.web_db_url, endpoint='sync', headers=headers, verify=False)
                 response.raise_for_status()
                 
                 tmp_file.write(response.content)
@@ -58,11 +70,10 @@ class WebDBSync:
         """API를 통해 모델 데이터 가져오기 (대체 방법)"""
         try:
             headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
                 'Accept': 'application/json'
             }
             
-            response = requests.get(self.get_models_url, headers=headers, timeout=30, verify=False)
+            response = http_transport.get(self.get_models_url, endpoint='sync', headers=headers, verify=False)
             
             if response.status_code == 200:
                 data = response.json()
@@ -212,8 +223,191 @@ class WebDBSync:
             1.0    # real_height (기본값)
         )
     
+    # ============ 변경분(delta) 동기화 ============
+    # get_all_models.php?since=<기준점> 응답 형식:
+    #   {"status": "success", "models": [...], "deleted": [id 또는 {"id": ...}], "cursor": "<다음 기준점>"}
+    # - models: updated_at(없으면 created_at)이 since 이상인 행 (경계 포함 - 로컬 반영은 멱등)
+    # - since를 지원하지 않는 구버전 API는 cursor/deleted 없이 전체 목록을 반환 → 전체 스냅샷으로 처리
+    # - 삭제는 서버가 deleted로 알려준 ID만 반영 (목록에 없다고 삭제하지 않음 - 메타데이터 저장 실패나
+    #   동기화 도중 저장된 모델이 지워질 수 있음)
+
+    def get_sync_cursor(self):
+        """마지막으로 반영한 변경 기준점 (없으면 None)"""
+        conn = connect(self.local_db_path)
+        try:
+            row = conn.execute('SELECT value FROM sync_state WHERE key = ?', (SYNC_CURSOR_KEY,)).fetchone()
+            return row[0] if row else None
+        except sqlite3.OperationalError:
+            # sync_state 테이블이 아직 없음 (마이그레이션 전)
+            return None
+        finally:
+            conn.close()
+
+    def fetch_changes(self, since=None):
+        """since 이후 변경된 모델/삭제된 ID 가져오기
+
+        Returns:
+            dict | None: {'models', 'deleted', 'cursor', 'snapshot'}
+        """
+        params = {'since': since} if since else {}
+        response = http_transport.get(
+            self.get_models_url, endpoint='sync_check', params=params,
+            headers={'Accept': 'application/json'}, verify=False
+        )
+        if response.status_code != 200:
+            return None
+
+        data = response.json()
+        if data.get('status') != 'success':
+            return None
+
+        models = data.get('models', [])
+        deleted = [item['id'] if isinstance(item, dict) else item for item in data.get('deleted', [])]
+        # since 없이 받은 첫 목록이나 since를 무시하는 구버전 응답은 전체 목록 (삭제 판단에는 사용하지 않음)
+        snapshot = since is None or ('cursor' not in data and 'deleted' not in data)
+
+        cursor = data.get('cursor')
+        if not cursor:
+            stamps = [model.get('updated_at') or model.get('created_at') for model in models]
+            stamps = [stamp for stamp in stamps if stamp]
+            cursor = max(stamps) if stamps else since
+
+        return {'models': models, 'deleted': deleted, 'cursor': cursor, 'snapshot': snapshot}
+
+    def _web_model_to_row(self, model):
+        """API 모델(dict) → 로컬 models 행 (id, name, author, description, file_paths, backup_paths,
+        storage_type, share_token, created_at, access_count, real_height)"""
+        file_paths = model.get('file_paths')
+        backup_paths = model.get('backup_paths')
+        if file_paths:
+            file_paths = file_paths if isinstance(file_paths, str) else json.dumps(file_paths)
+            if backup_paths and not isinstance(backup_paths, str):
+                backup_paths = json.dumps(backup_paths)
+        else:
+            # 구 형식 (obj_path/mtl_path/texture_paths) → 기존 변환 규칙 사용
+            texture_paths = model.get('texture_paths')
+            if isinstance(texture_paths, list):
+                texture_paths = json.dumps(texture_paths)
+            converted = self.convert_web_to_local_format((
+                model['id'], model.get('name'), model.get('author'), model.get('description'),
+                model.get('share_token'), model.get('obj_path'), model.get('mtl_path'), texture_paths,
+                model.get('storage_type'), model.get('access_count'), model.get('created_at')
+            ))
+            file_paths, backup_paths = converted[4], converted[5]
+
+        return (
+            model['id'], model.get('name'), model.get('author') or '', model.get('description') or '',
+            file_paths, backup_paths, model.get('storage_type') or 'web', model.get('share_token'),
+            model.get('created_at'), model.get('access_count') or 0, model.get('real_height') or 1.0
+        )
+
+    # 웹 값으로 덮어쓰는 열 (_web_model_to_row 순서 기준 인덱스) - 값이 같으면 수정으로 세지 않음
+    SYNCED_COLUMNS = (
+        ('name', 1), ('author', 2), ('description', 3), ('file_paths', 4),
+        ('storage_type', 6), ('share_token', 7), ('real_height', 10)
+    )
+
+    def apply_changes(self, changes):
+        """변경분을 로컬 DB에 한 트랜잭션으로 반영 (추가/수정/삭제 + 기준점 저장)
+
+        삭제는 changes['deleted']에 있는 ID만 처리하고, 내용이 실제로 바뀐 모델만
+        수정으로 세고 뷰어 캐시를 무효화
+
+        Returns:
+            dict: {'inserted', 'updated', 'deleted'} 개수
+        """
+        summary = {'inserted': 0, 'updated': 0, 'deleted': 0}
+        changed_tokens = []
+
+        conn = connect(self.local_db_path)
+        try:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+
+            columns = ', '.join(name for name, _ in self.SYNCED_COLUMNS)
+            for model in changes['models']:
+                row = self._web_model_to_row(model)
+                existing = cursor.execute(f'SELECT {columns} FROM models WHERE id = ?', (row[0],)).fetchone()
+                if existing and all(existing[i] == row[index] for i, (_, index) in enumerate(self.SYNCED_COLUMNS)):
+                    continue  # 변경 없음 (since 경계의 행이나 구버전 API의 전체 목록)
+                # 조회수/마지막 접근/로컬 백업 경로는 로컬 값 유지
+                cursor.execute("""
+                    INSERT INTO models (
+                        id, name, author, description, file_paths, backup_paths,
+                        storage_type, share_token, created_at, access_count, real_height
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET
+                        name = excluded.name,
+                        author = excluded.author,
+                        description = excluded.description,
+                        file_paths = excluded.file_paths,
+                        backup_paths = COALESCE(models.backup_paths, excluded.backup_paths),
+                        storage_type = excluded.storage_type,
+                        share_token = excluded.share_token,
+                        real_height = excluded.real_height
+                """, row)
+                summary['updated' if existing else 'inserted'] += 1
+                # 토큰이 바뀌었으면 이전 토큰의 캐시도 무효화
+                changed_tokens.append((row[0], row[7]))
+                if existing and existing[5] != row[7]:
+                    changed_tokens.append((row[0], existing[5]))
+
+            for model_id in changes['deleted']:
+                row = cursor.execute('SELECT share_token FROM models WHERE id = ?', (model_id,)).fetchone()
+                if not row:
+                    continue
+                cursor.execute('DELETE FROM annotations WHERE model_token = ?', (row[0],))
+                cursor.execute('DELETE FROM models WHERE id = ?', (model_id,))
+                summary['deleted'] += 1
+                changed_tokens.append((model_id, row[0]))
+
+            if changes['cursor']:
+                cursor.execute(
+                    'INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)',
+                    (SYNC_CURSOR_KEY, changes['cursor'])
+                )
+            cursor.execute('COMMIT')
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        for model_id, share_token in changed_tokens:
+            get_viewer_cache().invalidate_model(model_id, share_token)
+        return summary
+
+    def delta_sync(self, show_progress=False):
+        """기준점 이후 변경분만 받아서 반영
+
+        Returns:
+            dict | None: 반영 결과 (API가 실패 응답을 주면 None)
+
+        Raises:
+            Exception: 네트워크/DB 오류는 그대로 전달 (워커가 last_error에 기록)
+        """
+        since = self.get_sync_cursor()
+        changes = self.fetch_changes(since)
+        if changes is None:
+            return None
+
+        summary = self.apply_changes(changes)
+        print(f"[DEBUG] 변경분 동기화 (since={since}): 추가 {summary['inserted']}, "
+              f"수정 {summary['updated']}, 삭제 {summary['deleted']}")
+        if show_progress:
+            st.success(f"✅ 변경분 동기화 완료 - 추가 {summary['inserted']}개, "
+                       f"수정 {summary['updated']}개, 삭제 {summary['deleted']}개")
+        return summary
+
     def sync_databases(self, show_progress=True):
-        """웹서버 DB와 로컬 DB 동기화"""
+        """웹서버 DB와 로컬 DB 동기화 (변경분 API 우선, 실패 시 DB 전체 다운로드)"""
+        try:
+            if self.delta_sync(show_progress=show_progress) is not None:
+                return True
+        except Exception as e:
+            print(f"[DEBUG] 변경분 동기화 실패 - DB 전체 다운로드로 대체: {e}")
+
         try:
             # 1. 웹서버 DB 다운로드
             if not self.download_web_db():
@@ -308,39 +502,268 @@ class WebDBSync:
                     pass
     
     def quick_sync_check(self):
-        """빠른 동기화 필요 여부 확인 (UI 표시 없음)"""
+        """빠른 동기화 필요 여부 확인 (UI 표시 없음) - DB 파일 대신 변경분 API로 확인"""
         try:
-            # 웹서버 DB 다운로드 (조용히)
-            response = requests.get(self.web_db_url, timeout=10)
-            if response.status_code != 200:
+            since = self.get_sync_cursor()
+            changes = self.fetch_changes(since)
+            if not changes:
                 return False
-                
-            # 임시 파일에 저장
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.db') as tmp_file:
-                tmp_path = tmp_file.name
-                tmp_file.write(response.content)
-            
-            # 웹서버 DB 모델 수 확인
-            conn_web = sqlite3.connect(tmp_path)
-            cursor_web = conn_web.cursor()
-            cursor_web.execute("SELECT COUNT(*) FROM models")
-            web_count = cursor_web.fetchone()[0]
-            conn_web.close()
-            
-            # 로컬 DB 모델 수 확인
-            local_count = 0
-            if os.path.exists(self.local_db_path):
-                conn_local = sqlite3.connect(self.local_db_path)
-                cursor_local = conn_local.cursor()
-                cursor_local.execute("SELECT COUNT(*) FROM models")
-                local_count = cursor_local.fetchone()[0]
-                conn_local.close()
-            
-            # 임시 파일 삭제
-            os.remove(tmp_path)
-            
-            # 동기화 필요 여부 반환
-            return web_count > local_count
+            if changes['deleted'] or (changes['snapshot'] and since is None):
+                return True
+            # 경계(since)와 같은 시각의 행은 이미 반영된 것일 수 있으므로 새 기준점으로 판단
+            return bool(changes['models']) and changes['cursor'] != since
             
         except:
-            return False
\ No newline at end of file
+            return False
+
+
+class BackgroundSyncWorker:
+    """프로세스당 하나의 웹 DB 동기화 스레드 (요청 처리 경로에서 네트워크 대기 없음)"""
+
+    def __init__(self, local_db_path="data/models.db", interval=WEB_SYNC_INTERVAL, jitter=WEB_SYNC_JITTER):
+        self.sync = WebDBSync(local_db_path=local_db_path)
+        self.interval = interval
+        self.jitter = jitter
+
+        self._run_lock = threading.Lock()   # single-flight: 동기화는 한 번에 하나만
+        self._status_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._status = {
+            'running': False,
+            'runs': 0,
+            'skipped': 0,
+            'last_started': None,
+            'last_finished': None,
+            'last_success': None,
+            'last_error': None,
+            'last_summary': None
+        }
+
+    def start(self):
+        """동기화 스레드 시작 (첫 동기화는 바로 실행)"""
+        with self._status_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='web-db-sync', daemon=True)
+                self._thread.start()
+        return self
+
+    def next_delay(self):
+        """다음 동기화까지 대기 시간 (지터 포함)"""
+        return max(self.interval * (1 + random.uniform(-self.jitter, self.jitter)), 1.0)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.run_once()
+            self._wake.wait(self.next_delay())
+            self._wake.clear()
+
+    def trigger(self):
+        """다음 주기를 기다리지 않고 바로 동기화"""
+        self._wake.set()
+
+    def run_once(self, full=False, show_progress=False, wait=False):
+        """동기화 1회 실행
+
+        Args:
+            full: True면 sync_databases (변경분 API 실패 시 DB 전체 다운로드)
+            wait: 이미 실행 중이면 끝날 때까지 기다림 (False면 건너뜀)
+
+        Returns:
+            bool | None: 성공 여부, 다른 동기화가 실행 중이라 건너뛰면 None
+        """
+        if not self._run_lock.acquire(blocking=wait):
+            with self._status_lock:
+                self._status['skipped'] += 1
+            return None
+
+        try:
+            with self._status_lock:
+                self._status['running'] = True
+                self._status['last_started'] = time.time()
+
+            error = None
+            summary = None
+            try:
+                if full:
+                    success = self.sync.sync_databases(show_progress=show_progress)
+                else:
+                    summary = self.sync.delta_sync(show_progress=show_progress)
+                    success = summary is not None
+                    if not success:
+                        error = "변경분 API 응답 없음"
+            except Exception as e:
+                success = False
+                error = str(e)
+
+            with self._status_lock:
+                self._status['running'] = False
+                self._status['runs'] += 1
+                self._status['last_finished'] = time.time()
+                self._status['last_error'] = error
+                if success:
+                    self._status['last_success'] = self._status['last_finished']
+                    self._status['last_summary'] = summary
+            return success
+        finally:
+            self._run_lock.release()
+
+    def status(self):
+        """마지막 동기화 상태 (시각은 epoch 초)"""
+        with self._status_lock:
+            return dict(self._status)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+# 프로세스 전역 동기화 워커 (로컬 DB 경로별)
+_sync_workers = {}
+_sync_workers_lock = threading.Lock()
+
+def get_sync_worker(local_db_path="data/models.db", start=True):
+    """로컬 DB 경로별 공용 BackgroundSyncWorker 반환 (start=True면 스레드도 한 번만 시작)"""
+    key = os.path.abspath(local_db_path)
+    worker = _sync_workers.get(key)
+    if worker is None:
+        with _sync_workers_lock:
+            worker = _sync_workers.get(key)
+            if worker is None:
+                worker = BackgroundSyncWorker(local_db_path)
+                _sync_workers[key] = worker
+    if start:
+        worker.start()
+    return worker
+
+# 테스트 함수
+def test_delta_sync():
+    """로컬 스텁 API 서버로 변경분 동기화(추가/수정/삭제, 구버전 전체 목록) 테스트"""
+    from urllib.parse import urlparse, parse_qs
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    from database import ModelDatabase
+    from sqlite_pool import close_pool
+    from view_counter import close_view_counter
+
+    print("🧪 변경분 동기화 테스트")
+
+    # 스텁 서버 상태: id → 모델, 삭제 기록, 구버전 API 흉내 여부
+    server_models = {}
+    server_deleted = []
+    requests_seen = []
+    legacy_api = {'enabled': False}
+
+    def web_model(model_id, name, stamp):
+        return {
+            'id': model_id, 'name': name, 'author': 'stub', 'description': '',
+            'share_token': f"token-{model_id}", 'obj_path': f"files/{model_id}/model.obj",
+            'mtl_path': f"files/{model_id}/model.mtl", 'texture_paths': json.dumps([f"files/{model_id}/texture.jpg"]),
+            'storage_type': 'web', 'access_count': 0, 'created_at': stamp, 'updated_at': stamp
+        }
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            since = parse_qs(url.query).get('since', [None])[0]
+            requests_seen.append(since)
+
+            if legacy_api['enabled']:
+                payload = {'status': 'success', 'models': list(server_models.values())}
+            else:
+                models = [m for m in server_models.values() if since is None or m['updated_at'] >= since]
+                deleted = [d for d in server_deleted if since is None or d['deleted_at'] >= since]
+                stamps = [m['updated_at'] for m in server_models.values()] + [d['deleted_at'] for d in server_deleted]
+                payload = {'status': 'success', 'models': models, 'deleted': deleted,
+                           'cursor': max(stamps) if stamps else since}
+
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    directory = tempfile.mkdtemp()
+    db_path = os.path.join(directory, "models.db")
+    try:
+        ModelDatabase(db_path=db_path, auto_sync=False)
+        sync = WebDBSync(local_db_path=db_path)
+        sync.get_models_url = f"http://127.0.0.1:{server.server_address[1]}/get_all_models.php"
+
+        def local_rows():
+            conn = connect(db_path)
+            rows = dict(conn.execute('SELECT id, name FROM models').fetchall())
+            conn.close()
+            return rows
+
+        # 로컬 전용 모델 (웹 저장 실패 시 생성) - 동기화로 지워지면 안 됨
+        conn = connect(db_path)
+        conn.execute("""
+            INSERT INTO models (id, name, file_paths, storage_type, share_token)
+            VALUES ('local1', 'Local only', '{}', 'local', 'token-local1')
+        """)
+        conn.commit()
+        conn.close()
+
+        # 1) 첫 동기화 - 전체
+        server_models['a'] = web_model('a', 'Model A', '2026-01-01 10:00:00')
+        server_models['b'] = web_model('b', 'Model B', '2026-01-01 11:00:00')
+        assert sync.quick_sync_check()
+        assert sync.delta_sync() == {'inserted': 2, 'updated': 0, 'deleted': 0}
+        assert local_rows() == {'local1': 'Local only', 'a': 'Model A', 'b': 'Model B'}
+        assert sync.get_sync_cursor() == '2026-01-01 11:00:00'
+        assert not sync.quick_sync_check(), "변경 없으면 동기화 불필요"
+
+        # 2) 수정 + 추가 + 삭제 - 기준점 이후 변경분만 요청
+        server_models['a'] = web_model('a', 'Model A v2', '2026-01-02 09:00:00')
+        server_models['c'] = web_model('c', 'Model C', '2026-01-02 09:30:00')
+        del server_models['b']
+        server_deleted.append({'id': 'b', 'deleted_at': '2026-01-02 10:00:00'})
+        assert sync.quick_sync_check()
+        summary = sync.delta_sync()
+        assert requests_seen[-1] == '2026-01-01 11:00:00'
+        assert summary == {'inserted': 1, 'updated': 1, 'deleted': 1}, summary
+        assert local_rows() == {'local1': 'Local only', 'a': 'Model A v2', 'c': 'Model C'}
+        file_paths = json.loads(connect(db_path).execute("SELECT file_paths FROM models WHERE id = 'c'").fetchone()[0])
+        assert file_paths['texture_paths'] == ['c/texture.jpg']
+
+        # 3) since를 모르는 구버전 API - 전체 목록을 받아도 바뀐 행만 수정, 목록에 없다고 삭제하지 않음
+        legacy_api['enabled'] = True
+        del server_models['c']
+        server_models['a'] = web_model('a', 'Model A v3', '2026-01-03 09:00:00')
+        assert sync.delta_sync() == {'inserted': 0, 'updated': 1, 'deleted': 0}
+        assert local_rows() == {'local1': 'Local only', 'a': 'Model A v3', 'c': 'Model C'}
+        assert sync.delta_sync() == {'inserted': 0, 'updated': 0, 'deleted': 0}, "같은 목록 재수신은 변경 없음"
+
+        # 4) 백그라운드 워커 - 실행 중이면 건너뜀 (single-flight), 상태 기록
+        worker = BackgroundSyncWorker(db_path, interval=3600)
+        worker.sync.get_models_url = sync.get_models_url
+        with worker._run_lock:
+            assert worker.run_once() is None
+        assert worker.run_once() is True
+        status = worker.status()
+        assert status['runs'] == 1 and status['skipped'] == 1 and status['last_error'] is None
+
+        # 변경분 동기화 오류는 삼키지 않고 워커 상태에 실제 오류로 기록
+        worker.sync.get_models_url = "http://127.0.0.1:1/get_all_models.php"
+        assert worker.run_once() is False
+        status = worker.status()
+        assert status['last_error'] and status['last_error'] != "변경분 API 응답 없음", status['last_error']
+
+        print(f"✅ 요청 since 값: {requests_seen}")
+    finally:
+        server.shutdown()
+        close_view_counter(db_path)
+        close_pool(db_path)
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_delta_sync()
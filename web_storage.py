@@ -1,99 +1,277 @@
-import requests
 import os
 import json
 import uuid
+import time
 import tempfile
 import streamlit as st
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-import urllib3
+import http_transport
+from asset_cache import get_asset_cache
+from multipart_stream import MultipartStream
+from chunked_upload import ChunkedUploader, ChunkedUploadUnsupported, CHUNK_UPLOAD_THRESHOLD
+from mesh_compiler import MESH_FILENAME
+from mesh_lod import lod_filename
 
-# SSL 경고 비활성화
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+# 병렬 업로드 설정 (환경변수로 조정 가능)
+UPLOAD_CONCURRENCY = int(os.getenv('UPLOAD_CONCURRENCY', '4'))
+UPLOAD_RETRIES = int(os.getenv('UPLOAD_RETRIES', '3'))
+UPLOAD_RETRY_BACKOFF = float(os.getenv('UPLOAD_RETRY_BACKOFF', '1.0'))
+
+# 병렬 다운로드 설정
+DOWNLOAD_CONCURRENCY = int(os.getenv('DOWNLOAD_CONCURRENCY', '8'))
 
 class WebServerStorage:
-    def __init__(self):
+    def __init__(self, upload_concurrency=UPLOAD_CONCURRENCY, upload_retries=UPLOAD_RETRIES, retry_backoff=UPLOAD_RETRY_BACKOFF,
+                 asset_cache=None):
         self.base_url = "http://decimate27.dothome.co.kr/streamlit_data"
         self.web_url = self.base_url  # web_url 속성 추가 (API 호출용)
         self.upload_url = f"{self.base_url}/upload.php"  # 업로드용 PHP 스크립트
+        self.chunk_upload_url = f"{self.base_url}/upload_chunk.php"  # 큰 파일 분할 업로드용
+        self.chunked_upload_supported = True             # 서버가 404를 주면 단일 업로드만 사용
+        self.not_found_paths = set()                     # 다운로드 시 404를 받은 경로 (일시적 오류와 구분)
         self.delete_url = f"{self.base_url}/delete.php"  # 삭제용 PHP 스크립트
         self.download_url = f"{self.base_url}/files"     # 파일 다운로드 경로
+        self.asset_cache = asset_cache or get_asset_cache()  # 다운로드 파일 디스크 캐시 (기본: 프로세스 공용)
+        
+        # 병렬 업로드 설정
+        self.upload_concurrency = max(1, upload_concurrency)
+        self.upload_retries = max(1, upload_retries)
+        self.retry_backoff = retry_backoff
+        
+    def _post_file(self, file_content, filename, model_id):
+        """웹서버에 파일 1개 전송 (UI 출력 없음 - 작업 스레드에서 호출)
+        
+        file_content는 bytes/memoryview 그대로 스트리밍 (본문 전체를 메모리에 다시 만들지 않음)
+        CHUNK_UPLOAD_THRESHOLD 이상은 분할 업로드 (같은 저장 안의 재시도는 서버가 받은 청크 다음부터 이어서 전송)
+        
+        Returns:
+            tuple: (file_path, error_message, retryable)
+        """
+        if self.chunked_upload_supported and len(file_content) >= CHUNK_UPLOAD_THRESHOLD:
+            try:
+                return ChunkedUploader(self.chunk_upload_url).upload(file_content, filename, model_id)
+            except ChunkedUploadUnsupported:
+                print(f"[DEBUG] 분할 업로드 미지원 서버 - 단일 업로드 사용: {self.chunk_upload_url}")
+                self.chunked_upload_supported = False
+        
+        # 재시도마다 처음부터 읽도록 시도별로 새 스트림 생성
+        body = MultipartStream({'model_id': model_id, 'action': 'upload'}, 'file', filename, file_content)
         
-    def upload_file(self, file_content, filename, model_id):
-        """웹서버에 파일 업로드"""
         try:
-            # 파일 데이터 준비
-            if isinstance(file_content, str):
-                file_content = file_content.encode('utf-8')
-            
-            files = {
-                'file': (filename, file_content),
-                'model_id': (None, model_id),
-                'action': (None, 'upload')
-            }
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            print(f"[DEBUG] 업로드 시작: {filename}, 크기: {len(file_content)} bytes")
-            st.write(f"🔍 업로드 시작: {filename}, 크기: {len(file_content)} bytes")
-            
-            response = requests.post(
+            response = http_transport.post(
                 self.upload_url, 
-                files=files, 
-                headers=headers,
-                timeout=30, 
+                endpoint='upload',
+                data=body,
+                headers={'Content-Type': body.content_type},
                 verify=False  # SSL 검증 비활성화
             )
+        except Exception as e:
+            return None, f"파일 업로드 중 네트워크 오류: {str(e)}", True
+        
+        if response.status_code != 200:
+            # 5xx/429는 일시적 오류로 보고 재시도
+            retryable = response.status_code >= 500 or response.status_code == 429
+            return None, f"서버 오류: {response.status_code} - {response.text[:200]}", retryable
+        
+        try:
+            result = response.json()
+        except json.JSONDecodeError:
+            return None, f"서버 응답 파싱 오류: {response.text[:100]}...", True
+        
+        if result.get('status') == 'success':
+            return result.get('file_path'), None, False
+        return None, f"업로드 실패: {result.get('message')}", False
+    
+    def _upload_with_retry(self, file_content, filename, model_id):
+        """지수 백오프로 재시도하며 업로드 (UI 출력 없음)
+        
+        Returns:
+            dict: file_path, error, attempts, bytes, seconds
+        """
+        started = time.perf_counter()
+        file_path = None
+        error = None
+        attempt = 0
+        
+        for attempt in range(1, self.upload_retries + 1):
+            file_path, error, retryable = self._post_file(file_content, filename, model_id)
+            if file_path:
+                break
             
-            st.write(f"🔍 응답 상태: {response.status_code}")
-            if response.status_code != 200:
-                st.write(f"❌ 응답 내용: {response.text[:200]}...")
+            print(f"[DEBUG] 업로드 실패 ({attempt}/{self.upload_retries}): {filename} - {error}")
+            if not retryable or attempt == self.upload_retries:
+                break
+            time.sleep(self.retry_backoff * (2 ** (attempt - 1)))
+        
+        return {
+            'file_path': file_path,
+            'error': None if file_path else error,
+            'attempts': attempt,
+            'bytes': len(file_content),
+            'seconds': time.perf_counter() - started
+        }
+    
+    def upload_file(self, file_content, filename, model_id):
+        """웹서버에 파일 업로드"""
+        # 파일 데이터 준비
+        if isinstance(file_content, str):
+            file_content = file_content.encode('utf-8')
+        
+        print(f"[DEBUG] 업로드 시작: {filename}, 크기: {len(file_content)} bytes")
+        st.write(f"🔍 업로드 시작: {filename}, 크기: {len(file_content)} bytes")
+        
+        result = self._upload_with_retry(file_content, filename, model_id)
+        
+        if result['file_path']:
+            st.write(f"✅ 업로드 성공: {result['file_path']}")
+            return result['file_path']
+        
+        st.error(result['error'])
+        st.write(f"🔍 업로드 URL: {self.upload_url}")
+        st.write(f"🔍 파일명: {filename}")
+        st.write(f"🔍 모델 ID: {model_id}")
+        return None
+    
+    def upload_files_parallel(self, uploads, model_id):
+        """여러 파일을 동시에 업로드 (동시 실행 수 제한 + 파일별 재시도)
+        
+        Args:
+            uploads: list of (filename, content)
+            model_id: 모델 ID
+        
+        Returns:
+            tuple: (file_paths {filename: path}, errors {filename: message}, stats)
+        """
+        prepared = []
+        for filename, content in uploads:
+            if isinstance(content, str):
+                content = content.encode('utf-8')
+            prepared.append((filename, content))
+        
+        total_bytes = sum(len(content) for _, content in prepared)
+        workers = min(self.upload_concurrency, len(prepared)) or 1
+        st.write(f"🚀 병렬 업로드 시작: {len(prepared)}개 파일, {total_bytes:,} bytes (동시 {workers}개)")
+        progress = st.progress(0.0)
+        
+        file_paths = {}
+        errors = {}
+        slowest = 0.0
+        started = time.perf_counter()
+        
+        # Streamlit 출력은 메인 스레드에서만 수행
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='upload') as executor:
+            futures = {
+                executor.submit(self._upload_with_retry, content, filename, model_id): filename
+                for filename, content in prepared
+            }
             
-            if response.status_code == 200:
+            for done_count, future in enumerate(as_completed(futures), 1):
+                filename = futures[future]
                 try:
-                    result = response.json()
-                    if result.get('status') == 'success':
-                        st.write(f"✅ 업로드 성공: {result.get('file_path')}")
-                        return result.get('file_path')
-                    else:
-                        st.error(f"업로드 실패: {result.get('message')}")
-                        return None
-                except json.JSONDecodeError:
-                    st.error(f"서버 응답 파싱 오류: {response.text[:100]}...")
-                    return None
-            else:
-                st.error(f"서버 오류: {response.status_code}")
-                return None
+                    result = future.result()
+                except Exception as e:
+                    result = {'file_path': None, 'error': str(e), 'attempts': 0, 'bytes': 0, 'seconds': 0.0}
                 
+                slowest = max(slowest, result['seconds'])
+                if result['file_path']:
+                    file_paths[filename] = result['file_path']
+                    retry_note = f" (재시도 {result['attempts'] - 1}회)" if result['attempts'] > 1 else ""
+                    st.write(f"✅ 업로드 성공: {result['file_path']} - {result['seconds']:.1f}초{retry_note}")
+                else:
+                    errors[filename] = result['error']
+                    st.error(f"❌ {filename}: {result['error']}")
+                    # 하나라도 실패하면 아직 시작하지 않은 업로드는 취소
+                    for pending in futures:
+                        pending.cancel()
+                
+                progress.progress(done_count / len(futures))
+        
+        elapsed = time.perf_counter() - started
+        uploaded_bytes = sum(len(content) for filename, content in prepared if filename in file_paths)
+        stats = {
+            'files': len(prepared),
+            'bytes': uploaded_bytes,
+            'seconds': elapsed,
+            'slowest_file_seconds': slowest,
+            'throughput': uploaded_bytes / elapsed if elapsed > 0 else 0.0
+        }
+        
+        # 취소된 업로드도 실패로 기록
+        for filename, _ in prepared:
+            if filename not in file_paths and filename not in errors:
+                errors[filename] = "다른 파일 업로드 실패로 취소됨"
+        
+        return file_paths, errors, stats
+    
+    def _get_file(self, file_path):
+        """웹서버 파일 가져오기 (디스크 캐시 + 조건부 재검증, UI 출력 없음)
+        
+        Returns:
+            tuple: (content, error_message)
+        """
+        url = f"{self.download_url}/{file_path}"
+        entry = self.asset_cache.lookup(url)
+        
+        # 최근에 확인한 파일은 네트워크 요청 없이 사용
+        if self.asset_cache.is_fresh(entry):
+            content = self.asset_cache.read(entry)
+            if content is not None:
+                return content, None
+        
+        headers = self.asset_cache.conditional_headers(entry)
+        
+        try:
+            response = http_transport.get(url, endpoint='download', headers=headers, verify=False)
         except Exception as e:
-            st.error(f"파일 업로드 중 네트워크 오류: {str(e)}")
-            st.write(f"🔍 업로드 URL: {self.upload_url}")
-            st.write(f"🔍 파일명: {filename}")
-            st.write(f"🔍 모델 ID: {model_id}")
-            return None
+            # 네트워크 오류 시 캐시된 사본이 있으면 사용
+            if entry:
+                content = self.asset_cache.read(entry)
+                if content is not None:
+                    return content, None
+            return None, f"파일 다운로드 중 오류: {str(e)}"
+        
+        if response.status_code == 304 and entry:
+            # 변경 없음 - 본문 전송 없이 캐시 사용
+            content = self.asset_cache.read(entry)
+            if content is not None:
+                self.asset_cache.touch(url, revalidated=True)
+                return content, None
+            
+            # 캐시 파일이 사라진 경우 조건 없이 다시 요청
+            self.asset_cache.remove(url)
+            return self._get_file(file_path)
+        
+        if response.status_code == 200:
+            try:
+                self.asset_cache.store(
+                    url, response.content,
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified')
+                )
+            except Exception as e:
+                print(f"[DEBUG] 에셋 캐시 저장 실패: {e}")
+            return response.content, None
+        
+        if response.status_code == 404:
+            self.not_found_paths.add(file_path)
+        return None, f"파일 다운로드 실패: {response.status_code}"
     
     def download_file(self, file_path):
         """웹서버에서 파일 다운로드"""
-        try:
-            url = f"{self.download_url}/{file_path}"
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=30, verify=False)
-            
-            if response.status_code == 200:
-                return response.content
-            else:
-                st.error(f"파일 다운로드 실패: {response.status_code}")
-                return None
-                
-        except Exception as e:
-            st.error(f"파일 다운로드 중 오류: {str(e)}")
-            return None
+        content, error = self._get_file(file_path)
+        if content is None:
+            st.error(error)
+        return content
     
     def delete_model(self, model_id):
-        """웹서버에서 모델 삭제"""
+        """웹서버에서 모델 삭제 (완료되지 않은 분할 업로드 청크도 정리)"""
+        if self.chunked_upload_supported:
+            try:
+                ChunkedUploader(self.chunk_upload_url).abort(model_id)
+            except ChunkedUploadUnsupported:
+                self.chunked_upload_supported = False
+        
         try:
             st.write(f"🗑️ 웹서버에서 모델 삭제 중: {model_id}")
             
@@ -102,15 +280,10 @@ class WebServerStorage:
                 'action': 'delete'
             }
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = requests.post(
+            response = http_transport.post(
                 self.delete_url, 
+                endpoint='delete',
                 data=data, 
-                headers=headers,
-                timeout=30, 
                 verify=False
             )
             
@@ -121,6 +294,7 @@ class WebServerStorage:
                     result = response.json()
                     if result.get('status') == 'success':
                         st.success(f"✅ 웹서버에서 삭제 성공: {result.get('message')}")
+                        self.asset_cache.remove_prefix(f"{self.download_url}/{model_id}/")
                         return True
                     else:
                         st.error(f"❌ 웹서버 삭제 실패: {result.get('message')}")
@@ -136,8 +310,8 @@ class WebServerStorage:
             st.error(f"웹서버 삭제 중 네트워크 오류: {str(e)}")
             return False
     
-    def save_model_metadata(self, model_id, name, author, description, share_token, real_height):
-        """모델 메타데이터를 웹서버에 저장"""
+    def save_model_metadata(self, model_id, name, author, description, share_token, real_height, file_paths=None):
+        """모델 메타데이터를 웹서버에 저장 (file_paths에 컴파일된 메시/LOD 경로가 있으면 함께 저장)"""
         try:
             metadata = {
                 'model_id': model_id,
@@ -147,11 +321,14 @@ class WebServerStorage:
                 'share_token': share_token,
                 'real_height': real_height
             }
+            for key in ('mesh_path', 'lod_paths'):
+                if file_paths and file_paths.get(key):
+                    metadata[key] = file_paths[key]
             
-            response = requests.post(
+            response = http_transport.post(
                 f"{self.web_url}/api_save_model.php",
-                json=metadata,
-                timeout=10
+                endpoint='metadata',
+                json=metadata
             )
             
             if response.status_code == 200:
@@ -170,45 +347,44 @@ class WebServerStorage:
             st.error(f"메타데이터 저장 중 오류: {str(e)}")
             return False
     
-    def save_model_to_server(self, model_id, obj_content, mtl_content, texture_data, name, author, description, share_token, real_height):
-        """모델을 웹서버에 저장"""
+    def save_model_to_server(self, model_id, obj_content, mtl_content, texture_data, name, author, description, share_token, real_height, mesh_data=None, lod_data=None):
+        """모델을 웹서버에 저장 (mesh_data: 컴파일된 바이너리 메시, lod_data: LOD 바이너리 목록 - 선택)"""
         st.write(f"🔍 모델 저장 시작: {model_id}")
         st.write(f"📊 OBJ 크기: {len(obj_content)}, MTL 크기: {len(mtl_content)}, 텍스처 파일 수: {len(texture_data)}")
         
-        file_paths = {}
+        # OBJ, MTL, (바이너리 메시), 텍스처 파일들을 동시에 업로드
+        uploads = [("model.obj", obj_content), ("model.mtl", mtl_content)]
+        if mesh_data:
+            uploads.append((MESH_FILENAME, mesh_data))
+        lod_names = [lod_filename(level) for level in range(1, len(lod_data or []) + 1)]
+        uploads.extend(zip(lod_names, lod_data or []))
+        uploads.extend(texture_data.items())
         
-        # OBJ 파일 업로드
-        obj_path = self.upload_file(obj_content, "model.obj", model_id)
-        if obj_path:
-            file_paths['obj_path'] = obj_path
-        else:
-            st.error("OBJ 파일 업로드 실패")
-            return None
+        uploaded, errors, stats = self.upload_files_parallel(uploads, model_id)
         
-        # MTL 파일 업로드
-        mtl_path = self.upload_file(mtl_content, "model.mtl", model_id)
-        if mtl_path:
-            file_paths['mtl_path'] = mtl_path
-        else:
-            st.error("MTL 파일 업로드 실패")
+        if errors:
+            # 전부 성공하지 않으면 이미 업로드된 파일들 삭제 (all-or-nothing)
+            st.error(f"파일 업로드 실패: {', '.join(errors.keys())}")
+            self.delete_model(model_id)
             return None
         
-        # 텍스처 파일들 업로드
-        texture_paths = []
-        for texture_name, texture_content in texture_data.items():
-            texture_path = self.upload_file(texture_content, texture_name, model_id)
-            if texture_path:
-                texture_paths.append(texture_path)
-            else:
-                st.error(f"텍스처 파일 업로드 실패: {texture_name}")
-                # 업로드 실패 시 이미 업로드된 파일들 삭제
-                self.delete_model(model_id)
-                return None
+        st.write(
+            f"📈 업로드 처리량: {stats['throughput'] / (1024 * 1024):.2f}MB/s "
+            f"({stats['bytes']:,} bytes, 전체 {stats['seconds']:.1f}초 / 가장 느린 파일 {stats['slowest_file_seconds']:.1f}초)"
+        )
         
-        file_paths['texture_paths'] = texture_paths
+        file_paths = {
+            'obj_path': uploaded["model.obj"],
+            'mtl_path': uploaded["model.mtl"],
+            'texture_paths': [uploaded[texture_name] for texture_name in texture_data]
+        }
+        if mesh_data:
+            file_paths['mesh_path'] = uploaded[MESH_FILENAME]
+        if lod_names:
+            file_paths['lod_paths'] = [uploaded[lod_name] for lod_name in lod_names]
         
         # 메타데이터 저장 (선택적 - 실패해도 파일은 유지)
-        metadata_saved = self.save_model_metadata(model_id, name, author, description, share_token, real_height)
+        metadata_saved = self.save_model_metadata(model_id, name, author, description, share_token, real_height, file_paths)
         if not metadata_saved:
             st.warning("⚠️ 메타데이터 저장 실패 (파일은 업로드됨)")
             # 메타데이터 저장 실패해도 파일 경로는 반환
@@ -218,52 +394,131 @@ class WebServerStorage:
         st.success(f"✅ 웹서버에 모든 파일 업로드 완료!")
         return file_paths
     
-    def load_model_from_server(self, file_paths):
-        """웹서버에서 모델 로드"""
+    def iter_model_files(self, file_paths, use_mesh=False):
+        """모델 파일 다운로드를 한꺼번에 시작하고 완료되는 순서대로 전달
+        
+        use_mesh=True면 OBJ 대신 컴파일된 바이너리 메시와 LOD를 받음
+        
+        Yields:
+            tuple: (kind, name, content, error) - kind는 'obj', 'mesh', 'lod', 'mtl', 'texture'
+        """
+        if use_mesh:
+            jobs = [('mesh', MESH_FILENAME, file_paths['mesh_path'])]
+            for lod_path in file_paths.get('lod_paths', []):
+                jobs.append(('lod', os.path.basename(lod_path), lod_path))
+        else:
+            jobs = [('obj', 'model.obj', file_paths['obj_path'])]
+        jobs.append(('mtl', 'model.mtl', file_paths['mtl_path']))
+        for texture_path in file_paths.get('texture_paths', []):
+            jobs.append(('texture', os.path.basename(texture_path), texture_path))
+        
+        workers = min(DOWNLOAD_CONCURRENCY, len(jobs))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='download') as executor:
+            futures = {executor.submit(self._get_file, path): (kind, name) for kind, name, path in jobs}
+            
+            for future in as_completed(futures):
+                kind, name = futures[future]
+                try:
+                    content, error = future.result()
+                except Exception as e:
+                    content, error = None, str(e)
+                yield kind, name, content, error
+    
+    def load_model_from_server(self, file_paths, backup_paths=None, with_mesh=False):
+        """웹서버에서 모델 로드 (병렬 다운로드, 실패한 파일만 로컬 백업 사용)
+        
+        with_mesh=True면 (obj, mtl, textures, mesh, lods) 반환 - 컴파일된 메시가 있으면
+        OBJ는 받지 않고 obj 자리에 None, 메시를 못 받으면 OBJ로 대체
+        lods는 받은 LOD 바이너리 목록 (정밀 → 거침 순서, 없으면 빈 목록)
+        """
+        failure = (None, None, None, None, []) if with_mesh else (None, None, None)
+        use_mesh = bool(with_mesh and file_paths.get('mesh_path'))
         try:
-            # OBJ 파일 다운로드
-            obj_content = self.download_file(file_paths['obj_path'])
-            if obj_content:
-                obj_content = obj_content.decode('utf-8')
-            else:
-                return None, None, None
+            obj_content = None
+            mesh_content = None
+            mtl_content = None
+            downloaded_textures = {}
+            downloaded_lods = {}
+            failed = []
             
-            # MTL 파일 다운로드
-            mtl_content = self.download_file(file_paths['mtl_path'])
-            if mtl_content:
-                mtl_content = mtl_content.decode('utf-8')
-            else:
-                return None, None, None
+            for kind, name, content, error in self.iter_model_files(file_paths, use_mesh=use_mesh):
+                if content is None and kind == 'lod' and backup_paths:
+                    content = LocalBackupStorage().load_file_backup(backup_paths, kind, name)
+                
+                if content is None and kind == 'lod':
+                    # LOD는 선택 사항 - 없으면 전체 메시만 사용
+                    print(f"[DEBUG] LOD 없음: {name} - {error}")
+                elif content is None:
+                    print(f"[DEBUG] 다운로드 실패: {name} - {error}")
+                    failed.append((kind, name, error))
+                elif kind == 'obj':
+                    obj_content = content
+                elif kind == 'mesh':
+                    mesh_content = content
+                elif kind == 'lod':
+                    downloaded_lods[name] = content
+                elif kind == 'mtl':
+                    mtl_content = content
+                else:
+                    downloaded_textures[name] = content
             
-            # 텍스처 파일들 다운로드
+            # 실패한 파일만 로컬 백업에서 보충
+            if failed:
+                local_backup = LocalBackupStorage()
+                for kind, name, error in failed:
+                    content = local_backup.load_file_backup(backup_paths, kind, name) if backup_paths else None
+                    if content is None and kind == 'mesh':
+                        # 바이너리 메시가 없으면 OBJ 원본으로 대체
+                        print("[DEBUG] 바이너리 메시 없음 - OBJ로 대체")
+                        content, error = self._get_file(file_paths['obj_path'])
+                        if content is None and backup_paths:
+                            content = local_backup.load_file_backup(backup_paths, 'obj', 'model.obj')
+                        kind = 'obj'
+                    if content is None:
+                        st.error(error)
+                        return failure
+                    
+                    print(f"[DEBUG] 로컬 백업 사용: {name}")
+                    if kind == 'obj':
+                        obj_content = content
+                    elif kind == 'mesh':
+                        mesh_content = content
+                    elif kind == 'mtl':
+                        mtl_content = content
+                    else:
+                        downloaded_textures[name] = content
+            
+            # 원래 텍스처 순서 유지
             texture_data = {}
-            for texture_path in file_paths['texture_paths']:
+            for texture_path in file_paths.get('texture_paths', []):
                 texture_name = os.path.basename(texture_path)
-                texture_content = self.download_file(texture_path)
-                if texture_content:
-                    texture_data[texture_name] = texture_content
-                else:
-                    return None, None, None
+                texture_data[texture_name] = downloaded_textures[texture_name]
             
-            return obj_content, mtl_content, texture_data
+            obj_text = obj_content.decode('utf-8') if obj_content is not None else None
+            if with_mesh:
+                # 전체 메시를 쓸 때만 LOD 사용 (LOD 순서 유지)
+                lods = []
+                if mesh_content is not None:
+                    for lod_path in file_paths.get('lod_paths', []):
+                        lod_name = os.path.basename(lod_path)
+                        if lod_name in downloaded_lods:
+                            lods.append(downloaded_lods[lod_name])
+                return obj_text, mtl_content.decode('utf-8'), texture_data, mesh_content, lods
+            return obj_text, mtl_content.decode('utf-8'), texture_data
             
         except Exception as e:
             st.error(f"모델 로드 중 오류: {str(e)}")
-            return None, None, None
+            return failure
     
     def list_server_models(self):
         """웹서버의 모델 목록 조회 (디버깅용)"""
         try:
             data = {'action': 'list'}
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
             
-            response = requests.post(
+            response = http_transport.post(
                 self.delete_url, 
+                endpoint='list',
                 data=data, 
-                headers=headers,
-                timeout=30, 
                 verify=False
             )
             
@@ -292,20 +547,20 @@ class LocalBackupStorage:
         self.base_path = "data/models"
         os.makedirs(self.base_path, exist_ok=True)
     
-    def save_model_backup(self, model_id, obj_content, mtl_content, texture_data):
+    def save_model_backup(self, model_id, obj_content, mtl_content, texture_data, mesh_data=None, lod_data=None):
         """로컬에 백업 저장"""
         model_dir = os.path.join(self.base_path, model_id)
         os.makedirs(model_dir, exist_ok=True)
         
         try:
-            # OBJ 파일 저장
+            # OBJ 파일 저장 (업로드 버퍼(memoryview)는 복사 없이 그대로 기록)
             obj_path = os.path.join(model_dir, "model.obj")
-            with open(obj_path, 'w') as f:
+            with open(obj_path, 'w' if isinstance(obj_content, str) else 'wb') as f:
                 f.write(obj_content)
             
             # MTL 파일 저장
             mtl_path = os.path.join(model_dir, "model.mtl")
-            with open(mtl_path, 'w') as f:
+            with open(mtl_path, 'w' if isinstance(mtl_content, str) else 'wb') as f:
                 f.write(mtl_content)
             
             # 텍스처 파일들 저장
@@ -316,12 +571,30 @@ class LocalBackupStorage:
                     f.write(texture_content)
                 texture_paths.append(texture_path)
             
-            return {
+            backup_paths = {
                 'obj_path': obj_path,
                 'mtl_path': mtl_path,
                 'texture_paths': texture_paths
             }
             
+            # 컴파일된 바이너리 메시 저장
+            if mesh_data:
+                mesh_path = os.path.join(model_dir, MESH_FILENAME)
+                with open(mesh_path, 'wb') as f:
+                    f.write(mesh_data)
+                backup_paths['mesh_path'] = mesh_path
+            
+            # LOD 바이너리 저장
+            if lod_data:
+                backup_paths['lod_paths'] = []
+                for level, lod_content in enumerate(lod_data, start=1):
+                    lod_path = os.path.join(model_dir, lod_filename(level))
+                    with open(lod_path, 'wb') as f:
+                        f.write(lod_content)
+                    backup_paths['lod_paths'].append(lod_path)
+            
+            return backup_paths
+            
         except Exception as e:
             st.error(f"로컬 백업 저장 실패: {str(e)}")
             return None
@@ -350,6 +623,47 @@ class LocalBackupStorage:
             st.error(f"로컬 백업 로드 실패: {str(e)}")
             return None, None, None
     
+    def default_backup_paths(self, model_id, file_paths):
+        """웹서버 경로에 대응하는 기본 로컬 백업 경로"""
+        model_dir = os.path.join(self.base_path, model_id)
+        return {
+            'obj_path': os.path.join(model_dir, "model.obj"),
+            'mtl_path': os.path.join(model_dir, "model.mtl"),
+            'mesh_path': os.path.join(model_dir, MESH_FILENAME),
+            'lod_paths': [
+                os.path.join(model_dir, os.path.basename(lod_path))
+                for lod_path in file_paths.get('lod_paths', [])
+            ],
+            'texture_paths': [
+                os.path.join(model_dir, os.path.basename(texture_path))
+                for texture_path in file_paths.get('texture_paths', [])
+            ]
+        }
+    
+    def load_file_backup(self, backup_paths, kind, name):
+        """로컬 백업에서 파일 1개 읽기 (없으면 None)"""
+        if kind == 'obj':
+            path = backup_paths.get('obj_path')
+        elif kind == 'mesh':
+            path = backup_paths.get('mesh_path')
+        elif kind == 'mtl':
+            path = backup_paths.get('mtl_path')
+        else:
+            candidates = backup_paths.get('lod_paths' if kind == 'lod' else 'texture_paths', [])
+            path = next(
+                (candidate for candidate in candidates if os.path.basename(candidate) == name),
+                None
+            )
+        
+        if not path or not os.path.exists(path):
+            return None
+        
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+    
     def delete_model_backup(self, model_id):
         """로컬 백업 삭제"""
         model_dir = os.path.join(self.base_path, model_id)